@@ -0,0 +1,115 @@
+import logging
+from logging.config import fileConfig
+
+from sqlalchemy import engine_from_config
+from sqlalchemy import inspect
+from sqlalchemy import pool
+from sqlalchemy import text
+
+from alembic import context
+
+from app.db.database import SQLALCHEMY_DATABASE_URL
+from app.db.models import Base
+
+# this is the Alembic Config object, which provides
+# access to the values within the .ini file in use.
+config = context.config
+
+# Interpret the config file for Python logging.
+# This line sets up loggers basically.
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# URL бази даних береться з налаштувань додатку (змінні середовища POSTGRES_*)
+config.set_main_option("sqlalchemy.url", SQLALCHEMY_DATABASE_URL.replace("%", "%%"))
+
+# Метадані моделей для autogenerate
+target_metadata = Base.metadata
+
+logger = logging.getLogger("alembic.env")
+
+# Ревізія, що відповідає схемі, яку створював Base.metadata.create_all при імпорті додатку
+LEGACY_SCHEMA_REVISION = "0001"
+
+# other values from the config, defined by the needs of env.py,
+# can be acquired:
+# my_important_option = config.get_main_option("my_important_option")
+# ... etc.
+
+
+def run_migrations_offline() -> None:
+    """Run migrations in 'offline' mode.
+
+    This configures the context with just a URL
+    and not an Engine, though an Engine is acceptable
+    here as well.  By skipping the Engine creation
+    we don't even need a DBAPI to be available.
+
+    Calls to context.execute() here emit the given string to the
+    script output.
+
+    """
+    url = config.get_main_option("sqlalchemy.url")
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def stamp_legacy_schema(connection) -> None:
+    """
+    База, створена через create_all, має таблиці, але не має alembic_version, і
+    upgrade head падав би в 0001 на "relation ... already exists". Така база позначається
+    ревізією 0001; наступні міграції створюють індекси з IF NOT EXISTS
+    """
+    tables = set(inspect(connection).get_table_names())
+    if "alembic_version" in tables or "interview_forms" not in tables:
+        # Інспекція неявно відкрила транзакцію; міграції мають почати власну
+        # (інакше autocommit_block для CREATE INDEX CONCURRENTLY недоступний)
+        connection.rollback()
+        return
+    logger.warning("Схема без alembic_version: позначаю базу ревізією %s", LEGACY_SCHEMA_REVISION)
+    connection.execute(text(
+        "CREATE TABLE alembic_version ("
+        "version_num VARCHAR(32) NOT NULL, "
+        "CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num))"
+    ))
+    connection.execute(
+        text("INSERT INTO alembic_version (version_num) VALUES (:revision)"),
+        {"revision": LEGACY_SCHEMA_REVISION}
+    )
+    connection.commit()
+
+
+def run_migrations_online() -> None:
+    """Run migrations in 'online' mode.
+
+    In this scenario we need to create an Engine
+    and associate a connection with the context.
+
+    """
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        stamp_legacy_schema(connection)
+        context.configure(
+            connection=connection, target_metadata=target_metadata
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,61 @@
+"""add hot column indexes
+
+B-tree індекси на колонках, за якими постійно фільтруються scores, evaluations,
+feedbacks, interview_forms та questions. Індекси створюються з CONCURRENTLY,
+щоб не блокувати запис у великі таблиці (scores) під час міграції.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15 18:13:15.418007
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (назва індексу, таблиця, колонки)
+INDEXES = [
+    ('ix_scores_interview_form_id_interviewer_id', 'scores', ['interview_form_id', 'interviewer_id']),
+    ('ix_scores_interviewer_id', 'scores', ['interviewer_id']),
+    ('ix_scores_question_id', 'scores', ['question_id']),
+    ('ix_evaluations_interview_form_id', 'evaluations', ['interview_form_id']),
+    ('ix_feedbacks_interview_form_id', 'feedbacks', ['interview_form_id']),
+    ('ix_interview_forms_candidate_id', 'interview_forms', ['candidate_id']),
+    ('ix_interview_forms_interview_date', 'interview_forms', ['interview_date']),
+    ('ix_interviewer_forms_form_id', 'interviewer_forms', ['form_id']),
+    ('ix_questions_unit_id_level_id_difficulty_id', 'questions', ['unit_id', 'level_id', 'difficulty_id']),
+    ('ix_questions_difficulty_id', 'questions', ['difficulty_id']),
+    ('ix_questions_level_id', 'questions', ['level_id']),
+    ('ix_questions_group_id', 'questions', ['group_id']),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY не може виконуватись всередині транзакції
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
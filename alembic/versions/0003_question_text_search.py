@@ -0,0 +1,37 @@
+"""question text search
+
+Generated-колонка questions.search_vector (tsvector) з GIN-індексом для
+повнотекстового пошуку та триграмний GIN-індекс (pg_trgm) на questions.text
+для нечіткого пошуку та ILIKE '%...%'.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15 18:14:02.804125
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('questions', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("to_tsvector('simple', coalesce(text, ''))", persisted=True), nullable=True))
+    
+    with op.get_context().autocommit_block():
+        op.create_index('ix_questions_search_vector', 'questions', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_questions_text_trgm', 'questions', ['text'], unique=False, postgresql_using='gin', postgresql_ops={'text': 'gin_trgm_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_text_trgm', table_name='questions', if_exists=True)
+    op.drop_index('ix_questions_search_vector', table_name='questions', if_exists=True)
+    op.drop_column('questions', 'search_vector')
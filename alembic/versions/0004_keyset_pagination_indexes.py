@@ -0,0 +1,63 @@
+"""keyset pagination indexes
+
+Складені індекси під keyset-пагінацію списків за (created_at, id) та
+(interview_date, id). Індекс ix_interview_forms_interview_date замінюється
+складеним, який так само обслуговує фільтр за датою.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15 18:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (назва індексу, таблиця, колонки)
+INDEXES = [
+    ('ix_questions_created_at_id', 'questions', ['created_at', 'id']),
+    ('ix_application_templates_created_at_id', 'application_templates', ['created_at', 'id']),
+    ('ix_interviewers_created_at_id', 'interviewers', ['created_at', 'id']),
+    ('ix_interview_forms_interview_date_id', 'interview_forms', ['interview_date', 'id']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        op.drop_index(
+            'ix_interview_forms_interview_date', table_name='interview_forms',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_interview_forms_interview_date', 'interview_forms', ['interview_date'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,58 @@
+"""interview score summary
+
+Денормалізований підсумок оцінок форми (interview_score_summary), який
+застосунок оновлює інкрементально при додаванні оцінки. Для наявних форм
+підсумки заповнюються з scores одним INSERT ... SELECT.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-15 19:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('interview_score_summary',
+    sa.Column('interview_form_id', sa.Integer(), nullable=False),
+    sa.Column('scores_count', sa.Integer(), nullable=False),
+    sa.Column('weighted_sum', sa.Float(), nullable=False),
+    sa.Column('total_weight', sa.Float(), nullable=False),
+    sa.Column('scored_questions_count', sa.Integer(), nullable=False),
+    sa.Column('question_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['interview_form_id'], ['interview_forms.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('interview_form_id')
+    )
+    op.execute("""
+        INSERT INTO interview_score_summary (
+            interview_form_id, scores_count, weighted_sum, total_weight,
+            scored_questions_count, question_count, updated_at
+        )
+        SELECT
+            f.id,
+            count(s.id),
+            coalesce(sum(s.value * q.weight), 0),
+            coalesce(sum(q.weight), 0),
+            count(DISTINCT s.question_id),
+            (SELECT count(*) FROM template_questions tq WHERE tq.template_id = f.template_id),
+            now() AT TIME ZONE 'utc'
+        FROM interview_forms f
+        LEFT JOIN scores s ON s.interview_form_id = f.id
+        LEFT JOIN questions q ON q.id = s.question_id
+        GROUP BY f.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('interview_score_summary')
@@ -0,0 +1,138 @@
+"""unique scores per interviewer and question
+
+Одна оцінка інтерв'юера на питання в межах форми - ключ upsert для пакетного
+повторного оцінювання. Дублікати, що могли накопичитися, переносяться в
+scores_duplicates_archive (у scores лишається найновіша оцінка), підсумки
+interview_score_summary перераховуються.
+Індекс будується з CONCURRENTLY поза транзакцією: якщо між видаленням дублікатів і
+побудовою з'явився новий дублікат, невалідний індекс видаляється, дублікати знову
+архівуються і побудова повторюється; після MAX_INDEX_ATTEMPTS міграція падає.
+Унікальний індекс замінює ix_scores_interview_form_id_interviewer_id,
+бо покриває ті самі запити своїм префіксом.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-15 20:05:00.000000
+
+"""
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEX_NAME = 'uq_scores_form_interviewer_question'
+MAX_INDEX_ATTEMPTS = 3
+
+ARCHIVE_DUPLICATES = """
+    WITH removed AS (
+        DELETE FROM scores s
+        USING scores newer
+        WHERE newer.interview_form_id = s.interview_form_id
+          AND newer.interviewer_id = s.interviewer_id
+          AND newer.question_id = s.question_id
+          AND newer.id > s.id
+        RETURNING s.*
+    )
+    INSERT INTO scores_duplicates_archive
+    SELECT removed.*, now() AT TIME ZONE 'utc' FROM removed
+"""
+
+
+def index_is_valid(bind) -> Optional[bool]:
+    """None - індексу немає; False - залишок невдалого CREATE INDEX CONCURRENTLY"""
+    return bind.execute(sa.text("""
+        SELECT i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = :name
+    """), {"name": INDEX_NAME}).scalar()
+
+
+def drop_unique_index():
+    op.drop_index(INDEX_NAME, table_name='scores', postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    # Видалені дублікати зберігаються: їх можна переглянути чи повернути вручну
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS scores_duplicates_archive (LIKE scores);
+        ALTER TABLE scores_duplicates_archive ADD COLUMN IF NOT EXISTS archived_at timestamp without time zone
+    """)
+    bind = op.get_bind()
+    # autocommit_block фіксує транзакцію зі створенням архіву; кожен запит далі - окрема транзакція
+    with op.get_context().autocommit_block():
+        for attempt in range(1, MAX_INDEX_ATTEMPTS + 1):
+            if index_is_valid(bind) is False:
+                drop_unique_index()
+            op.execute(ARCHIVE_DUPLICATES)
+            try:
+                op.create_index(
+                    INDEX_NAME, 'scores',
+                    ['interview_form_id', 'interviewer_id', 'question_id'],
+                    unique=True,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                )
+            except sa.exc.DBAPIError as error:
+                # Дублікат, вставлений під час побудови, лишає невалідний індекс
+                if attempt == MAX_INDEX_ATTEMPTS:
+                    raise RuntimeError(
+                        f"Не вдалося побудувати {INDEX_NAME} за {MAX_INDEX_ATTEMPTS} спроби: {error}"
+                    ) from error
+                continue
+            if index_is_valid(bind):
+                break
+        else:
+            raise RuntimeError(f"Індекс {INDEX_NAME} невалідний після {MAX_INDEX_ATTEMPTS} спроб")
+
+        op.execute("""
+            INSERT INTO interview_score_summary (
+                interview_form_id, scores_count, weighted_sum, total_weight,
+                scored_questions_count, question_count, updated_at
+            )
+            SELECT
+                f.id,
+                count(s.id),
+                coalesce(sum(s.value * q.weight), 0),
+                coalesce(sum(q.weight), 0),
+                count(DISTINCT s.question_id),
+                (SELECT count(*) FROM template_questions tq WHERE tq.template_id = f.template_id),
+                now() AT TIME ZONE 'utc'
+            FROM interview_forms f
+            LEFT JOIN scores s ON s.interview_form_id = f.id
+            LEFT JOIN questions q ON q.id = s.question_id
+            GROUP BY f.id
+            ON CONFLICT (interview_form_id) DO UPDATE SET
+                scores_count = excluded.scores_count,
+                weighted_sum = excluded.weighted_sum,
+                total_weight = excluded.total_weight,
+                scored_questions_count = excluded.scored_questions_count,
+                question_count = excluded.question_count,
+                updated_at = excluded.updated_at
+        """)
+        op.drop_index(
+            'ix_scores_interview_form_id_interviewer_id', table_name='scores',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_scores_interview_form_id_interviewer_id', 'scores',
+            ['interview_form_id', 'interviewer_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        drop_unique_index()
+    # Архів дублікатів лишається: повернути рядки в scores без унікального індексу можна вручну
@@ -0,0 +1,42 @@
+"""outbox job id
+
+Ідентифікатор масової синхронізації в outbox_messages: стан задачі POST /sync/bulk
+читається з бази, тож GET /sync/jobs/{job_id} відповідає будь-який воркер.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-15 21:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('outbox_messages', sa.Column('job_id', sa.String(length=32), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_outbox_messages_job_id', 'outbox_messages', ['job_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_outbox_messages_job_id', table_name='outbox_messages',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('outbox_messages', 'job_id')
@@ -0,0 +1,247 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import select, func, extract
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.config import settings
+from app.cache import TTLCache
+from app.db.database import get_async_db
+from app.db.invalidation import on_tables_changed
+from app.db.models import Question, Interviewer, InterviewForm, Score, Evaluation
+from app.db.timestamps import UtcDateTime, to_naive_utc
+from pydantic import BaseModel
+import datetime
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+# Кеш результатів за кортежем фільтрів. Очищується після коміту, що змінив вихідні таблиці;
+# TTL обмежує застарілість між процесами, які про чужі записи не дізнаються
+analytics_cache = TTLCache(max_size=settings.ANALYTICS_CACHE_MAX_SIZE, ttl=settings.ANALYTICS_CACHE_TTL)
+on_tables_changed(
+    ["scores", "evaluations", "interview_forms", "questions", "interviewers"],
+    analytics_cache.clear
+)
+
+# Pydantic моделі для відповідей
+class QuestionStats(BaseModel):
+    question_id: int
+    text: str
+    scores_count: int
+    average_score: float
+    stddev_score: Optional[float] = None
+    min_score: float
+    max_score: float
+    rank: int
+
+class InterviewerCalibration(BaseModel):
+    interviewer_id: int
+    name: str
+    scores_count: int
+    average_score: float
+    score_variance: Optional[float] = None
+    # Середнє відхилення від середньої оцінки того ж питання серед усіх інтерв'юерів:
+    # > 0 - оцінює м'якше за колег, < 0 - суворіше
+    bias: float
+    mean_absolute_deviation: float
+
+class PositionStats(BaseModel):
+    position: str
+    forms_count: int
+    evaluated_count: int
+    passed_count: int
+    pass_rate: Optional[float] = None
+    average_total_score: Optional[float] = None
+    # Час від інтерв'ю до першої загальної оцінки
+    average_hours_to_decision: Optional[float] = None
+    median_hours_to_decision: Optional[float] = None
+
+
+def get_form_filters(start_date: Optional[datetime.datetime], end_date: Optional[datetime.datetime], position: Optional[str]):
+    """Умови на interview_forms для всіх звітів"""
+    start_date, end_date = to_naive_utc(start_date), to_naive_utc(end_date)
+    filters = []
+    if start_date:
+        filters.append(InterviewForm.interview_date >= start_date)
+    if end_date:
+        filters.append(InterviewForm.interview_date <= end_date)
+    if position:
+        filters.append(InterviewForm.position.ilike(f"%{position}%"))
+    return filters
+
+def _round(value, digits: int = 4):
+    return None if value is None else round(float(value), digits)
+
+
+@router.get("/questions", response_model=List[QuestionStats])
+async def get_question_stats(
+    start_date: Optional[UtcDateTime] = None,
+    end_date: Optional[UtcDateTime] = None,
+    position: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Статистика оцінок по питаннях з рангом за середньою оцінкою"""
+    key = ("questions", start_date, end_date, position, skip, limit)
+    cached = analytics_cache.get(key)
+    if cached is not None:
+        return cached
+
+    stats = (
+        select(
+            Score.question_id,
+            func.count(Score.id).label("scores_count"),
+            func.avg(Score.value).label("average_score"),
+            func.stddev_samp(Score.value).label("stddev_score"),
+            func.min(Score.value).label("min_score"),
+            func.max(Score.value).label("max_score"),
+        )
+        .join(InterviewForm, InterviewForm.id == Score.interview_form_id)
+        .where(*get_form_filters(start_date, end_date, position))
+        .group_by(Score.question_id)
+        .subquery()
+    )
+    query = (
+        select(
+            Question.id,
+            Question.text,
+            stats,
+            func.rank().over(order_by=stats.c.average_score.desc()).label("rank"),
+        )
+        .join(stats, stats.c.question_id == Question.id)
+        .order_by(stats.c.average_score.desc(), Question.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+
+    items = [
+        {
+            "question_id": row.id,
+            "text": row.text,
+            "scores_count": row.scores_count,
+            "average_score": _round(row.average_score),
+            "stddev_score": _round(row.stddev_score),
+            "min_score": row.min_score,
+            "max_score": row.max_score,
+            "rank": row.rank,
+        }
+        for row in result.all()
+    ]
+    analytics_cache.set(key, items)
+    return items
+
+@router.get("/interviewers", response_model=List[InterviewerCalibration])
+async def get_interviewer_calibration(
+    start_date: Optional[UtcDateTime] = None,
+    end_date: Optional[UtcDateTime] = None,
+    position: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Калібрування інтерв'юерів: розкид оцінок і відхилення від колег на тих самих питаннях"""
+    key = ("interviewers", start_date, end_date, position)
+    cached = analytics_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Віконна функція: середня оцінка питання серед усіх оцінок у вибраному періоді
+    deltas = (
+        select(
+            Score.interviewer_id,
+            Score.value,
+            (Score.value - func.avg(Score.value).over(partition_by=Score.question_id)).label("delta"),
+        )
+        .join(InterviewForm, InterviewForm.id == Score.interview_form_id)
+        .where(*get_form_filters(start_date, end_date, position))
+        .subquery()
+    )
+    query = (
+        select(
+            Interviewer.id,
+            Interviewer.name,
+            func.count().label("scores_count"),
+            func.avg(deltas.c.value).label("average_score"),
+            func.var_samp(deltas.c.value).label("score_variance"),
+            func.avg(deltas.c.delta).label("bias"),
+            func.avg(func.abs(deltas.c.delta)).label("mean_absolute_deviation"),
+        )
+        .join(deltas, deltas.c.interviewer_id == Interviewer.id)
+        .group_by(Interviewer.id)
+        .order_by(Interviewer.id)
+    )
+    result = await db.execute(query)
+
+    items = [
+        {
+            "interviewer_id": row.id,
+            "name": row.name,
+            "scores_count": row.scores_count,
+            "average_score": _round(row.average_score),
+            "score_variance": _round(row.score_variance),
+            "bias": _round(row.bias),
+            "mean_absolute_deviation": _round(row.mean_absolute_deviation),
+        }
+        for row in result.all()
+    ]
+    analytics_cache.set(key, items)
+    return items
+
+@router.get("/positions", response_model=List[PositionStats])
+async def get_position_stats(
+    start_date: Optional[UtcDateTime] = None,
+    end_date: Optional[UtcDateTime] = None,
+    position: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Частка успішних кандидатів і час до рішення по позиціях (за останньою загальною оцінкою форми)"""
+    key = ("positions", start_date, end_date, position)
+    cached = analytics_cache.get(key)
+    if cached is not None:
+        return cached
+
+    ranked = (
+        select(
+            Evaluation.interview_form_id,
+            Evaluation.passed,
+            Evaluation.total_score,
+            func.row_number().over(
+                partition_by=Evaluation.interview_form_id, order_by=Evaluation.id.desc()
+            ).label("row_number"),
+            func.min(Evaluation.created_at).over(partition_by=Evaluation.interview_form_id).label("first_decision_at"),
+        )
+        .subquery()
+    )
+    latest = select(ranked).where(ranked.c.row_number == 1).subquery()
+    hours_to_decision = extract("epoch", latest.c.first_decision_at - InterviewForm.interview_date) / 3600
+
+    query = (
+        select(
+            InterviewForm.position,
+            func.count(InterviewForm.id).label("forms_count"),
+            func.count(latest.c.interview_form_id).label("evaluated_count"),
+            func.count(latest.c.interview_form_id).filter(latest.c.passed.is_(True)).label("passed_count"),
+            func.avg(latest.c.total_score).label("average_total_score"),
+            func.avg(hours_to_decision).label("average_hours_to_decision"),
+            func.percentile_cont(0.5).within_group(hours_to_decision).label("median_hours_to_decision"),
+        )
+        .outerjoin(latest, latest.c.interview_form_id == InterviewForm.id)
+        .where(*get_form_filters(start_date, end_date, position))
+        .group_by(InterviewForm.position)
+        .order_by(InterviewForm.position)
+    )
+    result = await db.execute(query)
+
+    items = [
+        {
+            "position": row.position,
+            "forms_count": row.forms_count,
+            "evaluated_count": row.evaluated_count,
+            "passed_count": row.passed_count,
+            "pass_rate": _round(row.passed_count / row.evaluated_count) if row.evaluated_count else None,
+            "average_total_score": _round(row.average_total_score),
+            "average_hours_to_decision": _round(row.average_hours_to_decision, 2),
+            "median_hours_to_decision": _round(row.median_hours_to_decision, 2),
+        }
+        for row in result.all()
+    ]
+    analytics_cache.set(key, items)
+    return items
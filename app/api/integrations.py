@@ -1,95 +1,176 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
-from app.db.database import get_db
-from app.db.models import InterviewForm, Evaluation, Feedback
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from app.db.database import get_async_db
+from app.db.models import InterviewForm
+from app.db.outbox import enqueue_peopleforce_sync, get_job_messages, OUTBOX_SENT, OUTBOX_DEAD
+from app.db.timestamps import UtcDateTime
 from app.config import settings
+from app.cache import TTLCache, CacheEntry
+import asyncio
 import httpx
 import json
+import uuid
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/integrations/peopleforce", tags=["integrations"])
 
+def create_peopleforce_http_client() -> httpx.AsyncClient:
+    """
+    Створити HTTP-клієнт PeopleForce з пулом keep-alive з'єднань.
+    Створюється один раз у lifespan додатку, щоб запити не платили за нові TCP/TLS рукостискання
+    """
+    return httpx.AsyncClient(
+        base_url=settings.PEOPLEFORCE_API_URL,
+        # Content-Type не задається тут: httpx виставляє його сам для json та multipart
+        headers={
+            "Authorization": f"Bearer {settings.PEOPLEFORCE_API_KEY}",
+            "Accept": "application/json"
+        },
+        timeout=httpx.Timeout(settings.PEOPLEFORCE_TIMEOUT, connect=settings.PEOPLEFORCE_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.PEOPLEFORCE_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.PEOPLEFORCE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.PEOPLEFORCE_KEEPALIVE_EXPIRY
+        ),
+        http2=settings.PEOPLEFORCE_HTTP2
+    )
+
+def create_candidate_cache() -> TTLCache:
+    """Кеш відповідей PeopleForce для кандидатів (один на весь час роботи додатку)"""
+    return TTLCache(
+        max_size=settings.PEOPLEFORCE_CACHE_MAX_SIZE,
+        ttl=settings.PEOPLEFORCE_CACHE_TTL,
+        stale_ttl=settings.PEOPLEFORCE_CACHE_STALE_TTL
+    )
+
+# Маркер закешованої відповіді 404 (negative caching)
+CANDIDATE_NOT_FOUND = object()
+
+def get_retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """Пауза перед повтором після 429: Retry-After (секунди або HTTP-дата), інакше експоненційна"""
+    delay = float(2 ** attempt)
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+                delay = (retry_at - datetime.now(retry_at.tzinfo)).total_seconds()
+            except (TypeError, ValueError):
+                pass
+    return min(max(delay, 0.0), settings.PEOPLEFORCE_RETRY_AFTER_MAX)
+
 # Клас для роботи з PeopleForce API
 class PeopleForceClient:
-    def __init__(self):
-        self.base_url = settings.PEOPLEFORCE_API_URL
-        self.api_key = settings.PEOPLEFORCE_API_KEY
-        self.headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
+    def __init__(self, http_client: httpx.AsyncClient, cache: Optional[TTLCache] = None):
+        self.http_client = http_client
+        self.cache = cache
     
     async def get_candidates(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Отримати список кандидатів з PeopleForce"""
-        url = f"{self.base_url}/api/v1/candidates"
         params = filters or {}
+        key = ("candidates", tuple(sorted(params.items())))
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, params=params)
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Помилка отримання кандидатів з PeopleForce: {response.text}"
-                )
-            
-            return response.json()
+        return await self._cached_get(key, "/api/v1/candidates", params, "Помилка отримання кандидатів з PeopleForce")
     
     async def get_candidate(self, candidate_id: str) -> Dict[str, Any]:
         """Отримати інформацію про кандидата за ID"""
-        url = f"{self.base_url}/api/v1/candidates/{candidate_id}"
+        key = ("candidate", candidate_id)
+        
+        return await self._cached_get(key, f"/api/v1/candidates/{candidate_id}", None, "Помилка отримання кандидата з PeopleForce")
+    
+    async def _cached_get(self, key, url: str, params: Optional[Dict[str, Any]], error_message: str) -> Any:
+        """
+        GET через кеш: свіжий запис повертається одразу, застарілий - теж одразу,
+        але з фоновим оновленням (stale-while-revalidate); інакше - запит до PeopleForce
+        """
+        entry = self.cache.get_entry(key) if self.cache is not None else None
+        if entry is not None:
+            if not entry.is_fresh:
+                self.cache.refresh_in_background(key, lambda: self._fetch(key, url, params, error_message, entry))
+            value = entry.value
+        else:
+            value = await self._fetch(key, url, params, error_message, None)
+        
+        if value is CANDIDATE_NOT_FOUND:
+            raise HTTPException(status_code=404, detail=f"{error_message}: кандидата не знайдено")
+        return value
+    
+    async def _fetch(self, key, url: str, params: Optional[Dict[str, Any]], error_message: str, entry: Optional[CacheEntry]) -> Any:
+        """Запит до PeopleForce з If-None-Match; результат (включно з 404) зберігається в кеші"""
+        headers = {"If-None-Match": entry.etag} if entry is not None and entry.etag else {}
+        response = await self.http_client.get(url, params=params, headers=headers)
+        
+        # Дані не змінились - продовжуємо життя запису без повторного завантаження тіла
+        if response.status_code == 304 and entry is not None:
+            if self.cache is not None:
+                self.cache.set(key, entry.value, etag=entry.etag)
+            return entry.value
+        
+        if response.status_code == 404:
+            if self.cache is not None:
+                self.cache.set(key, CANDIDATE_NOT_FOUND, ttl=settings.PEOPLEFORCE_CACHE_NEGATIVE_TTL)
+            return CANDIDATE_NOT_FOUND
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers)
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Помилка отримання кандидата з PeopleForce: {response.text}"
-                )
-            
-            return response.json()
-    
-    async def update_candidate_notes(self, candidate_id: str, notes: str) -> Dict[str, Any]:
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"{error_message}: {response.text}"
+            )
+        
+        value = response.json()
+        if self.cache is not None:
+            self.cache.set(key, value, etag=response.headers.get("ETag"))
+        return value
+    
+    async def update_candidate_notes(self, candidate_id: str, notes: str, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """Оновити нотатки кандидата"""
-        url = f"{self.base_url}/api/v1/candidates/{candidate_id}"
         payload = {"notes": notes}
+        headers = {"Idempotency-Key": idempotency_key} if idempotency_key else {}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(url, headers=self.headers, json=payload)
-            
-            if response.status_code not in (200, 201, 204):
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Помилка оновлення нотаток кандидата в PeopleForce: {response.text}"
-                )
-            
-            return response.json()
+        response = await self._request_with_retry("PATCH", f"/api/v1/candidates/{candidate_id}", json=payload, headers=headers)
+        
+        if response.status_code not in (200, 201, 204):
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Помилка оновлення нотаток кандидата в PeopleForce: {response.text}"
+            )
+        
+        return response.json() if response.content else {}
+    
+    async def _request_with_retry(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Запит з урахуванням rate limit: на 429 чекаємо Retry-After і повторюємо"""
+        for attempt in range(settings.PEOPLEFORCE_MAX_RETRIES + 1):
+            response = await self.http_client.request(method, url, **kwargs)
+            if response.status_code != 429 or attempt == settings.PEOPLEFORCE_MAX_RETRIES:
+                return response
+            await asyncio.sleep(get_retry_delay(response.headers.get("Retry-After"), attempt))
+        return response
     
     async def add_candidate_attachment(self, candidate_id: str, file_name: str, file_content: bytes, file_type: str) -> Dict[str, Any]:
         """Додати вкладення до кандидата"""
-        url = f"{self.base_url}/api/v1/candidates/{candidate_id}/attachments"
-        
-        # Оновити заголовки для multipart/form-data
-        headers = self.headers.copy()
-        headers.pop("Content-Type", None)
-        
         files = {
             "file": (file_name, file_content, file_type)
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=headers, files=files)
-            
-            if response.status_code not in (200, 201, 204):
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"Помилка додавання вкладення до кандидата в PeopleForce: {response.text}"
-                )
-            
-            return response.json()
+        response = await self.http_client.post(f"/api/v1/candidates/{candidate_id}/attachments", files=files)
+        
+        if response.status_code not in (200, 201, 204):
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Помилка додавання вкладення до кандидата в PeopleForce: {response.text}"
+            )
+        
+        return response.json()
+
+
+def get_peopleforce_client(request: Request) -> PeopleForceClient:
+    """Залежність: клієнт PeopleForce поверх спільного HTTP-клієнта та кешу кандидатів додатку"""
+    return PeopleForceClient(request.app.state.peopleforce_http_client, request.app.state.candidate_cache)
 
 
 # Pydantic моделі для запитів і відповідей
@@ -101,17 +182,72 @@ class CandidateResponse(BaseModel):
     position: Optional[str] = None
     status: Optional[str] = None
 
+class BulkSyncRequest(BaseModel):
+    interview_ids: Optional[List[int]] = None
+    date_from: Optional[UtcDateTime] = None
+    date_to: Optional[UtcDateTime] = None
+
+class SyncResult(BaseModel):
+    interview_id: int
+    candidate_id: Optional[str] = None
+    status: str  # queued, success, error, not_found
+    detail: Optional[str] = None
+
+class BulkSyncResponse(BaseModel):
+    job_id: Optional[str] = None
+    status: str  # queued, running, completed
+    total: int
+    succeeded: int = 0
+    failed: int = 0
+    results: List[SyncResult] = []
+
+
+# Стан повідомлення outbox -> результат синхронізації форми
+SYNC_RESULT_STATUSES = {OUTBOX_SENT: "success", OUTBOX_DEAD: "error"}
+
+
+def build_interview_notes(form: InterviewForm) -> str:
+    """Нотатки кандидата з результатами інтерв'ю (зв'язки форми мають бути завантажені заздалегідь)"""
+    notes = f"## Результати технічної співбесіди\n\n"
+    notes += f"**Позиція:** {form.position}\n"
+    notes += f"**Дата інтерв'ю:** {form.interview_date.strftime('%Y-%m-%d %H:%M')}\n\n"
+    
+    # Додати інформацію про інтерв'юерів
+    notes += "**Інтерв'юери:**\n"
+    for interviewer in form.interviewers:
+        notes += f"- {interviewer.name} ({interviewer.position})\n"
+    
+    notes += "\n**Оцінки:**\n"
+    
+    # Обчислення загальної оцінки
+    for eval in form.evaluations:
+        passed_text = "Пройшов" if eval.passed else "Не пройшов"
+        notes += f"- Загальна оцінка: {eval.total_score} з {eval.minimal_rate} необхідних\n"
+        notes += f"- Результат: {passed_text}\n\n"
+    
+    # Додати відгук
+    feedback = form.feedback
+    if feedback:
+        notes += "**Відгук:**\n"
+        notes += feedback.text
+        
+        if feedback.phrases:
+            notes += "\n\n**Рекомендації:**\n"
+            for phrase in feedback.phrases:
+                notes += f"- {phrase.text}\n"
+    
+    return notes
+
 
 # Ендпоінти для роботи з PeopleForce API
 @router.get("/candidates", response_model=List[CandidateResponse])
 async def get_candidates(
     search: Optional[str] = None,
     position: Optional[str] = None,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    client: PeopleForceClient = Depends(get_peopleforce_client)
 ):
     """Отримати список кандидатів з PeopleForce"""
-    client = PeopleForceClient()
-    
     filters = {}
     if search:
         filters["q"] = search
@@ -139,10 +275,8 @@ async def get_candidates(
     return result
 
 @router.get("/candidates/{candidate_id}", response_model=CandidateResponse)
-async def get_candidate(candidate_id: str):
+async def get_candidate(candidate_id: str, client: PeopleForceClient = Depends(get_peopleforce_client)):
     """Отримати інформацію про кандидата за ID"""
-    client = PeopleForceClient()
-    
     candidate = await client.get_candidate(candidate_id)
     
     return CandidateResponse(
@@ -154,62 +288,93 @@ async def get_candidate(candidate_id: str):
         status=candidate.get("status", "")
     )
 
-@router.post("/{interview_id}/sync", status_code=status.HTTP_200_OK)
-async def sync_interview_to_peopleforce(interview_id: int, db: Session = Depends(get_db)):
-    """Синхронізувати результати інтерв'ю з PeopleForce"""
-    # Отримати дані форми інтерв'ю
-    form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
-    if form is None:
-        raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
+@router.post("/sync/bulk", response_model=BulkSyncResponse, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_sync_interviews_to_peopleforce(data: BulkSyncRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Поставити синхронізацію багатьох інтерв'ю з PeopleForce у чергу (за списком ID або діапазоном дат).
+    Як і для одного інтерв'ю, кожна форма - окреме повідомлення outbox з власним ключем ідемпотентності,
+    а запити до PeopleForce виконує диспетчер. Хід виконання - через GET /sync/jobs/{job_id}
+    """
+    if not data.interview_ids and data.date_from is None and data.date_to is None:
+        raise HTTPException(status_code=400, detail="Потрібно вказати interview_ids або діапазон дат")
     
-    # Отримати оцінки та відгуки
-    evaluations = db.query(Evaluation).filter(Evaluation.interview_form_id == interview_id).all()
-    feedback = db.query(Feedback).filter(Feedback.interview_form_id == interview_id).first()
+    # Нотатки будує диспетчер під час відправки, тож тут потрібні лише ID форм
+    query = select(InterviewForm.id)
+    if data.interview_ids:
+        query = query.where(InterviewForm.id.in_(set(data.interview_ids)))
+    if data.date_from is not None:
+        query = query.where(InterviewForm.interview_date >= data.date_from)
+    if data.date_to is not None:
+        query = query.where(InterviewForm.interview_date <= data.date_to)
     
-    # Підготувати дані для відправки
-    notes = f"## Результати технічної співбесіди\n\n"
-    notes += f"**Позиція:** {form.position}\n"
-    notes += f"**Дата інтерв'ю:** {form.interview_date.strftime('%Y-%m-%d %H:%M')}\n\n"
-    
-    # Додати інформацію про інтерв'юерів
-    notes += "**Інтерв'юери:**\n"
-    for interviewer in form.interviewers:
-        notes += f"- {interviewer.name} ({interviewer.position})\n"
+    result = await db.execute(query.order_by(InterviewForm.id))
+    form_ids = result.scalars().all()
     
-    notes += "\n**Оцінки:**\n"
+    job_id = uuid.uuid4().hex
+    for form_id in form_ids:
+        enqueue_peopleforce_sync(db, form_id, job_id=job_id)
+    await db.commit()
     
-    # Обчислення загальної оцінки
-    if evaluations:
-        for eval in evaluations:
-            passed_text = "Пройшов" if eval.passed else "Не пройшов"
-            notes += f"- Загальна оцінка: {eval.total_score} з {eval.minimal_rate} необхідних\n"
-            notes += f"- Результат: {passed_text}\n\n"
+    found_ids = set(form_ids)
+    not_found = [
+        SyncResult(interview_id=interview_id, status="not_found", detail="Форму інтерв'ю не знайдено")
+        for interview_id in dict.fromkeys(data.interview_ids or [])
+        if interview_id not in found_ids
+    ]
+    queued = [SyncResult(interview_id=form_id, status="queued") for form_id in form_ids]
     
-    # Додати відгук
-    if feedback:
-        notes += "**Відгук:**\n"
-        notes += feedback.text
-        
-        if feedback.phrases:
-            notes += "\n\n**Рекомендації:**\n"
-            for phrase in feedback.phrases:
-                notes += f"- {phrase.text}\n"
+    return BulkSyncResponse(
+        job_id=job_id if form_ids else None,
+        status="queued",
+        total=len(form_ids) + len(not_found),
+        failed=len(not_found),
+        results=not_found + queued
+    )
+
+@router.get("/sync/jobs/{job_id}", response_model=BulkSyncResponse)
+async def get_sync_job(job_id: str, db: AsyncSession = Depends(get_async_db)):
+    """
+    Стан масової синхронізації за її повідомленнями outbox.
+    Форми, яких не було під час постановки в чергу, повертаються лише у відповіді POST /sync/bulk
+    """
+    messages = await get_job_messages(db, job_id)
+    if not messages:
+        raise HTTPException(status_code=404, detail="Задачу синхронізації не знайдено")
     
-    # Відправити дані у PeopleForce
-    client = PeopleForceClient()
+    results = [
+        SyncResult(
+            interview_id=message.payload["interview_form_id"],
+            status=SYNC_RESULT_STATUSES.get(message.status, "queued"),
+            detail=message.last_error
+        )
+        for message in messages
+    ]
+    succeeded = sum(1 for result in results if result.status == "success")
+    failed = sum(1 for result in results if result.status == "error")
+    return BulkSyncResponse(
+        job_id=job_id,
+        status="completed" if succeeded + failed == len(results) else "running",
+        total=len(results),
+        succeeded=succeeded,
+        failed=failed,
+        results=results
+    )
+
+@router.post("/{interview_id}/sync", status_code=status.HTTP_202_ACCEPTED)
+async def sync_interview_to_peopleforce(interview_id: int, db: AsyncSession = Depends(get_async_db)):
+    """
+    Поставити синхронізацію результатів інтерв'ю з PeopleForce у чергу (outbox).
+    Запит до PeopleForce виконує диспетчер, тому відповідь не залежить від його затримки
+    """
+    form = await db.get(InterviewForm, interview_id)
+    if form is None:
+        raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
     
-    try:
-        # Оновити нотатки кандидата
-        await client.update_candidate_notes(form.candidate_id, notes)
-        
-        # Створити PDF з результатами і відправити як вкладення
-        # В реальному проекті тут варто використати якусь бібліотеку для створення PDF
-        # і відправити його через add_candidate_attachment
-        
-        return {"status": "success", "message": "Дані успішно синхронізовано з PeopleForce"}
+    message = enqueue_peopleforce_sync(db, interview_id)
+    await db.commit()
     
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Помилка при синхронізації даних з PeopleForce: {str(e)}"
-        )
+    return {
+        "status": "queued",
+        "message_id": message.id,
+        "message": "Синхронізацію з PeopleForce поставлено в чергу"
+    }
@@ -1,10 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.db.database import get_db
-from app.db.models import InterviewForm, ApplicationTemplate, Interviewer, Score, Evaluation, Feedback, PredefinedPhrase, Question
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, update, exists
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional, Dict
+from enum import Enum
+from app.config import settings
+from app.db.database import get_async_db, AsyncSessionLocal
+from app.db.pagination import paginate, get_next_cursor, INTERVIEW_FORM_ORDER, INTERVIEWER_ORDER, NEXT_CURSOR_HEADER
+from app.db.loading import (
+    INTERVIEW_FORM_LIST_OPTIONS, INTERVIEW_FORM_DETAIL_OPTIONS, INTERVIEW_FORM_EXPORT_OPTIONS,
+    INTERVIEW_FORM_SUMMARY_OPTION, INTERVIEW_FORM_NO_SUMMARY_OPTION
+)
+from app.db.outbox import enqueue_peopleforce_sync
+from app.db.scoring import get_score_summary, apply_pass_thresholds
+from app.db.score_summary import init_score_summaries, add_score_to_summary, rebuild_score_summary, lock_score_summary
+from app.db.membership import is_form_interviewer, add_form_interviewer, remove_form_interviewer
+from app.db.versions import get_interview_form_etag
+from app.db.timestamps import UtcDateTime
+from app.http_cache import is_not_modified, not_modified, validator_headers, REVALIDATE_CACHE_CONTROL
+from app.db.models import InterviewForm, ApplicationTemplate, Interviewer, Score, Evaluation, Feedback, PredefinedPhrase, Question, interviewer_forms
 from pydantic import BaseModel
+import csv
 import datetime
+import io
 
 router = APIRouter(prefix="/api/interviews", tags=["interviews"])
 
@@ -13,16 +33,19 @@ class InterviewFormBase(BaseModel):
     candidate_id: str
     candidate_name: str
     position: str
-    interview_date: datetime.datetime
+    interview_date: UtcDateTime
     template_id: int
 
 class InterviewFormCreate(InterviewFormBase):
     interviewer_ids: List[int] = []
 
+class InterviewFormBulkCreate(BaseModel):
+    forms: List[InterviewFormCreate]
+
 class InterviewFormUpdate(BaseModel):
     candidate_name: Optional[str] = None
     position: Optional[str] = None
-    interview_date: Optional[datetime.datetime] = None
+    interview_date: Optional[UtcDateTime] = None
 
 class InterviewerBase(BaseModel):
     name: str
@@ -46,6 +69,9 @@ class ScoreBase(BaseModel):
 class ScoreCreate(ScoreBase):
     interviewer_id: int
 
+class ScoreBatchCreate(BaseModel):
+    scores: List[ScoreCreate]
+
 class ScoreResponse(ScoreBase):
     id: int
     interviewer_id: int
@@ -67,6 +93,34 @@ class EvaluationResponse(EvaluationBase):
     class Config:
         orm_mode = True
 
+class ScoreAggregate(BaseModel):
+    weighted_sum: float
+    total_weight: float
+    weighted_average: float
+    scores_count: int
+
+class InterviewerScoreSummary(ScoreAggregate):
+    interviewer_id: int
+
+class GroupScoreSummary(ScoreAggregate):
+    group_id: Optional[int] = None
+    threshold: Optional[float] = None
+    passed: Optional[bool] = None
+
+class ScoreSummaryResponse(BaseModel):
+    interview_id: int
+    overall: Optional[ScoreAggregate] = None
+    by_interviewer: List[InterviewerScoreSummary] = []
+    by_group: List[GroupScoreSummary] = []
+
+class EvaluationComputeRequest(BaseModel):
+    minimal_rate: Optional[float] = None  # за замовчуванням - EVALUATION_MINIMAL_RATE
+    group_thresholds: Dict[int, float] = {}  # group_id -> мінімальна зважена оцінка групи
+
+class ComputedEvaluationResponse(BaseModel):
+    evaluation: EvaluationResponse
+    summary: ScoreSummaryResponse
+
 class FeedbackBase(BaseModel):
     text: str
 
@@ -99,6 +153,25 @@ class InterviewFormResponse(InterviewFormBase):
     class Config:
         orm_mode = True
 
+class InterviewScoreSummaryResponse(BaseModel):
+    scores_count: int
+    weighted_sum: float
+    total_weight: float
+    weighted_average: float
+    scored_questions_count: int
+    unscored_questions_count: int
+    question_count: int
+    updated_at: Optional[datetime.datetime] = None
+    
+    class Config:
+        orm_mode = True
+
+class InterviewFormListResponse(InterviewFormResponse):
+    score_summary: Optional[InterviewScoreSummaryResponse] = None
+    
+    class Config:
+        orm_mode = True
+
 class InterviewFormDetailResponse(InterviewFormResponse):
     scores: List[ScoreResponse] = []
     evaluations: List[EvaluationResponse] = []
@@ -108,22 +181,35 @@ class InterviewFormDetailResponse(InterviewFormResponse):
         orm_mode = True
 
 
+async def get_interviewers_by_ids(db: AsyncSession, interviewer_ids: List[int]) -> Dict[int, Interviewer]:
+    """Отримати інтерв'юерів одним запитом; відсутні ідентифікатори повідомляються разом"""
+    unique_ids = list(dict.fromkeys(interviewer_ids))
+    if not unique_ids:
+        return {}
+    
+    result = await db.execute(select(Interviewer).where(Interviewer.id.in_(unique_ids)))
+    interviewers = {interviewer.id: interviewer for interviewer in result.scalars()}
+    
+    missing = [interviewer_id for interviewer_id in unique_ids if interviewer_id not in interviewers]
+    if missing:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Інтерв'юерів з ID {', '.join(map(str, missing))} не знайдено"
+        )
+    return interviewers
+
+
 # Ендпоінти для роботи з формами інтерв'ю
 @router.post("/", response_model=InterviewFormResponse, status_code=status.HTTP_201_CREATED)
-def create_interview_form(form: InterviewFormCreate, db: Session = Depends(get_db)):
+async def create_interview_form(form: InterviewFormCreate, db: AsyncSession = Depends(get_async_db)):
     """Створити нову форму інтерв'ю"""
     # Перевірка існування шаблону
-    template = db.query(ApplicationTemplate).filter(ApplicationTemplate.id == form.template_id).first()
+    template = await db.get(ApplicationTemplate, form.template_id)
     if template is None:
         raise HTTPException(status_code=404, detail="Шаблон не знайдено")
     
     # Перевірка інтерв'юерів
-    interviewers = []
-    for interviewer_id in form.interviewer_ids:
-        interviewer = db.query(Interviewer).filter(Interviewer.id == interviewer_id).first()
-        if interviewer is None:
-            raise HTTPException(status_code=404, detail=f"Інтерв'юера з ID {interviewer_id} не знайдено")
-        interviewers.append(interviewer)
+    interviewers = await get_interviewers_by_ids(db, form.interviewer_ids)
     
     # Створення форми інтерв'ю
     db_form = InterviewForm(
@@ -135,51 +221,237 @@ def create_interview_form(form: InterviewFormCreate, db: Session = Depends(get_d
     )
     
     # Додавання інтерв'юерів
-    for interviewer in interviewers:
+    for interviewer in interviewers.values():
         db_form.interviewers.append(interviewer)
     
     db.add(db_form)
-    db.commit()
-    db.refresh(db_form)
+    await db.flush()
+    await init_score_summaries(db, [db_form.id])
+    await db.commit()
+    await db.refresh(db_form, attribute_names=["interviewers"])
     return db_form
 
-@router.get("/", response_model=List[InterviewFormResponse])
-def get_interview_forms(
+@router.post("/bulk", response_model=List[InterviewFormResponse], status_code=status.HTTP_201_CREATED)
+async def create_interview_forms_bulk(bulk: InterviewFormBulkCreate, db: AsyncSession = Depends(get_async_db)):
+    """Створити багато форм інтерв'ю в одній транзакції"""
+    if not bulk.forms:
+        return []
+    
+    # Перевірка існування всіх шаблонів одним запитом
+    template_ids = {form.template_id for form in bulk.forms}
+    result = await db.execute(select(ApplicationTemplate.id).where(ApplicationTemplate.id.in_(template_ids)))
+    missing_templates = sorted(template_ids - set(result.scalars()))
+    if missing_templates:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Шаблонів з ID {', '.join(map(str, missing_templates))} не знайдено"
+        )
+    
+    # Перевірка всіх інтерв'юерів одним запитом
+    interviewers = await get_interviewers_by_ids(
+        db, [interviewer_id for form in bulk.forms for interviewer_id in form.interviewer_ids]
+    )
+    
+    # Вставка форм одним запитом; ідентифікатори повертаються в порядку вхідних даних
+    forms_data = [form.dict(exclude={"interviewer_ids"}) for form in bulk.forms]
+    result = await db.execute(
+        insert(InterviewForm).returning(InterviewForm.id, sort_by_parameter_order=True),
+        forms_data
+    )
+    form_ids = result.scalars().all()
+    
+    # Зв'язки інтерв'юерів з формами - один багаторядковий INSERT
+    links = [
+        {"interviewer_id": interviewer_id, "form_id": form_id}
+        for form_id, form in zip(form_ids, bulk.forms)
+        for interviewer_id in dict.fromkeys(form.interviewer_ids)
+    ]
+    if links:
+        await db.execute(insert(interviewer_forms).values(links))
+    
+    await init_score_summaries(db, form_ids)
+    await db.commit()
+    
+    return [
+        {
+            **form_data,
+            "id": form_id,
+            "interviewers": [interviewers[interviewer_id] for interviewer_id in dict.fromkeys(form.interviewer_ids)],
+        }
+        for form_id, form_data, form in zip(form_ids, forms_data, bulk.forms)
+    ]
+
+@router.get("/", response_model=List[InterviewFormListResponse])
+async def get_interview_forms(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     candidate_id: Optional[str] = None,
     position: Optional[str] = None,
-    start_date: Optional[datetime.datetime] = None,
-    end_date: Optional[datetime.datetime] = None,
-    db: Session = Depends(get_db)
+    start_date: Optional[UtcDateTime] = None,
+    end_date: Optional[UtcDateTime] = None,
+    include_summary: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Отримати список форм інтерв'ю з фільтрацією"""
-    query = db.query(InterviewForm)
+    """Отримати список форм інтерв'ю з фільтрацією (include_summary - з підсумками оцінок)"""
+    query = select(InterviewForm).options(
+        *INTERVIEW_FORM_LIST_OPTIONS,
+        INTERVIEW_FORM_SUMMARY_OPTION if include_summary else INTERVIEW_FORM_NO_SUMMARY_OPTION
+    )
     
     # Застосування фільтрів
     if candidate_id:
-        query = query.filter(InterviewForm.candidate_id == candidate_id)
+        query = query.where(InterviewForm.candidate_id == candidate_id)
     if position:
-        query = query.filter(InterviewForm.position.ilike(f"%{position}%"))
+        query = query.where(InterviewForm.position.ilike(f"%{position}%"))
     if start_date:
-        query = query.filter(InterviewForm.interview_date >= start_date)
+        query = query.where(InterviewForm.interview_date >= start_date)
     if end_date:
-        query = query.filter(InterviewForm.interview_date <= end_date)
+        query = query.where(InterviewForm.interview_date <= end_date)
+    
+    result = await db.execute(paginate(query, INTERVIEW_FORM_ORDER, cursor, limit, skip))
+    forms = result.scalars().all()
+    
+    next_cursor = get_next_cursor(forms, INTERVIEW_FORM_ORDER, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return forms
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+# Колонки CSV-експорту: одна форма - один рядок
+EXPORT_CSV_COLUMNS = [
+    "id", "candidate_id", "candidate_name", "position", "interview_date", "template_id",
+    "interviewer_ids", "scores_count", "average_score",
+    "total_score", "minimal_rate", "passed", "feedback",
+]
+
+def build_export_csv_row(form: InterviewForm) -> list:
+    """Плоский рядок CSV; з кількох загальних оцінок береться остання"""
+    evaluation = max(form.evaluations, key=lambda item: item.id) if form.evaluations else None
+    values = [score.value for score in form.scores]
+    return [
+        form.id, form.candidate_id, form.candidate_name, form.position,
+        form.interview_date.isoformat(), form.template_id,
+        ";".join(str(interviewer.id) for interviewer in form.interviewers),
+        len(values),
+        round(sum(values) / len(values), 4) if values else "",
+        evaluation.total_score if evaluation else "",
+        evaluation.minimal_rate if evaluation else "",
+        evaluation.passed if evaluation else "",
+        form.feedback.text if form.feedback else "",
+    ]
+
+async def stream_interview_export(query, export_format: ExportFormat) -> AsyncIterator[str]:
+    """
+    Потоково віддати форми: серверний курсор вибирає лише ID по EXPORT_BATCH_SIZE,
+    а кожна пачка форм зі зв'язками завантажується окремим запитом і після запису
+    видаляється з сесії, тож пам'ять не росте з розміром вибірки.
+    ORM yield_per для самих форм не використовується: разом із selectinload і
+    обробником do_orm_execute (app/db/invalidation.py) він ламає довантаження зв'язків.
+    Генератор відкриває власну сесію, бо відповідь стрімиться вже після виходу з ендпоінта
+    """
+    async with AsyncSessionLocal() as db:
+        id_query = query.with_only_columns(InterviewForm.id)
+        result = await db.stream(id_query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if export_format == ExportFormat.csv:
+            writer.writerow(EXPORT_CSV_COLUMNS)
+        
+        async for rows in result.partitions():
+            ids = [row.id for row in rows]
+            batch = await db.execute(
+                select(InterviewForm).options(*INTERVIEW_FORM_EXPORT_OPTIONS).where(InterviewForm.id.in_(ids))
+            )
+            forms_by_id = {form.id: form for form in batch.scalars().all()}
+            for form_id in ids:
+                # Форму могли видалити після того, як курсор віддав її ID
+                form = forms_by_id.get(form_id)
+                if form is None:
+                    continue
+                if export_format == ExportFormat.csv:
+                    writer.writerow(build_export_csv_row(form))
+                else:
+                    buffer.write(InterviewFormDetailResponse.model_validate(form, from_attributes=True).model_dump_json())
+                    buffer.write("\n")
+            db.expunge_all()
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        
+        # Заголовок CSV для порожнього експорту
+        if buffer.tell():
+            yield buffer.getvalue()
+
+@router.get("/export")
+async def export_interview_forms(
+    format: ExportFormat = ExportFormat.ndjson,
+    candidate_id: Optional[str] = None,
+    position: Optional[str] = None,
+    start_date: Optional[UtcDateTime] = None,
+    end_date: Optional[UtcDateTime] = None
+):
+    """Експорт форм інтерв'ю з оцінками, загальними оцінками та відгуками (NDJSON або CSV)"""
+    query = select(InterviewForm)
     
-    return query.offset(skip).limit(limit).all()
+    # Застосування фільтрів
+    if candidate_id:
+        query = query.where(InterviewForm.candidate_id == candidate_id)
+    if position:
+        query = query.where(InterviewForm.position.ilike(f"%{position}%"))
+    if start_date:
+        query = query.where(InterviewForm.interview_date >= start_date)
+    if end_date:
+        query = query.where(InterviewForm.interview_date <= end_date)
+    query = query.order_by(*INTERVIEW_FORM_ORDER)
+    
+    if format == ExportFormat.csv:
+        media_type, extension = "text/csv; charset=utf-8", "csv"
+    else:
+        media_type, extension = "application/x-ndjson", "ndjson"
+    return StreamingResponse(
+        stream_interview_export(query, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="interviews.{extension}"'}
+    )
 
 @router.get("/{interview_id}", response_model=InterviewFormDetailResponse)
-def get_interview_form(interview_id: int, db: Session = Depends(get_db)):
-    """Отримати форму інтерв'ю за ідентифікатором з деталями"""
-    form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+async def get_interview_form(interview_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    Отримати форму інтерв'ю за ідентифікатором з деталями.
+    Версія форми і її зв'язків перевіряється одним запитом: на збіг If-None-Match - 304 без їх завантаження
+    """
+    etag = await get_interview_form_etag(db, interview_id)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
+    if is_not_modified(request, etag):
+        return not_modified(etag, REVALIDATE_CACHE_CONTROL)
+    
+    result = await db.execute(
+        select(InterviewForm)
+        .options(*INTERVIEW_FORM_DETAIL_OPTIONS)
+        .where(InterviewForm.id == interview_id)
+    )
+    form = result.scalars().first()
     if form is None:
         raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
+    response.headers.update(validator_headers(etag, REVALIDATE_CACHE_CONTROL))
     return form
 
 @router.put("/{interview_id}", response_model=InterviewFormResponse)
-def update_interview_form(interview_id: int, form: InterviewFormUpdate, db: Session = Depends(get_db)):
+async def update_interview_form(interview_id: int, form: InterviewFormUpdate, db: AsyncSession = Depends(get_async_db)):
     """Оновити форму інтерв'ю"""
-    db_form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+    result = await db.execute(
+        select(InterviewForm)
+        .options(*INTERVIEW_FORM_LIST_OPTIONS)
+        .where(InterviewForm.id == interview_id)
+    )
+    db_form = result.scalars().first()
     if db_form is None:
         raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
     
@@ -189,102 +461,122 @@ def update_interview_form(interview_id: int, form: InterviewFormUpdate, db: Sess
         setattr(db_form, key, value)
     
     db_form.updated_at = datetime.datetime.utcnow()
-    db.commit()
-    db.refresh(db_form)
+    await db.commit()
+    await db.refresh(db_form, attribute_names=["interviewers"])
     return db_form
 
 @router.delete("/{interview_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_interview_form(interview_id: int, db: Session = Depends(get_db)):
+async def delete_interview_form(interview_id: int, db: AsyncSession = Depends(get_async_db)):
     """Видалити форму інтерв'ю"""
-    db_form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+    db_form = await db.get(InterviewForm, interview_id)
     if db_form is None:
         raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
     
-    db.delete(db_form)
-    db.commit()
+    await db.delete(db_form)
+    await db.commit()
     return {"detail": "Форму інтерв'ю видалено успішно"}
 
 # Ендпоінти для роботи з інтерв'юерами
 @router.post("/interviewers/", response_model=InterviewerResponse, status_code=status.HTTP_201_CREATED)
-def create_interviewer(interviewer: InterviewerCreate, db: Session = Depends(get_db)):
+async def create_interviewer(interviewer: InterviewerCreate, db: AsyncSession = Depends(get_async_db)):
     """Створити нового інтерв'юера"""
     # Перевірка унікальності email
-    existing = db.query(Interviewer).filter(Interviewer.email == interviewer.email).first()
+    result = await db.execute(select(Interviewer).where(Interviewer.email == interviewer.email))
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Інтерв'юер з таким email вже існує")
     
     db_interviewer = Interviewer(**interviewer.dict())
     db.add(db_interviewer)
-    db.commit()
-    db.refresh(db_interviewer)
+    await db.commit()
+    await db.refresh(db_interviewer)
     return db_interviewer
 
 @router.get("/interviewers/", response_model=List[InterviewerResponse])
-def get_interviewers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_interviewers(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Отримати список інтерв'юерів"""
-    return db.query(Interviewer).offset(skip).limit(limit).all()
+    result = await db.execute(paginate(select(Interviewer), INTERVIEWER_ORDER, cursor, limit, skip))
+    interviewers = result.scalars().all()
+    
+    next_cursor = get_next_cursor(interviewers, INTERVIEWER_ORDER, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return interviewers
 
 @router.post("/{interview_id}/interviewers/{interviewer_id}", response_model=InterviewFormResponse)
-def add_interviewer_to_form(interview_id: int, interviewer_id: int, db: Session = Depends(get_db)):
+async def add_interviewer_to_form(interview_id: int, interviewer_id: int, db: AsyncSession = Depends(get_async_db)):
     """Додати інтерв'юера до форми"""
-    form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+    form = await db.get(InterviewForm, interview_id)
     if form is None:
         raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
     
-    interviewer = db.query(Interviewer).filter(Interviewer.id == interviewer_id).first()
+    interviewer = await db.get(Interviewer, interviewer_id)
     if interviewer is None:
         raise HTTPException(status_code=404, detail="Інтерв'юера не знайдено")
     
-    # Перевірка, що інтерв'юер ще не доданий до форми
-    if interviewer in form.interviewers:
+    # Первинний ключ interviewer_forms сам перевіряє, що інтерв'юер ще не доданий до форми
+    if not await add_form_interviewer(db, interview_id, interviewer_id):
         raise HTTPException(status_code=400, detail="Інтерв'юер вже доданий до цієї форми")
     
-    form.interviewers.append(interviewer)
-    db.commit()
-    db.refresh(form)
+    await db.commit()
+    await db.refresh(form, attribute_names=["interviewers"])
     return form
 
 @router.delete("/{interview_id}/interviewers/{interviewer_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_interviewer_from_form(interview_id: int, interviewer_id: int, db: Session = Depends(get_db)):
+async def remove_interviewer_from_form(interview_id: int, interviewer_id: int, db: AsyncSession = Depends(get_async_db)):
     """Видалити інтерв'юера з форми"""
-    form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+    form = await db.get(InterviewForm, interview_id)
     if form is None:
         raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
     
-    interviewer = db.query(Interviewer).filter(Interviewer.id == interviewer_id).first()
+    interviewer = await db.get(Interviewer, interviewer_id)
     if interviewer is None:
         raise HTTPException(status_code=404, detail="Інтерв'юера не знайдено")
     
-    if interviewer not in form.interviewers:
+    if not await remove_form_interviewer(db, interview_id, interviewer_id):
         raise HTTPException(status_code=404, detail="Інтерв'юер не є учасником цієї форми")
     
-    form.interviewers.remove(interviewer)
-    db.commit()
+    await db.commit()
     return {"detail": "Інтерв'юера видалено з форми успішно"}
 
 # Ендпоінти для роботи з оцінками
 @router.post("/{interview_id}/scores", response_model=ScoreResponse, status_code=status.HTTP_201_CREATED)
-def add_score(interview_id: int, score: ScoreCreate, db: Session = Depends(get_db)):
+async def add_score(interview_id: int, score: ScoreCreate, db: AsyncSession = Depends(get_async_db)):
     """Додати оцінку до форми інтерв'ю"""
     # Перевірка існування форми
-    form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+    form = await db.get(InterviewForm, interview_id)
     if form is None:
         raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
     
-    # Перевірка інтерв'юера
-    interviewer = db.query(Interviewer).filter(Interviewer.id == score.interviewer_id).first()
-    if interviewer is None:
-        raise HTTPException(status_code=404, detail="Інтерв'юера не знайдено")
-    
-    # Перевірка, що інтерв'юер є учасником цієї форми
-    if interviewer not in form.interviewers:
+    # Перевірка, що інтерв'юер є учасником цієї форми (зв'язок існує лише для наявного інтерв'юера)
+    if not await is_form_interviewer(db, interview_id, score.interviewer_id):
+        if await db.get(Interviewer, score.interviewer_id) is None:
+            raise HTTPException(status_code=404, detail="Інтерв'юера не знайдено")
         raise HTTPException(status_code=400, detail="Інтерв'юер не є учасником цієї форми")
     
     # Перевірка питання
-    question = db.query(Question).filter(Question.id == score.question_id).first()
+    question = await db.get(Question, score.question_id)
     if question is None:
         raise HTTPException(status_code=404, detail="Питання не знайдено")
     
+    # Повторне оцінювання - через /scores/batch (upsert)
+    already_scored = await db.scalar(select(exists().where(
+        Score.interview_form_id == interview_id,
+        Score.interviewer_id == score.interviewer_id,
+        Score.question_id == score.question_id
+    )))
+    if already_scored:
+        raise HTTPException(status_code=400, detail="Інтерв'юер вже оцінив це питання")
+    
+    # Підсумок оновлюється до вставки оцінки - у тій самій транзакції
+    await add_score_to_summary(db, form, question, score.value)
+    
     # Створення оцінки
     db_score = Score(
         question_id=score.question_id,
@@ -295,32 +587,106 @@ def add_score(interview_id: int, score: ScoreCreate, db: Session = Depends(get_d
     )
     
     db.add(db_score)
-    db.commit()
-    db.refresh(db_score)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Паралельний запит встиг вставити ту саму оцінку між перевіркою і комітом
+        # (uq_scores_form_interviewer_question); підсумок відкочується разом з нею
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Інтерв'юер вже оцінив це питання")
+    await db.refresh(db_score)
     return db_score
 
+@router.post("/{interview_id}/scores/batch", response_model=List[ScoreResponse])
+async def add_scores_batch(interview_id: int, batch: ScoreBatchCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Додати або оновити (повторне оцінювання) багато оцінок форми одним запитом.
+    Для пари інтерв'юер-питання, що повторюється в пакеті, береться остання оцінка
+    """
+    form = await db.get(InterviewForm, interview_id)
+    if form is None:
+        raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
+    if not batch.scores:
+        return []
+    
+    scores = list({(score.interviewer_id, score.question_id): score for score in batch.scores}.values())
+    
+    # Перевірка всіх питань одним запитом
+    question_ids = {score.question_id for score in scores}
+    result = await db.execute(select(Question.id).where(Question.id.in_(question_ids)))
+    missing_questions = sorted(question_ids - set(result.scalars()))
+    if missing_questions:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Питань з ID {', '.join(map(str, missing_questions))} не знайдено"
+        )
+    
+    # Перевірка участі всіх інтерв'юерів у формі одним запитом
+    interviewer_ids = {score.interviewer_id for score in scores}
+    result = await db.execute(
+        select(interviewer_forms.c.interviewer_id)
+        .where(interviewer_forms.c.form_id == interview_id, interviewer_forms.c.interviewer_id.in_(interviewer_ids))
+    )
+    not_members = sorted(interviewer_ids - set(result.scalars()))
+    if not_members:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Інтерв'юери з ID {', '.join(map(str, not_members))} не є учасниками цієї форми"
+        )
+    
+    # Оцінки форми змінюються під блокуванням її підсумку - так само, як в add_score
+    await lock_score_summary(db, form)
+    
+    # Усі оцінки - один INSERT ... ON CONFLICT DO UPDATE за унікальним ключем (форма, інтерв'юер, питання)
+    now = datetime.datetime.utcnow()
+    stmt = pg_insert(Score).values([
+        {
+            "interview_form_id": interview_id,
+            "interviewer_id": score.interviewer_id,
+            "question_id": score.question_id,
+            "value": score.value,
+            "comment": score.comment,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for score in scores
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Score.interview_form_id, Score.interviewer_id, Score.question_id],
+        set_={"value": stmt.excluded.value, "comment": stmt.excluded.comment, "updated_at": stmt.excluded.updated_at}
+    ).returning(Score)
+    # populate_existing - щоб оцінки, вже завантажені в сесію, отримали нові значення
+    result = await db.execute(stmt.execution_options(populate_existing=True))
+    db_scores = result.scalars().all()
+    
+    # Upsert змінює і додає оцінки, тому підсумок перераховується одним запитом
+    await rebuild_score_summary(db, interview_id)
+    await db.commit()
+    return sorted(db_scores, key=lambda db_score: (db_score.interviewer_id, db_score.question_id))
+
 @router.get("/{interview_id}/scores", response_model=List[ScoreResponse])
-def get_scores(interview_id: int, interviewer_id: Optional[int] = None, db: Session = Depends(get_db)):
+async def get_scores(interview_id: int, interviewer_id: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
     """Отримати оцінки форми інтерв'ю"""
     # Перевірка існування форми
-    form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+    form = await db.get(InterviewForm, interview_id)
     if form is None:
         raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
     
-    query = db.query(Score).filter(Score.interview_form_id == interview_id)
+    query = select(Score).where(Score.interview_form_id == interview_id)
     
     # Фільтрація за інтерв'юером
     if interviewer_id:
-        query = query.filter(Score.interviewer_id == interviewer_id)
+        query = query.where(Score.interviewer_id == interviewer_id)
     
-    return query.all()
+    result = await db.execute(query)
+    return result.scalars().all()
 
 # Ендпоінти для роботи з оцінюванням
 @router.post("/{interview_id}/evaluations", response_model=EvaluationResponse, status_code=status.HTTP_201_CREATED)
-def add_evaluation(interview_id: int, evaluation: EvaluationCreate, db: Session = Depends(get_db)):
+async def add_evaluation(interview_id: int, evaluation: EvaluationCreate, db: AsyncSession = Depends(get_async_db)):
     """Додати загальну оцінку кандидата"""
     # Перевірка існування форми
-    form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+    form = await db.get(InterviewForm, interview_id)
     if form is None:
         raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
     
@@ -333,21 +699,74 @@ def add_evaluation(interview_id: int, evaluation: EvaluationCreate, db: Session
     )
     
     db.add(db_evaluation)
-    db.commit()
-    db.refresh(db_evaluation)
+    # Синхронізація з PeopleForce - через outbox у тій самій транзакції
+    enqueue_peopleforce_sync(db, interview_id)
+    await db.commit()
+    await db.refresh(db_evaluation)
     return db_evaluation
 
+@router.get("/{interview_id}/score-summary", response_model=ScoreSummaryResponse)
+async def get_interview_score_summary(interview_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Зважені підсумки оцінок по інтерв'юерах, групах питань і загалом"""
+    form = await db.get(InterviewForm, interview_id)
+    if form is None:
+        raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
+    
+    return await get_score_summary(db, interview_id)
+
+@router.post("/{interview_id}/evaluations/compute", response_model=ComputedEvaluationResponse, status_code=status.HTTP_201_CREATED)
+async def compute_evaluation(
+    interview_id: int,
+    params: Optional[EvaluationComputeRequest] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Обчислити загальну оцінку на сервері зі зважених оцінок і зберегти її"""
+    params = params or EvaluationComputeRequest()
+    form = await db.get(InterviewForm, interview_id)
+    if form is None:
+        raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
+    
+    summary = await get_score_summary(db, interview_id)
+    if summary["overall"] is None:
+        raise HTTPException(status_code=400, detail="Для цієї форми ще немає оцінок")
+    
+    minimal_rate = params.minimal_rate if params.minimal_rate is not None else settings.EVALUATION_MINIMAL_RATE
+    passed = apply_pass_thresholds(summary, minimal_rate, params.group_thresholds)
+    
+    db_evaluation = Evaluation(
+        total_score=summary["overall"]["weighted_average"],
+        passed=passed,
+        minimal_rate=minimal_rate,
+        interview_form_id=interview_id
+    )
+    db.add(db_evaluation)
+    await db.flush()
+    
+    # Оцінки, з яких обчислено результат, прив'язуються до нього
+    await db.execute(
+        update(Score)
+        .where(Score.interview_form_id == interview_id)
+        .values(evaluation_id=db_evaluation.id)
+        .execution_options(synchronize_session=False)
+    )
+    # Синхронізація з PeopleForce - через outbox у тій самій транзакції
+    enqueue_peopleforce_sync(db, interview_id)
+    await db.commit()
+    
+    return {"evaluation": db_evaluation, "summary": summary}
+
 # Ендпоінти для роботи з відгуками
 @router.post("/{interview_id}/feedback", response_model=FeedbackResponse, status_code=status.HTTP_201_CREATED)
-def add_feedback(interview_id: int, feedback: FeedbackCreate, db: Session = Depends(get_db)):
+async def add_feedback(interview_id: int, feedback: FeedbackCreate, db: AsyncSession = Depends(get_async_db)):
     """Додати відгук про кандидата"""
     # Перевірка існування форми
-    form = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+    form = await db.get(InterviewForm, interview_id)
     if form is None:
         raise HTTPException(status_code=404, detail="Форму інтерв'ю не знайдено")
     
     # Перевірка, що відгук ще не існує
-    existing = db.query(Feedback).filter(Feedback.interview_form_id == interview_id).first()
+    result = await db.execute(select(Feedback).where(Feedback.interview_form_id == interview_id))
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(status_code=400, detail="Відгук для цієї форми вже існує")
     
@@ -359,32 +778,35 @@ def add_feedback(interview_id: int, feedback: FeedbackCreate, db: Session = Depe
     
     # Додавання заготовлених фраз
     for phrase_id in feedback.predefined_phrase_ids:
-        phrase = db.query(PredefinedPhrase).filter(PredefinedPhrase.id == phrase_id).first()
+        phrase = await db.get(PredefinedPhrase, phrase_id)
         if phrase:
             db_feedback.phrases.append(phrase)
     
     db.add(db_feedback)
-    db.commit()
-    db.refresh(db_feedback)
+    # Синхронізація з PeopleForce - через outbox у тій самій транзакції
+    enqueue_peopleforce_sync(db, interview_id)
+    await db.commit()
+    await db.refresh(db_feedback)
     return db_feedback
 
 # Ендпоінти для роботи з заготовленими фразами
 @router.post("/phrases", response_model=PredefinedPhraseResponse, status_code=status.HTTP_201_CREATED)
-def create_phrase(phrase: PredefinedPhraseCreate, db: Session = Depends(get_db)):
+async def create_phrase(phrase: PredefinedPhraseCreate, db: AsyncSession = Depends(get_async_db)):
     """Створити нову заготовлену фразу"""
     db_phrase = PredefinedPhrase(**phrase.dict())
     db.add(db_phrase)
-    db.commit()
-    db.refresh(db_phrase)
+    await db.commit()
+    await db.refresh(db_phrase)
     return db_phrase
 
 @router.get("/phrases", response_model=List[PredefinedPhraseResponse])
-def get_phrases(category: Optional[str] = None, db: Session = Depends(get_db)):
+async def get_phrases(category: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
     """Отримати список заготовлених фраз"""
-    query = db.query(PredefinedPhrase)
+    query = select(PredefinedPhrase)
     
     # Фільтрація за категорією
     if category:
-        query = query.filter(PredefinedPhrase.category == category)
+        query = query.where(PredefinedPhrase.category == category)
     
-    return query.all()
+    result = await db.execute(query)
+    return result.scalars().all()
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.db.database import get_db
-from app.db.models import Question, Unit, DifficultyLevel, SeniorityLevel, QuestionGroup
+from app.db.database import get_async_db
+from app.db.models import Question, Unit, DifficultyLevel, SeniorityLevel, QuestionGroup, template_questions
+from app.db.pagination import paginate, get_next_cursor, QUESTION_ORDER, NEXT_CURSOR_HEADER
+from app.db.search import apply_question_search, SEARCH_MODE_CONTAINS, SEARCH_MODE_FULLTEXT, SEARCH_MODE_FUZZY
+from app.db.question_import import detect_import_format, parse_import_file, import_questions
+from app.db.reference_cache import reference_cache
+from app.db.score_summary import rebuild_question_score_summaries, refresh_question_counts
+from app.config import settings
+from app.db.versions import get_question_etag
+from app.http_cache import etag_matches, is_not_modified, not_modified, validator_headers, REVALIDATE_CACHE_CONTROL
 from pydantic import BaseModel
+from enum import Enum
 import datetime
 
 router = APIRouter(prefix="/api/questions", tags=["questions"])
@@ -19,6 +29,11 @@ class QuestionBase(BaseModel):
     level_id: Optional[int] = None
     group_id: Optional[int] = None
 
+class QuestionSearchMode(str, Enum):
+    contains = SEARCH_MODE_CONTAINS
+    fulltext = SEARCH_MODE_FULLTEXT
+    fuzzy = SEARCH_MODE_FUZZY
+
 class QuestionCreate(QuestionBase):
     pass
 
@@ -36,79 +51,130 @@ class QuestionResponse(QuestionBase):
     class Config:
         orm_mode = True
 
+class QuestionImportError(BaseModel):
+    row: int
+    error: str
+
+class QuestionImportResult(BaseModel):
+    total: int
+    imported: int
+    failed: int
+    errors: List[QuestionImportError] = []
+
 
 # Ендпоінти для роботи з питаннями
 @router.post("/", response_model=QuestionResponse, status_code=status.HTTP_201_CREATED)
-def create_question(question: QuestionCreate, db: Session = Depends(get_db)):
+async def create_question(question: QuestionCreate, db: AsyncSession = Depends(get_async_db)):
     """Створити нове питання"""
     db_question = Question(**question.dict())
     db.add(db_question)
-    db.commit()
-    db.refresh(db_question)
+    await db.commit()
+    await db.refresh(db_question)
     return db_question
 
+@router.post("/import", response_model=QuestionImportResult)
+async def import_questions_file(file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
+    """
+    Масовий імпорт питань з CSV або JSONL.
+    Колонки: text, weight, priority, docs_reference та unit/difficulty/level/group (назва) або *_id
+    """
+    import_format = detect_import_format(file.filename, file.content_type)
+    records = parse_import_file(await file.read(), import_format)
+    return await import_questions(db, records)
+
 @router.get("/", response_model=List[QuestionResponse])
-def get_questions(
+async def get_questions(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     unit_id: Optional[int] = None,
     difficulty_id: Optional[int] = None,
     level_id: Optional[int] = None,
     group_id: Optional[int] = None,
     text_search: Optional[str] = None,
-    db: Session = Depends(get_db)
+    search_mode: QuestionSearchMode = QuestionSearchMode.contains,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Отримати список питань з фільтрацією"""
-    query = db.query(Question)
+    query = select(Question)
     
     # Застосування фільтрів
     if unit_id:
-        query = query.filter(Question.unit_id == unit_id)
+        query = query.where(Question.unit_id == unit_id)
     if difficulty_id:
-        query = query.filter(Question.difficulty_id == difficulty_id)
+        query = query.where(Question.difficulty_id == difficulty_id)
     if level_id:
-        query = query.filter(Question.level_id == level_id)
+        query = query.where(Question.level_id == level_id)
     if group_id:
-        query = query.filter(Question.group_id == group_id)
+        query = query.where(Question.group_id == group_id)
     if text_search:
-        query = query.filter(Question.text.ilike(f"%{text_search}%"))
-        
-    return query.offset(skip).limit(limit).all()
+        query = apply_question_search(query, text_search, search_mode.value)
+    
+    if text_search and search_mode != QuestionSearchMode.contains:
+        # Результати впорядковані за релевантністю - курсор за (created_at, id) тут не застосовується
+        result = await db.execute(query.offset(skip).limit(limit))
+        return result.scalars().all()
+    
+    result = await db.execute(paginate(query, QUESTION_ORDER, cursor, limit, skip))
+    questions = result.scalars().all()
+    
+    next_cursor = get_next_cursor(questions, QUESTION_ORDER, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return questions
 
 @router.get("/{question_id}", response_model=QuestionResponse)
-def get_question(question_id: int, db: Session = Depends(get_db)):
-    """Отримати питання за ідентифікатором"""
-    question = db.query(Question).filter(Question.id == question_id).first()
+async def get_question(question_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Отримати питання за ідентифікатором (умовний GET: If-None-Match / If-Modified-Since)"""
+    question = await db.get(Question, question_id)
     if question is None:
         raise HTTPException(status_code=404, detail="Питання не знайдено")
+    
+    etag = get_question_etag(question)
+    if is_not_modified(request, etag, question.updated_at):
+        return not_modified(etag, REVALIDATE_CACHE_CONTROL, question.updated_at)
+    response.headers.update(validator_headers(etag, REVALIDATE_CACHE_CONTROL, question.updated_at))
     return question
 
 @router.put("/{question_id}", response_model=QuestionResponse)
-def update_question(question_id: int, question: QuestionUpdate, db: Session = Depends(get_db)):
+async def update_question(question_id: int, question: QuestionUpdate, db: AsyncSession = Depends(get_async_db)):
     """Оновити питання"""
-    db_question = db.query(Question).filter(Question.id == question_id).first()
+    db_question = await db.get(Question, question_id)
     if db_question is None:
         raise HTTPException(status_code=404, detail="Питання не знайдено")
     
     # Оновлення тільки наданих полів
     update_data = question.dict(exclude_unset=True)
+    weight_changed = "weight" in update_data and update_data["weight"] != db_question.weight
     for key, value in update_data.items():
         setattr(db_question, key, value)
     
     db_question.updated_at = datetime.datetime.utcnow()
-    db.commit()
-    db.refresh(db_question)
+    if weight_changed:
+        # Зважені суми підсумків форм з оцінками на це питання перераховуються з новою вагою
+        await db.flush()
+        await rebuild_question_score_summaries(db, question_id)
+    await db.commit()
+    await db.refresh(db_question)
     return db_question
 
 @router.delete("/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_question(question_id: int, db: Session = Depends(get_db)):
+async def delete_question(question_id: int, db: AsyncSession = Depends(get_async_db)):
     """Видалити питання"""
-    db_question = db.query(Question).filter(Question.id == question_id).first()
+    db_question = await db.get(Question, question_id)
     if db_question is None:
         raise HTTPException(status_code=404, detail="Питання не знайдено")
     
-    db.delete(db_question)
-    db.commit()
+    # Питання зникає і з шаблонів, тож у підсумках їх форм змінюється кількість питань
+    result = await db.execute(
+        select(template_questions.c.template_id).where(template_questions.c.question_id == question_id)
+    )
+    template_ids = result.scalars().all()
+    await db.delete(db_question)
+    await db.flush()
+    await refresh_question_counts(db, template_ids)
+    await db.commit()
     return {"detail": "Питання видалено успішно"}
 
 # Додаткові моделі для фільтрів
@@ -162,59 +228,74 @@ class QuestionGroupResponse(QuestionGroupBase):
     class Config:
         orm_mode = True
 
+async def get_reference_page(request: Request, response: Response, db: AsyncSession, model, skip: int, limit: int):
+    """Сторінка довідника з кешу з ETag/Cache-Control; 304, якщо клієнт вже має цю версію"""
+    items, content_hash = await reference_cache.get_all(db, model)
+    etag = f'"{content_hash}-{skip}-{limit}"'
+    cache_control = f"public, max-age={settings.REFERENCE_CACHE_MAX_AGE}"
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    
+    response.headers.update(validator_headers(etag, cache_control))
+    return items[skip:skip + limit]
+
 # Ендпоінти для фільтрів
 @router.post("/units/", response_model=UnitResponse, status_code=status.HTTP_201_CREATED)
-def create_unit(unit: UnitCreate, db: Session = Depends(get_db)):
+async def create_unit(unit: UnitCreate, db: AsyncSession = Depends(get_async_db)):
     """Створити новий підрозділ/проект"""
     db_unit = Unit(**unit.dict())
     db.add(db_unit)
-    db.commit()
-    db.refresh(db_unit)
+    await db.commit()
+    reference_cache.invalidate(Unit)
+    await db.refresh(db_unit)
     return db_unit
 
 @router.get("/units/", response_model=List[UnitResponse])
-def get_units(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_units(request: Request, response: Response, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
     """Отримати список підрозділів/проектів"""
-    return db.query(Unit).offset(skip).limit(limit).all()
+    return await get_reference_page(request, response, db, Unit, skip, limit)
 
 @router.post("/difficulties/", response_model=DifficultyResponse, status_code=status.HTTP_201_CREATED)
-def create_difficulty(difficulty: DifficultyCreate, db: Session = Depends(get_db)):
+async def create_difficulty(difficulty: DifficultyCreate, db: AsyncSession = Depends(get_async_db)):
     """Створити новий рівень складності"""
     db_difficulty = DifficultyLevel(**difficulty.dict())
     db.add(db_difficulty)
-    db.commit()
-    db.refresh(db_difficulty)
+    await db.commit()
+    reference_cache.invalidate(DifficultyLevel)
+    await db.refresh(db_difficulty)
     return db_difficulty
 
 @router.get("/difficulties/", response_model=List[DifficultyResponse])
-def get_difficulties(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_difficulties(request: Request, response: Response, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
     """Отримати список рівнів складності"""
-    return db.query(DifficultyLevel).offset(skip).limit(limit).all()
+    return await get_reference_page(request, response, db, DifficultyLevel, skip, limit)
 
 @router.post("/seniority-levels/", response_model=SeniorityResponse, status_code=status.HTTP_201_CREATED)
-def create_seniority(seniority: SeniorityCreate, db: Session = Depends(get_db)):
+async def create_seniority(seniority: SeniorityCreate, db: AsyncSession = Depends(get_async_db)):
     """Створити новий рівень позиції"""
     db_seniority = SeniorityLevel(**seniority.dict())
     db.add(db_seniority)
-    db.commit()
-    db.refresh(db_seniority)
+    await db.commit()
+    reference_cache.invalidate(SeniorityLevel)
+    await db.refresh(db_seniority)
     return db_seniority
 
 @router.get("/seniority-levels/", response_model=List[SeniorityResponse])
-def get_seniority_levels(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_seniority_levels(request: Request, response: Response, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
     """Отримати список рівнів позиції"""
-    return db.query(SeniorityLevel).offset(skip).limit(limit).all()
+    return await get_reference_page(request, response, db, SeniorityLevel, skip, limit)
 
 @router.post("/groups/", response_model=QuestionGroupResponse, status_code=status.HTTP_201_CREATED)
-def create_group(group: QuestionGroupCreate, db: Session = Depends(get_db)):
+async def create_group(group: QuestionGroupCreate, db: AsyncSession = Depends(get_async_db)):
     """Створити нову групу питань"""
     db_group = QuestionGroup(**group.dict())
     db.add(db_group)
-    db.commit()
-    db.refresh(db_group)
+    await db.commit()
+    reference_cache.invalidate(QuestionGroup)
+    await db.refresh(db_group)
     return db_group
 
 @router.get("/groups/", response_model=List[QuestionGroupResponse])
-def get_groups(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_groups(request: Request, response: Response, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
     """Отримати список груп питань"""
-    return db.query(QuestionGroup).offset(skip).limit(limit).all()
+    return await get_reference_page(request, response, db, QuestionGroup, skip, limit)
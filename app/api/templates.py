@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from sqlalchemy import select, insert, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
-from app.db.database import get_db
-from app.db.models import ApplicationTemplate, Question, QuestionList
+from app.db.database import get_async_db
+from app.db.pagination import paginate, get_next_cursor, TEMPLATE_ORDER, NEXT_CURSOR_HEADER
+from app.db.models import ApplicationTemplate, Question, QuestionList, template_questions
+from app.db.versions import get_template_etag
+from app.db.template_sheet import get_template_sheet
+from app.db.score_summary import refresh_question_counts
+from app.http_cache import is_not_modified, not_modified, validator_headers, REVALIDATE_CACHE_CONTROL
 from pydantic import BaseModel
 import datetime
 
@@ -43,48 +51,119 @@ class TemplateDetailResponse(TemplateResponse):
     class Config:
         orm_mode = True
 
+class SheetReference(BaseModel):
+    id: int
+    name: str
+
+class SheetGroup(SheetReference):
+    subject: str
+
+class SheetQuestion(BaseModel):
+    id: int
+    text: str
+    weight: float
+    priority: int
+    docs_reference: Optional[str] = None
+    group: Optional[SheetGroup] = None
+    difficulty: Optional[SheetReference] = None
+    level: Optional[SheetReference] = None
+    unit: Optional[SheetReference] = None
+
+class TemplateSheetResponse(BaseModel):
+    template_id: int
+    name: str
+    description: Optional[str] = None
+    position: str
+    updated_at: Optional[datetime.datetime] = None
+    questions: List[SheetQuestion] = []
+
+def build_template_detail(template: ApplicationTemplate, question_ids: List[int]) -> TemplateDetailResponse:
+    """Сформувати детальну відповідь шаблону зі списком ідентифікаторів питань"""
+    data = TemplateResponse.model_validate(template, from_attributes=True).model_dump()
+    return TemplateDetailResponse(**data, questions=question_ids)
+
 # Ендпоінти для роботи з шаблонами
 @router.post("/", response_model=TemplateResponse, status_code=status.HTTP_201_CREATED)
-def create_template(template: TemplateCreate, db: Session = Depends(get_db)):
+async def create_template(template: TemplateCreate, db: AsyncSession = Depends(get_async_db)):
     """Створити новий шаблон"""
     db_template = ApplicationTemplate(**template.dict())
     db.add(db_template)
-    db.commit()
-    db.refresh(db_template)
+    await db.commit()
+    await db.refresh(db_template)
     return db_template
 
 @router.get("/", response_model=List[TemplateResponse])
-def get_templates(
+async def get_templates(
+    response: Response,
     skip: int = 0, 
     limit: int = 100,
+    cursor: Optional[str] = None,
     position: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Отримати список шаблонів з фільтрацією"""
-    query = db.query(ApplicationTemplate)
+    query = select(ApplicationTemplate)
     
     # Застосування фільтрів
     if position:
-        query = query.filter(ApplicationTemplate.position.ilike(f"%{position}%"))
+        query = query.where(ApplicationTemplate.position.ilike(f"%{position}%"))
         
-    return query.offset(skip).limit(limit).all()
+    result = await db.execute(paginate(query, TEMPLATE_ORDER, cursor, limit, skip))
+    templates = result.scalars().all()
+    
+    next_cursor = get_next_cursor(templates, TEMPLATE_ORDER, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return templates
 
 @router.get("/{template_id}", response_model=TemplateDetailResponse)
-def get_template(template_id: int, db: Session = Depends(get_db)):
-    """Отримати шаблон за ідентифікатором з питаннями"""
-    template = db.query(ApplicationTemplate).filter(ApplicationTemplate.id == template_id).first()
+async def get_template(template_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    Отримати шаблон за ідентифікатором з питаннями.
+    Спочатку перевіряється лише версія шаблону: на збіг If-None-Match - 304 без завантаження питань
+    """
+    etag = await get_template_etag(db, template_id)
+    if etag is None:
+        raise HTTPException(status_code=404, detail="Шаблон не знайдено")
+    if is_not_modified(request, etag):
+        return not_modified(etag, REVALIDATE_CACHE_CONTROL)
+    
+    result = await db.execute(
+        select(ApplicationTemplate)
+        .options(selectinload(ApplicationTemplate.questions))
+        .where(ApplicationTemplate.id == template_id)
+    )
+    template = result.scalars().first()
     if template is None:
         raise HTTPException(status_code=404, detail="Шаблон не знайдено")
     
     # Додати список ідентифікаторів питань
-    result = TemplateDetailResponse.from_orm(template)
-    result.questions = [q.id for q in template.questions]
-    return result
+    response.headers.update(validator_headers(etag, REVALIDATE_CACHE_CONTROL))
+    return build_template_detail(template, [q.id for q in template.questions])
+
+@router.get("/{template_id}/sheet", response_model=TemplateSheetResponse)
+async def get_template_sheet_endpoint(template_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Лист співбесіди: шаблон з усіма питаннями та їхніми групами, складністю, рівнем і вагою
+    замість окремого запиту на кожне питання. JSON віддається з кешу, поки не змінилися шаблон або питання
+    """
+    sheet = await get_template_sheet(db, template_id)
+    if sheet is None:
+        raise HTTPException(status_code=404, detail="Шаблон не знайдено")
+    
+    content, etag = sheet
+    if is_not_modified(request, etag):
+        return not_modified(etag, REVALIDATE_CACHE_CONTROL)
+    return Response(
+        content=content,
+        media_type="application/json",
+        headers=validator_headers(etag, REVALIDATE_CACHE_CONTROL)
+    )
 
 @router.put("/{template_id}", response_model=TemplateResponse)
-def update_template(template_id: int, template: TemplateUpdate, db: Session = Depends(get_db)):
+async def update_template(template_id: int, template: TemplateUpdate, db: AsyncSession = Depends(get_async_db)):
     """Оновити шаблон"""
-    db_template = db.query(ApplicationTemplate).filter(ApplicationTemplate.id == template_id).first()
+    db_template = await db.get(ApplicationTemplate, template_id)
     if db_template is None:
         raise HTTPException(status_code=404, detail="Шаблон не знайдено")
     
@@ -94,51 +173,68 @@ def update_template(template_id: int, template: TemplateUpdate, db: Session = De
         setattr(db_template, key, value)
     
     db_template.updated_at = datetime.datetime.utcnow()
-    db.commit()
-    db.refresh(db_template)
+    await db.commit()
+    await db.refresh(db_template)
     return db_template
 
 @router.delete("/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_template(template_id: int, db: Session = Depends(get_db)):
+async def delete_template(template_id: int, db: AsyncSession = Depends(get_async_db)):
     """Видалити шаблон"""
-    db_template = db.query(ApplicationTemplate).filter(ApplicationTemplate.id == template_id).first()
+    db_template = await db.get(ApplicationTemplate, template_id)
     if db_template is None:
         raise HTTPException(status_code=404, detail="Шаблон не знайдено")
     
-    db.delete(db_template)
-    db.commit()
+    await db.delete(db_template)
+    await db.commit()
     return {"detail": "Шаблон видалено успішно"}
 
 @router.post("/{template_id}/questions", response_model=TemplateDetailResponse)
-def add_questions_to_template(template_id: int, questions_list: TemplateQuestionsList, db: Session = Depends(get_db)):
+async def add_questions_to_template(template_id: int, questions_list: TemplateQuestionsList, db: AsyncSession = Depends(get_async_db)):
     """Додати питання до шаблону"""
-    db_template = db.query(ApplicationTemplate).filter(ApplicationTemplate.id == template_id).first()
+    db_template = await db.get(ApplicationTemplate, template_id)
     if db_template is None:
         raise HTTPException(status_code=404, detail="Шаблон не знайдено")
     
-    # Перевірка існування питань і додавання їх до шаблону
-    for question_id in questions_list.questions:
-        question = db.query(Question).filter(Question.id == question_id).first()
-        if question is None:
-            raise HTTPException(status_code=404, detail=f"Питання з ID {question_id} не знайдено")
-        db_template.questions.append(question)
-    
-    db.commit()
-    db.refresh(db_template)
+    # Перевірка існування всіх питань одним запитом
+    question_ids = list(dict.fromkeys(questions_list.questions))
+    if question_ids:
+        result = await db.execute(select(Question.id).where(Question.id.in_(question_ids)))
+        existing_ids = set(result.scalars())
+        missing = [question_id for question_id in question_ids if question_id not in existing_ids]
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Питання з ID {', '.join(map(str, missing))} не знайдено"
+            )
+        
+        # Додавання зв'язків одним запитом; вже додані питання пропускаються
+        await db.execute(
+            pg_insert(template_questions)
+            .values([{"template_id": template_id, "question_id": question_id} for question_id in question_ids])
+            .on_conflict_do_nothing()
+        )
+        await refresh_question_counts(db, [template_id])
+        await db.commit()
     
     # Підготувати відповідь
-    result = TemplateDetailResponse.from_orm(db_template)
-    result.questions = [q.id for q in db_template.questions]
-    return result
+    result = await db.execute(
+        select(template_questions.c.question_id).where(template_questions.c.template_id == template_id)
+    )
+    return build_template_detail(db_template, result.scalars().all())
 
 @router.delete("/{template_id}/questions/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_question_from_template(template_id: int, question_id: int, db: Session = Depends(get_db)):
+async def remove_question_from_template(template_id: int, question_id: int, db: AsyncSession = Depends(get_async_db)):
     """Видалити питання з шаблону"""
-    db_template = db.query(ApplicationTemplate).filter(ApplicationTemplate.id == template_id).first()
+    result = await db.execute(
+        select(ApplicationTemplate)
+        .options(selectinload(ApplicationTemplate.questions))
+        .where(ApplicationTemplate.id == template_id)
+    )
+    db_template = result.scalars().first()
     if db_template is None:
         raise HTTPException(status_code=404, detail="Шаблон не знайдено")
     
-    question = db.query(Question).filter(Question.id == question_id).first()
+    question = await db.get(Question, question_id)
     if question is None:
         raise HTTPException(status_code=404, detail=f"Питання з ID {question_id} не знайдено")
     
@@ -146,26 +242,48 @@ def remove_question_from_template(template_id: int, question_id: int, db: Sessio
         raise HTTPException(status_code=404, detail=f"Питання з ID {question_id} не знайдено в цьому шаблоні")
     
     db_template.questions.remove(question)
-    db.commit()
+    await db.flush()
+    await refresh_question_counts(db, [template_id])
+    await db.commit()
     
     return {"detail": "Питання видалено з шаблону успішно"}
 
 @router.post("/{template_id}/clone", response_model=TemplateResponse)
-def clone_template(template_id: int, template_data: TemplateCreate, db: Session = Depends(get_db)):
+async def clone_template(
+    template_id: int,
+    template_data: TemplateCreate,
+    include_question_lists: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
     """Клонувати шаблон з новим іменем та позицією"""
-    source_template = db.query(ApplicationTemplate).filter(ApplicationTemplate.id == template_id).first()
+    source_template = await db.get(ApplicationTemplate, template_id)
     if source_template is None:
         raise HTTPException(status_code=404, detail="Шаблон для клонування не знайдено")
     
     # Створення нового шаблону
     new_template = ApplicationTemplate(**template_data.dict())
     db.add(new_template)
-    db.flush()
+    await db.flush()
+    
+    # Копіювання питань зі старого шаблону на стороні бази даних (INSERT ... SELECT)
+    await db.execute(
+        insert(template_questions).from_select(
+            ["template_id", "question_id"],
+            select(literal(new_template.id), template_questions.c.question_id)
+            .where(template_questions.c.template_id == template_id)
+        )
+    )
     
-    # Копіювання питань зі старого шаблону
-    for question in source_template.questions:
-        new_template.questions.append(question)
+    # Копіювання списків питань
+    if include_question_lists:
+        await db.execute(
+            insert(QuestionList).from_select(
+                ["template_id", "unit_id"],
+                select(literal(new_template.id), QuestionList.unit_id)
+                .where(QuestionList.template_id == template_id)
+            )
+        )
     
-    db.commit()
-    db.refresh(new_template)
+    await db.commit()
+    await db.refresh(new_template)
     return new_template
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires_at: float
+    stale_until: float
+    etag: Optional[str] = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class TTLCache:
+    """
+    In-process LRU-кеш з обмеженим розміром і TTL для кожного запису.
+    Після закінчення TTL запис ще stale_ttl секунд доступний як застарілий
+    (stale-while-revalidate), після чого видаляється.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: float = 300, stale_ttl: float = 0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._background_tasks: Dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """Запис кешу (свіжий або застарілий) чи None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.monotonic() >= entry.stale_until:
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Лише свіже значення"""
+        entry = self.get_entry(key)
+        if entry is None or not entry.is_fresh:
+            return default
+        return entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, etag: Optional[str] = None) -> CacheEntry:
+        now = time.monotonic()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        entry = CacheEntry(value=value, expires_at=expires_at, stale_until=expires_at + self.stale_ttl, etag=etag)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return entry
+
+    def delete(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refresh_in_background(self, key: Hashable, refresh: Callable[[], Awaitable[Any]]):
+        """Запустити оновлення запису у фоні; для одного ключа одночасно виконується лише одне оновлення"""
+        if key in self._background_tasks:
+            return
+        task = asyncio.create_task(refresh())
+        self._background_tasks[key] = task
+        task.add_done_callback(lambda finished: self._finish_background(key, finished))
+
+    def _finish_background(self, key: Hashable, task: asyncio.Task):
+        self._background_tasks.pop(key, None)
+        # Після невдалого фонового оновлення запис просто лишається застарілим
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Фонове оновлення кешу для %r не вдалося: %r", key, task.exception())
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
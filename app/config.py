@@ -7,6 +7,20 @@ class Settings(BaseSettings):
     APP_NAME: str = "Interview Service"
     APP_VERSION: str = "1.0.0"
     
+    # Сервер (gunicorn.conf.py): воркери Uvicorn під gunicorn.
+    # WEB_CONCURRENCY=0 - по воркеру на доступне ядро. Кожен воркер має власний пул
+    # з'єднань, тож до бази відкривається до WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    PORT: int = int(os.getenv("PORT", "8000"))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "0"))
+    # Перезапуск воркера після стількох запитів (0 - без перезапуску); jitter розносить перезапуски в часі
+    SERVER_MAX_REQUESTS: int = int(os.getenv("SERVER_MAX_REQUESTS", "1000"))
+    SERVER_MAX_REQUESTS_JITTER: int = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "100"))
+    SERVER_TIMEOUT: int = int(os.getenv("SERVER_TIMEOUT", "60"))  # секунди без відповіді від воркера
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))  # секунди на завершення запитів
+    SERVER_KEEPALIVE: int = int(os.getenv("SERVER_KEEPALIVE", "5"))  # секунди
+    # Звідки довіряти X-Forwarded-* (проксі Railway)
+    SERVER_FORWARDED_ALLOW_IPS: str = os.getenv("SERVER_FORWARDED_ALLOW_IPS", "*")
+    
     # База даних
     POSTGRES_USER: str = os.getenv("POSTGRES_USER", "postgres")
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
@@ -14,9 +28,67 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "interview_service")
     
+    # Пул з'єднань з базою даних
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # секунди, -1 - без перестворення
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Режим сумісності з PgBouncer (transaction pooling): NullPool без власного пулу
+    DB_USE_NULL_POOL: bool = os.getenv("DB_USE_NULL_POOL", "false").lower() == "true"
+    # Скільки з'єднань відкрити у фоні після старту (0 - лише ліниво, при першому запиті)
+    DB_WARMUP_CONNECTIONS: int = int(os.getenv("DB_WARMUP_CONNECTIONS", "0"))
+    
     # PeopleForce API
     PEOPLEFORCE_API_URL: str = os.getenv("PEOPLEFORCE_API_URL", "https://api.peopleforce.io")
     PEOPLEFORCE_API_KEY: Optional[str] = os.getenv("PEOPLEFORCE_API_KEY")
+    # HTTP-клієнт PeopleForce (один на весь час роботи додатку)
+    PEOPLEFORCE_TIMEOUT: float = float(os.getenv("PEOPLEFORCE_TIMEOUT", "10"))
+    PEOPLEFORCE_CONNECT_TIMEOUT: float = float(os.getenv("PEOPLEFORCE_CONNECT_TIMEOUT", "5"))
+    PEOPLEFORCE_MAX_CONNECTIONS: int = int(os.getenv("PEOPLEFORCE_MAX_CONNECTIONS", "100"))
+    PEOPLEFORCE_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("PEOPLEFORCE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    PEOPLEFORCE_KEEPALIVE_EXPIRY: float = float(os.getenv("PEOPLEFORCE_KEEPALIVE_EXPIRY", "30"))
+    PEOPLEFORCE_HTTP2: bool = os.getenv("PEOPLEFORCE_HTTP2", "true").lower() == "true"
+    # Кеш кандидатів PeopleForce (секунди / кількість записів)
+    PEOPLEFORCE_CACHE_MAX_SIZE: int = int(os.getenv("PEOPLEFORCE_CACHE_MAX_SIZE", "5000"))
+    PEOPLEFORCE_CACHE_TTL: float = float(os.getenv("PEOPLEFORCE_CACHE_TTL", "300"))
+    PEOPLEFORCE_CACHE_NEGATIVE_TTL: float = float(os.getenv("PEOPLEFORCE_CACHE_NEGATIVE_TTL", "60"))
+    PEOPLEFORCE_CACHE_STALE_TTL: float = float(os.getenv("PEOPLEFORCE_CACHE_STALE_TTL", "600"))
+    # Масова синхронізація з PeopleForce
+    PEOPLEFORCE_SYNC_CONCURRENCY: int = int(os.getenv("PEOPLEFORCE_SYNC_CONCURRENCY", "5"))
+    PEOPLEFORCE_MAX_RETRIES: int = int(os.getenv("PEOPLEFORCE_MAX_RETRIES", "3"))  # повтори після 429
+    PEOPLEFORCE_RETRY_AFTER_MAX: float = float(os.getenv("PEOPLEFORCE_RETRY_AFTER_MAX", "60"))  # секунди
+    
+    # Поріг проходження за замовчуванням для автоматично обчисленої загальної оцінки
+    EVALUATION_MINIMAL_RATE: float = float(os.getenv("EVALUATION_MINIMAL_RATE", "3"))
+    
+    # Кеш довідників: TTL у процесі та max-age для браузерів/CDN (секунди)
+    REFERENCE_CACHE_TTL: float = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+    REFERENCE_CACHE_MAX_AGE: int = int(os.getenv("REFERENCE_CACHE_MAX_AGE", "300"))
+    
+    # Кеш листів співбесіди (GET /api/templates/{id}/sheet); ключ містить версію шаблону і питань
+    TEMPLATE_SHEET_CACHE_TTL: float = float(os.getenv("TEMPLATE_SHEET_CACHE_TTL", "3600"))
+    TEMPLATE_SHEET_CACHE_MAX_SIZE: int = int(os.getenv("TEMPLATE_SHEET_CACHE_MAX_SIZE", "256"))
+    
+    # Кеш результатів аналітики (очищується при записі в scores/evaluations/interview_forms)
+    ANALYTICS_CACHE_TTL: float = float(os.getenv("ANALYTICS_CACHE_TTL", "300"))  # секунди
+    ANALYTICS_CACHE_MAX_SIZE: int = int(os.getenv("ANALYTICS_CACHE_MAX_SIZE", "256"))
+    
+    # Потоковий експорт: кількість рядків, що вибираються з серверного курсора за раз
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+    
+    # Імпорт питань: кількість рядків в одному INSERT
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+    
+    # Диспетчер outbox (python -m app.outbox_dispatcher)
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+    OUTBOX_POLL_INTERVAL: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))  # секунди
+    OUTBOX_LEASE_SECONDS: float = float(os.getenv("OUTBOX_LEASE_SECONDS", "120"))
+    # Час на відправку пачки (секунди); обмежується 3/4 оренди, щоб результати встигли записатися
+    OUTBOX_SEND_TIMEOUT: float = float(os.getenv("OUTBOX_SEND_TIMEOUT", "90"))
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+    OUTBOX_BACKOFF_BASE: float = float(os.getenv("OUTBOX_BACKOFF_BASE", "2"))  # секунди
+    OUTBOX_BACKOFF_MAX: float = float(os.getenv("OUTBOX_BACKOFF_MAX", "900"))  # секунди
 
     # JWT Secret для автентифікації
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key")
@@ -1,17 +1,75 @@
-from sqlalchemy import create_engine
+import asyncio
+import logging
+from uuid import uuid4
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.config import settings
+from app.db.pool_metrics import TimedQueuePool, TimedAsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
 
 # Створення URL-з'єднання з базою даних
 SQLALCHEMY_DATABASE_URL = f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
 
+# URL-з'єднання для асинхронного драйвера (asyncpg)
+SQLALCHEMY_ASYNC_DATABASE_URL = f"postgresql+asyncpg://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_HOST}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+
+# Параметри пулу з'єднань
+def get_engine_options(is_async: bool = False) -> dict:
+    if settings.DB_USE_NULL_POOL:
+        # PgBouncer сам керує пулом; підготовлені запити asyncpg несумісні з transaction pooling:
+        # кеші вимкнені, а унікальні імена не дають зіткнутися запитам різних клієнтів на одному з'єднанні
+        options = {"poolclass": NullPool}
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+    
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 # Створення екземпляра движка бази даних
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **get_engine_options())
+
+# Створення екземпляра асинхронного движка бази даних
+async_engine = create_async_engine(SQLALCHEMY_ASYNC_DATABASE_URL, **get_engine_options(is_async=True))
 
 # Створення класу сесії
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Створення класу асинхронної сесії
+# expire_on_commit=False: після commit об'єкти не повинні робити неявних (лінивих) запитів,
+# які в асинхронному режимі неможливі
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession)
+
+async def warm_up_pool(connections: int):
+    """
+    Заздалегідь відкрити з'єднання асинхронного пулу. Викликається у фоні після старту:
+    недоступна база лише записується в лог, а не зупиняє запуск воркера
+    """
+    async def _connect():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    # З'єднання відкриваються одночасно, тож кожне - окреме з'єднання пулу
+    results = await asyncio.gather(*(_connect() for _ in range(connections)), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors:
+        logger.warning("Не вдалося відкрити %s з %s з'єднань з базою даних: %s", len(errors), connections, errors[0])
+
 # Базовий клас для всіх моделей
 Base = declarative_base()
 
@@ -22,3 +80,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Отримання асинхронного з'єднання з базою даних
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,50 @@
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Інвалідація in-process кешів при записі в таблиці.
+# Сесія накопичує назви змінених таблиць (ORM flush та ORM-запити insert/update/delete),
+# а після успішного коміту викликає зареєстровані обробники. Відкат нічого не інвалідує.
+
+_CHANGED_TABLES_KEY = "changed_tables"
+
+_listeners: Dict[str, List[Callable[[], None]]] = defaultdict(list)
+
+
+def on_tables_changed(tables: Iterable[str], callback: Callable[[], None]):
+    """Викликати callback після коміту, що змінив будь-яку з таблиць"""
+    for table in tables:
+        _listeners[table].append(callback)
+
+
+def _mark_changed(session: Session, table_names: Iterable[str]):
+    session.info.setdefault(_CHANGED_TABLES_KEY, set()).update(table_names)
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_flushed_tables(session, flush_context, instances):
+    objects = list(session.new) + list(session.dirty) + list(session.deleted)
+    _mark_changed(session, {obj.__table__.name for obj in objects if hasattr(obj, "__table__")})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None and getattr(table, "name", None):
+            _mark_changed(orm_execute_state.session, [table.name])
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_listeners(session):
+    changed = session.info.pop(_CHANGED_TABLES_KEY, set())
+    callbacks = {callback for table in changed for callback in _listeners.get(table, ())}
+    for callback in callbacks:
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session):
+    session.info.pop(_CHANGED_TABLES_KEY, None)
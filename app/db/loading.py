@@ -0,0 +1,43 @@
+from sqlalchemy.orm import joinedload, noload, raiseload, selectinload
+from app.db.models import InterviewForm, Feedback
+
+# Стратегії завантаження зв'язків форми інтерв'ю під конкретні відповіді API.
+# Колекції завантажуються через selectinload (один IN-запит на колекцію для всієї сторінки),
+# а зв'язок один-до-одного (feedback) - через JOIN в основному запиті.
+
+# Список форм (InterviewFormResponse): 2 запити на будь-яку кількість рядків
+INTERVIEW_FORM_LIST_OPTIONS = (
+    selectinload(InterviewForm.interviewers),
+)
+
+# Підсумок оцінок у списку форм: окремий запит за первинним ключем замість JOIN з оцінками,
+# а без ?include_summary - без запиту взагалі
+INTERVIEW_FORM_SUMMARY_OPTION = selectinload(InterviewForm.score_summary)
+INTERVIEW_FORM_NO_SUMMARY_OPTION = noload(InterviewForm.score_summary)
+
+# Деталі форми (InterviewFormDetailResponse): 4 запити.
+# raiseload("*") перетворює будь-яке незапланове ліниве завантаження на помилку замість N+1
+INTERVIEW_FORM_DETAIL_OPTIONS = (
+    joinedload(InterviewForm.feedback),
+    selectinload(InterviewForm.interviewers),
+    selectinload(InterviewForm.scores),
+    selectinload(InterviewForm.evaluations),
+    raiseload("*"),
+)
+
+# Потоковий експорт: пачка форм за списком ID, по одному IN-запиту на кожен зв'язок
+INTERVIEW_FORM_EXPORT_OPTIONS = (
+    selectinload(InterviewForm.feedback),
+    selectinload(InterviewForm.interviewers),
+    selectinload(InterviewForm.scores),
+    selectinload(InterviewForm.evaluations),
+    raiseload("*"),
+)
+
+# Синхронізація з PeopleForce: усе, що потрапляє в нотатки кандидата, для будь-якої кількості форм
+INTERVIEW_FORM_SYNC_OPTIONS = (
+    joinedload(InterviewForm.feedback).selectinload(Feedback.phrases),
+    selectinload(InterviewForm.interviewers),
+    selectinload(InterviewForm.evaluations),
+    raiseload("*"),
+)
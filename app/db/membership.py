@@ -0,0 +1,37 @@
+from sqlalchemy import delete, exists, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import interviewer_forms
+
+# Участь інтерв'юера у формі перевіряється і змінюється прямо в interviewer_forms
+# за первинним ключем (interviewer_id, form_id) - без завантаження InterviewForm.interviewers
+
+
+async def is_form_interviewer(db: AsyncSession, interview_id: int, interviewer_id: int) -> bool:
+    """EXISTS за первинним ключем interviewer_forms"""
+    return await db.scalar(select(exists().where(
+        interviewer_forms.c.form_id == interview_id,
+        interviewer_forms.c.interviewer_id == interviewer_id
+    )))
+
+
+async def add_form_interviewer(db: AsyncSession, interview_id: int, interviewer_id: int) -> bool:
+    """Додати зв'язок (без коміту); False - якщо інтерв'юер вже є учасником форми"""
+    result = await db.execute(
+        pg_insert(interviewer_forms)
+        .values(form_id=interview_id, interviewer_id=interviewer_id)
+        .on_conflict_do_nothing()
+        .returning(interviewer_forms.c.form_id)
+    )
+    return result.first() is not None
+
+
+async def remove_form_interviewer(db: AsyncSession, interview_id: int, interviewer_id: int) -> bool:
+    """Видалити зв'язок (без коміту); False - якщо інтерв'юер не був учасником форми"""
+    result = await db.execute(
+        delete(interviewer_forms).where(
+            interviewer_forms.c.form_id == interview_id,
+            interviewer_forms.c.interviewer_id == interviewer_id
+        )
+    )
+    return result.rowcount > 0
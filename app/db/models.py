@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Table, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Table, Text, DateTime, Index, Computed, DDL, event, JSON
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 import datetime
 
 Base = declarative_base()
@@ -19,6 +20,8 @@ interviewer_forms = Table(
     Base.metadata,
     Column('interviewer_id', Integer, ForeignKey('interviewers.id'), primary_key=True),
     Column('form_id', Integer, ForeignKey('interview_forms.id'), primary_key=True),
+    # Первинний ключ (interviewer_id, form_id) не покриває пошук інтерв'юерів за формою
+    Index('ix_interviewer_forms_form_id', 'form_id'),
 )
 
 class Unit(Base):
@@ -74,11 +77,19 @@ class Question(Base):
     docs_reference = Column(Text, nullable=True)
     priority = Column(Integer, default=1, nullable=False)
     
+    # Повнотекстовий пошук: вектор обчислюється базою даних (generated column).
+    # deferred - щоб не передавати його з кожним рядком у звичайних запитах
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('simple', coalesce(text, ''))", persisted=True)
+    ))
+    
     # Зовнішні ключі
+    # unit_id покривається складеним індексом ix_questions_unit_id_level_id_difficulty_id
     unit_id = Column(Integer, ForeignKey('units.id'), nullable=True)
-    difficulty_id = Column(Integer, ForeignKey('difficulty_levels.id'), nullable=True)
-    level_id = Column(Integer, ForeignKey('seniority_levels.id'), nullable=True)
-    group_id = Column(Integer, ForeignKey('question_groups.id'), nullable=True)
+    difficulty_id = Column(Integer, ForeignKey('difficulty_levels.id'), nullable=True, index=True)
+    level_id = Column(Integer, ForeignKey('seniority_levels.id'), nullable=True, index=True)
+    group_id = Column(Integer, ForeignKey('question_groups.id'), nullable=True, index=True)
     
     # Відношення
     unit = relationship("Unit", back_populates="questions")
@@ -89,6 +100,18 @@ class Question(Base):
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_questions_unit_id_level_id_difficulty_id', 'unit_id', 'level_id', 'difficulty_id'),
+        # Keyset-пагінація за (created_at, id)
+        Index('ix_questions_created_at_id', 'created_at', 'id'),
+        Index('ix_questions_search_vector', 'search_vector', postgresql_using='gin'),
+        # Триграмний індекс для нечіткого пошуку та ILIKE '%...%'
+        Index('ix_questions_text_trgm', 'text', postgresql_using='gin', postgresql_ops={'text': 'gin_trgm_ops'}),
+    )
+
+# Розширення pg_trgm потрібне для триграмного індексу при створенні таблиць через create_all
+event.listen(Question.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
 
 class ApplicationTemplate(Base):
     """Шаблон форми для співбесіди"""
@@ -106,6 +129,11 @@ class ApplicationTemplate(Base):
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        # Keyset-пагінація за (created_at, id)
+        Index('ix_application_templates_created_at_id', 'created_at', 'id'),
+    )
 
 class QuestionList(Base):
     """Список питань у шаблоні"""
@@ -136,13 +164,18 @@ class Interviewer(Base):
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        # Keyset-пагінація за (created_at, id)
+        Index('ix_interviewers_created_at_id', 'created_at', 'id'),
+    )
 
 class InterviewForm(Base):
     """Форма для проведення співбесіди з конкретним кандидатом"""
     __tablename__ = 'interview_forms'
     
     id = Column(Integer, primary_key=True)
-    candidate_id = Column(String(100), nullable=False)  # ID кандидата з PeopleForce
+    candidate_id = Column(String(100), nullable=False, index=True)  # ID кандидата з PeopleForce
     candidate_name = Column(String(100), nullable=False)
     position = Column(String(100), nullable=False)
     interview_date = Column(DateTime, nullable=False)
@@ -156,21 +189,31 @@ class InterviewForm(Base):
     scores = relationship("Score", back_populates="interview_form")
     evaluations = relationship("Evaluation", back_populates="interview_form")
     feedback = relationship("Feedback", back_populates="interview_form", uselist=False)
+    score_summary = relationship(
+        "InterviewScoreSummary", back_populates="interview_form", uselist=False,
+        cascade="all, delete-orphan", passive_deletes=True
+    )
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        # Фільтр за датою та keyset-пагінація за (interview_date, id)
+        Index('ix_interview_forms_interview_date_id', 'interview_date', 'id'),
+    )
 
 class Score(Base):
     """Оцінка на питання від інтерв'юера"""
     __tablename__ = 'scores'
     
     id = Column(Integer, primary_key=True)
-    question_id = Column(Integer, ForeignKey('questions.id'), nullable=False)
+    question_id = Column(Integer, ForeignKey('questions.id'), nullable=False, index=True)
     value = Column(Float, nullable=False)  # Числова оцінка
     comment = Column(Text, nullable=True)
     
     # Зовнішні ключі
-    interviewer_id = Column(Integer, ForeignKey('interviewers.id'), nullable=False)
+    # interview_form_id покривається унікальним індексом uq_scores_form_interviewer_question
+    interviewer_id = Column(Integer, ForeignKey('interviewers.id'), nullable=False, index=True)
     interview_form_id = Column(Integer, ForeignKey('interview_forms.id'), nullable=False)
     evaluation_id = Column(Integer, ForeignKey('evaluations.id'), nullable=True)
     
@@ -181,6 +224,41 @@ class Score(Base):
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        # Одна оцінка інтерв'юера на питання в межах форми; ключ upsert при повторному оцінюванні.
+        # Префікс (interview_form_id, interviewer_id) обслуговує вибірку оцінок форми та інтерв'юера
+        Index('uq_scores_form_interviewer_question', 'interview_form_id', 'interviewer_id', 'question_id', unique=True),
+    )
+
+class InterviewScoreSummary(Base):
+    """
+    Денормалізований підсумок оцінок форми для списків і дашбордів.
+    Оновлюється інкрементально при додаванні оцінки, без перерахунку scores JOIN questions.
+    Зміна ваги питання перераховує підсумки форм з його оцінками, а зміна складу шаблону -
+    question_count його форм (app/db/score_summary.py)
+    """
+    __tablename__ = 'interview_score_summary'
+    
+    interview_form_id = Column(Integer, ForeignKey('interview_forms.id', ondelete='CASCADE'), primary_key=True)
+    scores_count = Column(Integer, nullable=False, default=0)
+    weighted_sum = Column(Float, nullable=False, default=0.0)  # сума value * Question.weight
+    total_weight = Column(Float, nullable=False, default=0.0)
+    scored_questions_count = Column(Integer, nullable=False, default=0)  # питань з хоча б однією оцінкою
+    question_count = Column(Integer, nullable=False, default=0)  # питань у шаблоні форми
+    
+    # Відношення
+    interview_form = relationship("InterviewForm", back_populates="score_summary")
+    
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    
+    @property
+    def weighted_average(self) -> float:
+        return round(self.weighted_sum / self.total_weight, 4) if self.total_weight else 0.0
+    
+    @property
+    def unscored_questions_count(self) -> int:
+        return max(self.question_count - self.scored_questions_count, 0)
 
 class Evaluation(Base):
     """Загальна оцінка кандидата"""
@@ -192,7 +270,7 @@ class Evaluation(Base):
     minimal_rate = Column(Float, nullable=False)  # Мінімально необхідне значення для проходження
     
     # Зовнішні ключі
-    interview_form_id = Column(Integer, ForeignKey('interview_forms.id'), nullable=False)
+    interview_form_id = Column(Integer, ForeignKey('interview_forms.id'), nullable=False, index=True)
     
     # Відношення
     interview_form = relationship("InterviewForm", back_populates="evaluations")
@@ -209,7 +287,7 @@ class Feedback(Base):
     text = Column(Text, nullable=False)
     
     # Зовнішні ключі
-    interview_form_id = Column(Integer, ForeignKey('interview_forms.id'), nullable=False)
+    interview_form_id = Column(Integer, ForeignKey('interview_forms.id'), nullable=False, index=True)
     
     # Відношення
     interview_form = relationship("InterviewForm", back_populates="feedback")
@@ -234,3 +312,31 @@ class PredefinedPhrase(Base):
     
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+class OutboxMessage(Base):
+    """
+    Повідомлення transactional outbox для записів у PeopleForce.
+    Пишеться в тій самій транзакції, що й зміни Evaluation/Feedback, і відправляється окремим диспетчером
+    """
+    __tablename__ = 'outbox_messages'
+    
+    id = Column(Integer, primary_key=True)
+    event_type = Column(String(50), nullable=False)  # peopleforce.sync_interview
+    payload = Column(JSON, nullable=False)
+    idempotency_key = Column(String(100), nullable=False, unique=True)
+    status = Column(String(20), nullable=False, default='pending')  # pending, processing, sent, dead
+    attempts = Column(Integer, nullable=False, default=0)
+    # Час наступної спроби; для processing - кінець оренди, після якого повідомлення знову доступне
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    # Масова синхронізація (POST /sync/bulk): стан задачі - це стан її повідомлень
+    job_id = Column(String(32), nullable=True, index=True)
+    
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+    
+    __table_args__ = (
+        # Вибірка диспетчером: status IN (...) AND next_attempt_at <= now ORDER BY id
+        Index('ix_outbox_messages_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
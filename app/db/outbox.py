@@ -0,0 +1,117 @@
+import datetime
+import random
+import uuid
+from typing import Iterable, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.db.models import OutboxMessage
+
+# Стани повідомлення outbox
+OUTBOX_PENDING = "pending"
+OUTBOX_PROCESSING = "processing"
+OUTBOX_SENT = "sent"
+OUTBOX_DEAD = "dead"
+
+# Типи подій
+PEOPLEFORCE_SYNC_INTERVIEW = "peopleforce.sync_interview"
+
+
+def enqueue_peopleforce_sync(db: AsyncSession, interview_form_id: int, job_id: Optional[str] = None) -> OutboxMessage:
+    """
+    Додати в сесію повідомлення про синхронізацію форми з PeopleForce.
+    Не комітить: повідомлення зберігається разом зі змінами, які його спричинили.
+    job_id групує повідомлення масової синхронізації, щоб її стан міг віддати будь-який воркер
+    """
+    message = OutboxMessage(
+        event_type=PEOPLEFORCE_SYNC_INTERVIEW,
+        payload={"interview_form_id": interview_form_id},
+        idempotency_key=f"{PEOPLEFORCE_SYNC_INTERVIEW}:{interview_form_id}:{uuid.uuid4().hex}",
+        status=OUTBOX_PENDING,
+        attempts=0,
+        next_attempt_at=datetime.datetime.utcnow(),
+        job_id=job_id
+    )
+    db.add(message)
+    return message
+
+
+async def get_job_messages(db: AsyncSession, job_id: str) -> List[OutboxMessage]:
+    """Повідомлення масової синхронізації в порядку постановки в чергу"""
+    result = await db.execute(
+        select(OutboxMessage).where(OutboxMessage.job_id == job_id).order_by(OutboxMessage.id)
+    )
+    return list(result.scalars().all())
+
+
+async def claim_outbox_batch(db: AsyncSession, batch_size: int) -> List[OutboxMessage]:
+    """
+    Забрати пачку готових до відправки повідомлень.
+    FOR UPDATE SKIP LOCKED дозволяє кільком диспетчерам працювати паралельно, а оренда
+    (next_attempt_at для processing) повертає в чергу повідомлення диспетчера, що впав
+    """
+    now = datetime.datetime.utcnow()
+    claimable = (
+        select(OutboxMessage.id)
+        .where(
+            OutboxMessage.status.in_((OUTBOX_PENDING, OUTBOX_PROCESSING)),
+            OutboxMessage.next_attempt_at <= now
+        )
+        .order_by(OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(claimable))
+        .values(
+            status=OUTBOX_PROCESSING,
+            attempts=OutboxMessage.attempts + 1,
+            next_attempt_at=now + datetime.timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+            updated_at=now
+        )
+        .returning(OutboxMessage)
+        .execution_options(synchronize_session=False)
+    )
+    messages = sorted(result.scalars().all(), key=lambda message: message.id)
+    await db.commit()
+    return messages
+
+
+async def mark_outbox_sent(db: AsyncSession, message_ids: Iterable[int]):
+    """Позначити повідомлення відправленими (без коміту)"""
+    now = datetime.datetime.utcnow()
+    await db.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(list(message_ids)))
+        .values(status=OUTBOX_SENT, sent_at=now, last_error=None, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def get_backoff_delay(attempts: int) -> float:
+    """Експоненційна затримка з невеликим джитером, щоб повтори не йшли одночасно"""
+    delay = min(settings.OUTBOX_BACKOFF_BASE * 2 ** max(attempts - 1, 0), settings.OUTBOX_BACKOFF_MAX)
+    return delay + random.uniform(0, delay * 0.1)
+
+
+async def mark_outbox_failed(db: AsyncSession, message: OutboxMessage, error: str, permanent: bool = False):
+    """
+    Запланувати повтор з backoff або перевести повідомлення в dead-letter
+    (постійна помилка чи вичерпані спроби). Без коміту
+    """
+    now = datetime.datetime.utcnow()
+    if permanent or message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        values = {"status": OUTBOX_DEAD}
+    else:
+        values = {
+            "status": OUTBOX_PENDING,
+            "next_attempt_at": now + datetime.timedelta(seconds=get_backoff_delay(message.attempts))
+        }
+    await db.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id == message.id)
+        .values(last_error=error[:2000], updated_at=now, **values)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,78 @@
+import base64
+import datetime
+import json
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, Integer, tuple_
+from app.db.models import Question, ApplicationTemplate, InterviewForm, Interviewer
+from app.db.timestamps import to_naive_utc
+
+# Заголовок відповіді з курсором наступної сторінки
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Ключі сортування списків (кожен закінчується унікальним id)
+QUESTION_ORDER = (Question.created_at, Question.id)
+TEMPLATE_ORDER = (ApplicationTemplate.created_at, ApplicationTemplate.id)
+INTERVIEW_FORM_ORDER = (InterviewForm.interview_date, InterviewForm.id)
+INTERVIEWER_ORDER = (Interviewer.created_at, Interviewer.id)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Закодувати значення ключа сортування останнього рядка в непрозорий курсор"""
+    payload = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+# Межі колонки Integer (int4 у PostgreSQL)
+INTEGER_MIN, INTEGER_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def _decode_cursor_value(column, value: Any) -> Any:
+    """Привести значення з курсора до типу колонки; ValueError/TypeError для невідповідних значень"""
+    if isinstance(column.type, DateTime):
+        return to_naive_utc(datetime.datetime.fromisoformat(value))
+    if isinstance(column.type, Integer):
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise TypeError(value)
+        value = int(value)
+        if not INTEGER_MIN <= value <= INTEGER_MAX:
+            raise ValueError(value)
+        return value
+    if not isinstance(value, column.type.python_type):
+        raise TypeError(value)
+    return value
+
+
+def decode_cursor(cursor: str, order_columns: Sequence[Any]) -> List[Any]:
+    """Розкодувати курсор у значення колонок сортування (кожне перевіряється за типом колонки)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(order_columns):
+            raise ValueError(cursor)
+        return [_decode_cursor_value(column, value) for column, value in zip(order_columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Некоректний курсор пагінації")
+
+
+def paginate(query, order_columns: Sequence[Any], cursor: Optional[str], limit: int, skip: int = 0):
+    """
+    Keyset-пагінація: сортування за order_columns і продовження після курсора.
+    Порівняння кортежів (a, b) > (:a, :b) використовує складений індекс, тому
+    вартість сторінки не залежить від її глибини. Без курсора підтримується skip.
+    """
+    if cursor:
+        values = decode_cursor(cursor, order_columns)
+        query = query.where(tuple_(*order_columns) > tuple_(*values))
+    elif skip:
+        query = query.offset(skip)
+    return query.order_by(*order_columns).limit(limit)
+
+
+def get_next_cursor(items: Sequence[Any], order_columns: Sequence[Any], limit: int) -> Optional[str]:
+    """Курсор наступної сторінки або None, якщо сторінка остання"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, column.key) for column in order_columns])
@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+
+class PoolStats:
+    """
+    Накопичувальна статистика очікування з'єднань з пулу
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, wait_seconds: float, timed_out: bool = False):
+        """Зареєструвати одну спробу отримання з'єднання"""
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / attempts, 6) if attempts else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+# Статистика зберігається окремо від пулу, бо пул перестворюється при dispose()
+_stats: Dict[str, PoolStats] = {}
+
+
+def get_pool_stats(name: str) -> PoolStats:
+    """Отримати (або створити) статистику пулу за назвою движка"""
+    if name not in _stats:
+        _stats[name] = PoolStats()
+    return _stats[name]
+
+
+class _TimedCheckoutMixin:
+    """
+    Вимірює час отримання з'єднання в _do_get - саме тут пул блокується,
+    коли всі з'єднання (pool_size + max_overflow) зайняті, або відкриває нове
+    """
+
+    stats_name = "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            get_pool_stats(self.stats_name).observe(time.perf_counter() - start, timed_out=True)
+            raise
+        get_pool_stats(self.stats_name).observe(time.perf_counter() - start)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    stats_name = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    stats_name = "async"
+
+
+def describe_pool(name: str, pool) -> Dict[str, Any]:
+    """Поточний стан пулу з'єднань разом з накопиченою статистикою очікування"""
+    if isinstance(pool, NullPool):
+        # NullPool (режим PgBouncer) не тримає з'єднань - насичення не має сенсу
+        return {"pool_class": "NullPool"}
+
+    size = pool.size()
+    max_overflow = pool._max_overflow if pool._max_overflow > 0 else 0
+    checked_out = pool.checkedout()
+    capacity = size + max_overflow
+    result = {
+        "pool_class": type(pool).__name__,
+        "size": size,
+        "max_overflow": max_overflow,
+        "checked_in": pool.checkedin(),
+        "checked_out": checked_out,
+        # overflow() від'ємний, поки пул не заповнений до pool_size
+        "overflow": max(pool.overflow(), 0),
+        "saturation": round(checked_out / capacity, 4) if capacity else 0.0,
+    }
+    result.update(get_pool_stats(name).snapshot())
+    return result
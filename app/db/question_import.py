@@ -0,0 +1,143 @@
+import csv
+import io
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.db.models import Question, Unit, DifficultyLevel, SeniorityLevel, QuestionGroup
+
+IMPORT_FORMAT_CSV = "csv"
+IMPORT_FORMAT_JSONL = "jsonl"
+
+# Довідники, що можна вказати назвою: (поле з назвою, поле з ID, модель, назва довідника)
+REFERENCE_FIELDS = (
+    ("unit", "unit_id", Unit, "підрозділ"),
+    ("difficulty", "difficulty_id", DifficultyLevel, "рівень складності"),
+    ("level", "level_id", SeniorityLevel, "рівень кваліфікації"),
+    ("group", "group_id", QuestionGroup, "група питань"),
+)
+
+
+def detect_import_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """Формат файлу за розширенням, а якщо його немає - за Content-Type"""
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return IMPORT_FORMAT_CSV
+    if name.endswith((".jsonl", ".ndjson")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return IMPORT_FORMAT_JSONL
+    raise HTTPException(status_code=400, detail="Підтримуються лише файли CSV та JSONL")
+
+
+def parse_import_file(content: bytes, import_format: str) -> List[Tuple[int, Any]]:
+    """Розібрати файл у список (номер рядка у файлі, запис)"""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Файл має бути в кодуванні UTF-8")
+
+    if import_format == IMPORT_FORMAT_CSV:
+        reader = csv.DictReader(io.StringIO(text))
+        # Перший рядок - заголовок, тому рядки даних нумеруються з 2
+        return [
+            (reader.line_num, {key.strip(): value for key, value in row.items() if key})
+            for row in reader
+        ]
+
+    records = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            records.append((line_number, json.loads(line)))
+        except ValueError as e:
+            records.append((line_number, e))
+    return records
+
+
+async def load_reference_lookups(db: AsyncSession) -> Dict[str, Tuple[Dict[str, int], set]]:
+    """Мапи назва -> ID (без урахування регістру) та множини ID для всіх довідників, по запиту на довідник"""
+    lookups = {}
+    for name_field, _, model, _ in REFERENCE_FIELDS:
+        result = await db.execute(select(model.id, model.name))
+        rows = result.all()
+        lookups[name_field] = ({name.strip().lower(): id for id, name in rows}, {id for id, _ in rows})
+    return lookups
+
+
+def _empty(value: Any) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def build_question_values(record: Any, lookups: Dict[str, Tuple[Dict[str, int], set]]) -> Dict[str, Any]:
+    """Перетворити запис файлу на значення колонок Question; ValueError з описом помилки"""
+    if isinstance(record, ValueError):
+        raise ValueError(f"Некоректний JSON: {record}")
+    if not isinstance(record, dict):
+        raise ValueError("Рядок має бути JSON-об'єктом")
+
+    text = record.get("text")
+    if _empty(text) or not isinstance(text, str):
+        raise ValueError("Текст питання обов'язковий")
+
+    values = {"text": text.strip()}
+    try:
+        values["weight"] = 1.0 if _empty(record.get("weight")) else float(record["weight"])
+    except (TypeError, ValueError):
+        raise ValueError(f"Некоректна вага: {record.get('weight')!r}")
+    try:
+        values["priority"] = 1 if _empty(record.get("priority")) else int(record["priority"])
+    except (TypeError, ValueError):
+        raise ValueError(f"Некоректний пріоритет: {record.get('priority')!r}")
+    docs_reference = record.get("docs_reference")
+    values["docs_reference"] = None if _empty(docs_reference) else str(docs_reference)
+
+    for name_field, id_field, _, label in REFERENCE_FIELDS:
+        ids_by_name, ids = lookups[name_field]
+        if not _empty(record.get(id_field)):
+            try:
+                reference_id = int(record[id_field])
+            except (TypeError, ValueError):
+                raise ValueError(f"Некоректний {id_field}: {record[id_field]!r}")
+            if reference_id not in ids:
+                raise ValueError(f"Не знайдено ({label}) з ID {reference_id}")
+            values[id_field] = reference_id
+        elif not _empty(record.get(name_field)):
+            name = str(record[name_field]).strip()
+            if name.lower() not in ids_by_name:
+                raise ValueError(f"Не знайдено ({label}): '{name}'")
+            values[id_field] = ids_by_name[name.lower()]
+        else:
+            values[id_field] = None
+    return values
+
+
+async def import_questions(db: AsyncSession, records: List[Tuple[int, Any]]) -> Dict[str, Any]:
+    """
+    Імпортувати питання: довідники резолвляться за назвою через мапу в пам'яті,
+    коректні рядки вставляються пачками по IMPORT_CHUNK_SIZE в одній транзакції,
+    некоректні - пропускаються і потрапляють у звіт з номером рядка
+    """
+    lookups = await load_reference_lookups(db)
+
+    rows = []
+    errors = []
+    for line_number, record in records:
+        try:
+            rows.append(build_question_values(record, lookups))
+        except ValueError as e:
+            errors.append({"row": line_number, "error": str(e)})
+
+    chunk_size = settings.IMPORT_CHUNK_SIZE
+    for start in range(0, len(rows), chunk_size):
+        await db.execute(insert(Question), rows[start:start + chunk_size])
+    await db.commit()
+
+    return {
+        "total": len(records),
+        "imported": len(rows),
+        "failed": len(errors),
+        "errors": errors,
+    }
@@ -0,0 +1,45 @@
+import hashlib
+import json
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
+from app.config import settings
+
+
+class ReferenceDataCache:
+    """
+    In-process кеш довідників (units, difficulty_levels, seniority_levels, question_groups).
+    Таблиця кешується цілком під ключем (таблиця, версія); invalidate() піднімає версію,
+    тож завантаження, що почалося до зміни, вже не буде прочитане.
+    TTL обмежує застарілість у процесах, які про зміну не дізналися
+    """
+
+    def __init__(self, ttl: float):
+        self._cache = TTLCache(max_size=64, ttl=ttl)
+        self._versions: Dict[str, int] = defaultdict(int)
+
+    async def get_all(self, db: AsyncSession, model) -> Tuple[List[Dict[str, Any]], str]:
+        """Усі рядки довідника (впорядковані за id) і хеш їхнього вмісту для ETag"""
+        key = (model.__tablename__, self._versions[model.__tablename__])
+        entry = self._cache.get(key)
+        if entry is None:
+            result = await db.execute(select(model).order_by(model.id))
+            columns = [column.key for column in model.__table__.columns]
+            items = [{column: getattr(row, column) for column in columns} for row in result.scalars()]
+            # Хеш вмісту, а не номер версії: однаковий у всіх процесах для однакових даних
+            digest = hashlib.sha1(json.dumps(items, default=str, sort_keys=True).encode()).hexdigest()[:20]
+            entry = (items, digest)
+            self._cache.set(key, entry)
+        return entry
+
+    def invalidate(self, model):
+        self._versions[model.__tablename__] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._cache.stats(), "versions": dict(self._versions)}
+
+
+reference_cache = ReferenceDataCache(ttl=settings.REFERENCE_CACHE_TTL)
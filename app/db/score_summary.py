@@ -0,0 +1,160 @@
+import datetime
+from typing import Iterable
+
+from sqlalchemy import case, exists, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import InterviewForm, InterviewScoreSummary, Question, Score, template_questions
+
+
+def _question_count(template_id):
+    """Скалярний підзапит: кількість питань у шаблоні (за первинним ключем template_questions)"""
+    return (
+        select(func.count())
+        .select_from(template_questions)
+        .where(template_questions.c.template_id == template_id)
+        .scalar_subquery()
+    )
+
+
+async def init_score_summaries(db: AsyncSession, form_ids: Iterable[int]):
+    """Створити порожні підсумки для нових форм (без коміту)"""
+    form_ids = list(form_ids)
+    if not form_ids:
+        return
+    await db.execute(
+        pg_insert(InterviewScoreSummary)
+        .from_select(
+            ["interview_form_id", "question_count"],
+            select(InterviewForm.id, _question_count(InterviewForm.template_id))
+            .where(InterviewForm.id.in_(form_ids))
+        )
+        .on_conflict_do_nothing()
+    )
+
+
+async def lock_score_summary(db: AsyncSession, form: InterviewForm):
+    """
+    Заблокувати рядок підсумку форми до кінця транзакції (SELECT ... FOR UPDATE), за потреби створивши його.
+    Оцінки форми змінюються по черзі: наступний запит у READ COMMITTED бачить уже закомічені оцінки
+    """
+    lock = (
+        select(InterviewScoreSummary.interview_form_id)
+        .where(InterviewScoreSummary.interview_form_id == form.id)
+        .with_for_update()
+    )
+    if await db.scalar(lock) is None:
+        await init_score_summaries(db, [form.id])
+        await db.scalar(lock)
+
+
+async def add_score_to_summary(db: AsyncSession, form: InterviewForm, question: Question, value: float):
+    """
+    Інкрементально врахувати нову оцінку в підсумку форми (без коміту).
+    Викликається до вставки самої оцінки: EXISTS визначає, чи питання оцінюється вперше.
+    EXISTS виконується вже після блокування рядка підсумку, інакше дві перші оцінки
+    одного питання від різних інтерв'юерів не бачать одна одну і питання рахується двічі
+    """
+    await lock_score_summary(db, form)
+    already_scored = exists().where(
+        Score.interview_form_id == form.id,
+        Score.question_id == question.id
+    )
+    stmt = pg_insert(InterviewScoreSummary).values(
+        interview_form_id=form.id,
+        scores_count=1,
+        weighted_sum=value * question.weight,
+        total_weight=question.weight,
+        scored_questions_count=case((already_scored, 0), else_=1),
+        question_count=_question_count(form.template_id),
+        updated_at=datetime.datetime.utcnow()
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[InterviewScoreSummary.interview_form_id],
+            set_={
+                "scores_count": InterviewScoreSummary.scores_count + 1,
+                "weighted_sum": InterviewScoreSummary.weighted_sum + stmt.excluded.weighted_sum,
+                "total_weight": InterviewScoreSummary.total_weight + stmt.excluded.total_weight,
+                "scored_questions_count": InterviewScoreSummary.scored_questions_count + stmt.excluded.scored_questions_count,
+                # Кількість питань шаблону оновлюється заодно, якщо шаблон змінився
+                "question_count": stmt.excluded.question_count,
+                "updated_at": stmt.excluded.updated_at,
+            }
+        )
+    )
+
+
+async def _rebuild_score_summaries(db: AsyncSession, forms_filter):
+    """Повністю перерахувати підсумки форм, що відповідають умові, з таблиці scores (без коміту)"""
+    totals = (
+        select(
+            InterviewForm.id.label("interview_form_id"),
+            func.count(Score.id).label("scores_count"),
+            func.coalesce(func.sum(Score.value * Question.weight), 0.0).label("weighted_sum"),
+            func.coalesce(func.sum(Question.weight), 0.0).label("total_weight"),
+            func.count(func.distinct(Score.question_id)).label("scored_questions_count"),
+            _question_count(InterviewForm.template_id).label("question_count"),
+            func.now().op("AT TIME ZONE")("utc").label("updated_at"),
+        )
+        .select_from(InterviewForm)
+        .outerjoin(Score, Score.interview_form_id == InterviewForm.id)
+        .outerjoin(Question, Question.id == Score.question_id)
+        .where(forms_filter)
+        .group_by(InterviewForm.id)
+    )
+    columns = [
+        "interview_form_id", "scores_count", "weighted_sum", "total_weight",
+        "scored_questions_count", "question_count", "updated_at",
+    ]
+    stmt = pg_insert(InterviewScoreSummary).from_select(columns, totals)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[InterviewScoreSummary.interview_form_id],
+            set_={column: getattr(stmt.excluded, column) for column in columns[1:]}
+        )
+    )
+
+
+async def rebuild_score_summary(db: AsyncSession, interview_id: int):
+    """
+    Повністю перерахувати підсумок форми з таблиці scores (без коміту) - для змін,
+    які не зводяться до додавання оцінки (оновлення чи видалення оцінок).
+    Перерахунок іде після блокування рядка підсумку і бачить оцінки паралельних транзакцій
+    """
+    form = await db.get(InterviewForm, interview_id)
+    if form is None:
+        return
+    await lock_score_summary(db, form)
+    await _rebuild_score_summaries(db, InterviewForm.id == interview_id)
+
+
+async def rebuild_question_score_summaries(db: AsyncSession, question_id: int):
+    """
+    Перерахувати підсумки всіх форм з оцінками на питання після зміни його ваги (без коміту).
+    Нова вага читається з бази, тож зміна питання має бути вже записана (flush)
+    """
+    scored_forms = select(Score.interview_form_id).where(Score.question_id == question_id)
+    await _rebuild_score_summaries(db, InterviewForm.id.in_(scored_forms))
+
+
+async def refresh_question_counts(db: AsyncSession, template_ids: Iterable[int]):
+    """
+    Оновити кількість питань у підсумках форм шаблонів після зміни складу шаблону (без коміту).
+    Оцінки не перераховуються: вони не залежать від складу шаблону
+    """
+    template_ids = list(template_ids)
+    if not template_ids:
+        return
+    await db.execute(
+        update(InterviewScoreSummary)
+        .where(
+            InterviewScoreSummary.interview_form_id == InterviewForm.id,
+            InterviewForm.template_id.in_(template_ids)
+        )
+        .values(
+            question_count=_question_count(InterviewForm.template_id),
+            updated_at=datetime.datetime.utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,83 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import Score, Question
+
+# Значення GROUPING(interviewer_id, group_id) для кожного набору групування
+_BY_INTERVIEWER = 1
+_BY_GROUP = 2
+_OVERALL = 3
+
+
+def _aggregate(row) -> Dict[str, Any]:
+    weighted_sum = float(row.weighted_sum or 0)
+    total_weight = float(row.total_weight or 0)
+    return {
+        "weighted_sum": round(weighted_sum, 4),
+        "total_weight": round(total_weight, 4),
+        "weighted_average": round(weighted_sum / total_weight, 4) if total_weight else 0.0,
+        "scores_count": row.scores_count,
+    }
+
+
+async def get_score_summary(db: AsyncSession, interview_id: int) -> Dict[str, Any]:
+    """
+    Зважені підсумки оцінок форми (value * Question.weight) по інтерв'юерах, по групах питань
+    і загалом - одним запитом GROUP BY GROUPING SETS, без вивантаження окремих оцінок
+    """
+    query = (
+        select(
+            Score.interviewer_id,
+            Question.group_id,
+            func.grouping(Score.interviewer_id, Question.group_id).label("grouping"),
+            func.sum(Score.value * Question.weight).label("weighted_sum"),
+            func.sum(Question.weight).label("total_weight"),
+            func.count(Score.id).label("scores_count"),
+        )
+        .join(Question, Question.id == Score.question_id)
+        .where(Score.interview_form_id == interview_id)
+        .group_by(func.grouping_sets(
+            tuple_(Score.interviewer_id),
+            tuple_(Question.group_id),
+            tuple_(),
+        ))
+    )
+    result = await db.execute(query)
+
+    summary = {
+        "interview_id": interview_id,
+        "overall": None,
+        "by_interviewer": [],
+        "by_group": [],
+    }
+    for row in result.all():
+        if row.grouping == _OVERALL:
+            # Загальний підсумок повертається і для форми без оцінок - з нульовою кількістю
+            if row.scores_count:
+                summary["overall"] = _aggregate(row)
+        elif row.grouping == _BY_INTERVIEWER:
+            summary["by_interviewer"].append({"interviewer_id": row.interviewer_id, **_aggregate(row)})
+        elif row.grouping == _BY_GROUP:
+            summary["by_group"].append({"group_id": row.group_id, **_aggregate(row)})
+
+    summary["by_interviewer"].sort(key=lambda item: item["interviewer_id"])
+    summary["by_group"].sort(key=lambda item: (item["group_id"] is None, item["group_id"] or 0))
+    return summary
+
+
+def apply_pass_thresholds(summary: Dict[str, Any], minimal_rate: float, group_thresholds: Optional[Dict[int, float]] = None) -> bool:
+    """
+    Позначити групи відносно їхніх порогів і визначити результат: загальна зважена оцінка
+    має бути не нижчою за minimal_rate, а кожна група з порогом - не нижчою за свій поріг
+    """
+    group_thresholds = group_thresholds or {}
+    passed = summary["overall"] is not None and summary["overall"]["weighted_average"] >= minimal_rate
+
+    for group in summary["by_group"]:
+        threshold = group_thresholds.get(group["group_id"])
+        group["threshold"] = threshold
+        group["passed"] = None if threshold is None else group["weighted_average"] >= threshold
+        if group["passed"] is False:
+            passed = False
+    return passed
@@ -0,0 +1,28 @@
+from sqlalchemy import func
+from app.db.models import Question
+
+# Режими пошуку питань за текстом
+SEARCH_MODE_CONTAINS = "contains"  # ILIKE '%...%' (прискорюється триграмним індексом)
+SEARCH_MODE_FULLTEXT = "fulltext"  # tsvector + GIN, результати впорядковані за ts_rank_cd
+SEARCH_MODE_FUZZY = "fuzzy"        # pg_trgm, стійкий до помилок, впорядкований за схожістю
+
+
+def apply_question_search(query, text_search: str, search_mode: str = SEARCH_MODE_CONTAINS):
+    """
+    Додати до запиту фільтр за текстом питання та, для fulltext/fuzzy, сортування за релевантністю
+    """
+    if search_mode == SEARCH_MODE_FULLTEXT:
+        ts_query = func.websearch_to_tsquery('simple', text_search)
+        return (
+            query.where(Question.search_vector.op('@@')(ts_query))
+            .order_by(func.ts_rank_cd(Question.search_vector, ts_query).desc(), Question.id)
+        )
+    
+    if search_mode == SEARCH_MODE_FUZZY:
+        # text %> query: word_similarity вище порогу pg_trgm.word_similarity_threshold (індексується GIN)
+        return (
+            query.where(Question.text.op('%>')(text_search))
+            .order_by(func.word_similarity(text_search, Question.text).desc(), Question.id)
+        )
+    
+    return query.where(Question.text.ilike(f"%{text_search}%"))
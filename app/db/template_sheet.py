@@ -0,0 +1,93 @@
+import json
+from typing import Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import TTLCache
+from app.config import settings
+from app.db.models import ApplicationTemplate, Question, Unit, DifficultyLevel, SeniorityLevel, QuestionGroup, template_questions
+from app.db.versions import get_template_sheet_etag
+
+# Готовий JSON листа співбесіди за ключем (шаблон, ETag). ETag змінюється разом із шаблоном,
+# складом його питань або будь-яким із питань, тож застарілий запис більше не читається
+# і витісняється за LRU/TTL - окрема інвалідація не потрібна і працює між процесами
+template_sheet_cache = TTLCache(max_size=settings.TEMPLATE_SHEET_CACHE_MAX_SIZE, ttl=settings.TEMPLATE_SHEET_CACHE_TTL)
+
+
+def _reference(id, name, **extra):
+    return None if id is None else {"id": id, "name": name, **extra}
+
+
+async def build_template_sheet(db: AsyncSession, template_id: int) -> Optional[dict]:
+    """
+    Лист співбесіди: шаблон з повністю розгорнутими питаннями (група, складність, рівень, підрозділ)
+    одним запитом. Питання впорядковані за групою, пріоритетом та ID
+    """
+    query = (
+        select(
+            ApplicationTemplate.id.label("template_id"),
+            ApplicationTemplate.name.label("template_name"),
+            ApplicationTemplate.description,
+            ApplicationTemplate.position,
+            ApplicationTemplate.updated_at,
+            Question.id, Question.text, Question.weight, Question.priority, Question.docs_reference,
+            QuestionGroup.id.label("group_id"), QuestionGroup.name.label("group_name"), QuestionGroup.subject,
+            DifficultyLevel.id.label("difficulty_id"), DifficultyLevel.name.label("difficulty_name"),
+            SeniorityLevel.id.label("level_id"), SeniorityLevel.name.label("level_name"),
+            Unit.id.label("unit_id"), Unit.name.label("unit_name"),
+        )
+        .outerjoin(template_questions, template_questions.c.template_id == ApplicationTemplate.id)
+        .outerjoin(Question, Question.id == template_questions.c.question_id)
+        .outerjoin(QuestionGroup, QuestionGroup.id == Question.group_id)
+        .outerjoin(DifficultyLevel, DifficultyLevel.id == Question.difficulty_id)
+        .outerjoin(SeniorityLevel, SeniorityLevel.id == Question.level_id)
+        .outerjoin(Unit, Unit.id == Question.unit_id)
+        .where(ApplicationTemplate.id == template_id)
+        .order_by(QuestionGroup.name.nulls_last(), Question.priority, Question.id)
+    )
+    rows = (await db.execute(query)).all()
+    if not rows:
+        return None
+
+    template = rows[0]
+    return {
+        "template_id": template.template_id,
+        "name": template.template_name,
+        "description": template.description,
+        "position": template.position,
+        "updated_at": template.updated_at.isoformat() if template.updated_at else None,
+        "questions": [
+            {
+                "id": row.id,
+                "text": row.text,
+                "weight": row.weight,
+                "priority": row.priority,
+                "docs_reference": row.docs_reference,
+                "group": _reference(row.group_id, row.group_name, subject=row.subject),
+                "difficulty": _reference(row.difficulty_id, row.difficulty_name),
+                "level": _reference(row.level_id, row.level_name),
+                "unit": _reference(row.unit_id, row.unit_name),
+            }
+            # Шаблон без питань повертається одним рядком з порожніми колонками питання
+            for row in rows if row.id is not None
+        ],
+    }
+
+
+async def get_template_sheet(db: AsyncSession, template_id: int) -> Optional[Tuple[str, str]]:
+    """
+    Відрендерений JSON листа співбесіди і його ETag; None, якщо шаблону немає.
+    На попадання в кеш - лише запит версії
+    """
+    etag = await get_template_sheet_etag(db, template_id)
+    if etag is None:
+        return None
+    key = (template_id, etag)
+    content = template_sheet_cache.get(key)
+    if content is None:
+        sheet = await build_template_sheet(db, template_id)
+        if sheet is None:
+            return None
+        content = json.dumps(sheet, ensure_ascii=False)
+        template_sheet_cache.set(key, content)
+    return content, etag
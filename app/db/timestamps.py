@@ -0,0 +1,19 @@
+import datetime
+from typing import Annotated, Optional
+
+from pydantic import AfterValidator
+
+# Усі колонки DateTime - timestamp without time zone з наївним UTC (datetime.utcnow).
+# asyncpg не кодує дати з часовим поясом для таких колонок (TypeError), тож дати з
+# запитів ("...Z", "...+03:00") приводяться до наївного UTC ще під час валідації
+
+
+def to_naive_utc(value: Optional[datetime.datetime]) -> Optional[datetime.datetime]:
+    """Дата з часовим поясом -> наївна UTC; наївна дата вважається вже UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+# Тип полів моделей і query-параметрів, що порівнюються чи записуються в колонки DateTime
+UtcDateTime = Annotated[datetime.datetime, AfterValidator(to_naive_utc)]
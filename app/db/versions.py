@@ -0,0 +1,102 @@
+import hashlib
+from typing import Optional
+
+from sqlalchemy import Text, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models import (
+    ApplicationTemplate, Evaluation, Feedback, InterviewForm, Interviewer, Question, Score,
+    interviewer_forms, template_questions
+)
+
+# Слабкі ETag для умовних GET. Версія ресурсу - це updated_at рядка плюс "версії" колекцій,
+# що входять у відповідь (кількість, останній updated_at, хеш складу зв'язку).
+# Обчислюється одним запитом по індексах, без завантаження самих зв'язків.
+
+
+def weak_etag(prefix: str, *parts) -> str:
+    digest = hashlib.sha1("|".join("" if part is None else str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{prefix}-{digest}"'
+
+
+def _ids_digest(column, where):
+    """md5 від упорядкованого списку ID зв'язку - змінюється при додаванні і видаленні"""
+    return (
+        select(func.md5(func.string_agg(cast(column, Text), aggregate_order_by(literal(","), column))))
+        .where(where)
+        .scalar_subquery()
+    )
+
+
+def get_question_etag(question: Question) -> str:
+    return weak_etag("question", question.id, question.updated_at)
+
+
+async def get_template_etag(db: AsyncSession, template_id: int) -> Optional[str]:
+    """ETag TemplateDetailResponse: сам шаблон і склад його питань; None, якщо шаблону немає"""
+    result = await db.execute(
+        select(
+            ApplicationTemplate.updated_at,
+            _ids_digest(template_questions.c.question_id, template_questions.c.template_id == ApplicationTemplate.id),
+        )
+        .where(ApplicationTemplate.id == template_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return weak_etag("template", template_id, *row)
+
+
+async def get_template_sheet_etag(db: AsyncSession, template_id: int) -> Optional[str]:
+    """ETag листа співбесіди: версія шаблону плюс останнє оновлення його питань"""
+    questions_updated_at = (
+        select(func.max(Question.updated_at))
+        .join(template_questions, template_questions.c.question_id == Question.id)
+        .where(template_questions.c.template_id == ApplicationTemplate.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            ApplicationTemplate.updated_at,
+            _ids_digest(template_questions.c.question_id, template_questions.c.template_id == ApplicationTemplate.id),
+            questions_updated_at,
+        )
+        .where(ApplicationTemplate.id == template_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return weak_etag("sheet", template_id, *row)
+
+
+async def get_interview_form_etag(db: AsyncSession, interview_id: int) -> Optional[str]:
+    """ETag InterviewFormDetailResponse: форма, інтерв'юери, оцінки, загальні оцінки і відгук"""
+    def _count_and_last_update(model, form_column):
+        return (
+            select(func.count(model.id), func.max(model.updated_at))
+            .where(form_column == InterviewForm.id)
+            .lateral()
+        )
+    scores = _count_and_last_update(Score, Score.interview_form_id)
+    evaluations = _count_and_last_update(Evaluation, Evaluation.interview_form_id)
+    feedback = _count_and_last_update(Feedback, Feedback.interview_form_id)
+    
+    interviewers_updated_at = (
+        select(func.max(Interviewer.updated_at))
+        .join(interviewer_forms, interviewer_forms.c.interviewer_id == Interviewer.id)
+        .where(interviewer_forms.c.form_id == InterviewForm.id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            InterviewForm.updated_at,
+            _ids_digest(interviewer_forms.c.interviewer_id, interviewer_forms.c.form_id == InterviewForm.id),
+            interviewers_updated_at,
+            scores, evaluations, feedback,
+        )
+        .where(InterviewForm.id == interview_id)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return weak_etag("interview", interview_id, *row)
@@ -0,0 +1,61 @@
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+# Ресурси, що часто змінюються: кешувати можна, але щоразу з перевіркою (умовний GET)
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Чи відповідає If-None-Match поточному ETag. Порівняння слабке (RFC 9110, 13.1.2):
+    префікс W/ ігнорується, підтримуються списки значень і "*"
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime.datetime] = None) -> bool:
+    """
+    Умовний GET: If-None-Match має пріоритет, If-Modified-Since перевіряється лише без нього.
+    last_modified - наївний UTC, як у колонках updated_at
+    """
+    if request.headers.get("if-none-match") is not None:
+        return etag_matches(request, etag)
+    header = request.headers.get("if-modified-since")
+    if last_modified is None or not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is not None:
+        since = since.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    # Last-Modified має точність до секунди
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, cache_control: str, last_modified: Optional[datetime.datetime] = None) -> Dict[str, str]:
+    """Заголовки валідації кешу, однакові для повної відповіді і для 304"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=datetime.timezone.utc), usegmt=True)
+    return headers
+
+
+def not_modified(etag: str, cache_control: str, last_modified: Optional[datetime.datetime] = None) -> Response:
+    """Відповідь 304 з тими самими заголовками валідації, що й у повної відповіді"""
+    return Response(status_code=304, headers=validator_headers(etag, cache_control, last_modified))
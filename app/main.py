@@ -1,18 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.api import questions, templates, interviews, integrations
-from app.db.database import engine
-from app.db.models import Base
+from app.api import questions, templates, interviews, integrations, analytics
+from app.db.database import engine, async_engine, warm_up_pool
+from app.db.pool_metrics import describe_pool
+from app.db.pagination import NEXT_CURSOR_HEADER
+from app.db.reference_cache import reference_cache
+from app.db.template_sheet import template_sheet_cache
+from app.api.integrations import create_peopleforce_http_client, create_candidate_cache
 
-# Створення таблиць в базі даних (в реальному проекті варто використовувати Alembic для міграцій)
-Base.metadata.create_all(bind=engine)
+# Схема бази даних керується міграціями Alembic (alembic upgrade head), які запускаються
+# один раз на деплой (preDeployCommand у railway.json), а не при імпорті в кожному воркері
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Життєвий цикл додатку: спільні клієнти створюються при старті і звільняються при зупинці.
+    Старт не звертається до бази: движки підключаються ліниво, при першому запиті,
+    або у фоні, якщо задано DB_WARMUP_CONNECTIONS
+    """
+    app.state.peopleforce_http_client = create_peopleforce_http_client()
+    app.state.candidate_cache = create_candidate_cache()
+    warmup = None
+    if settings.DB_WARMUP_CONNECTIONS > 0:
+        warmup = asyncio.create_task(warm_up_pool(settings.DB_WARMUP_CONNECTIONS))
+    yield
+    if warmup is not None and not warmup.done():
+        warmup.cancel()
+    await app.state.peopleforce_http_client.aclose()
+    # Закриття всіх з'єднань пулу асинхронного движка
+    await async_engine.dispose()
 
 # Створення додатку FastAPI
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="API для сервісу проведення технічних співбесід"
+    description="API для сервісу проведення технічних співбесід",
+    lifespan=lifespan
 )
 
 # Налаштування CORS
@@ -22,6 +48,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
 )
 
 # Включення роутерів API
@@ -29,6 +56,7 @@ app.include_router(questions.router)
 app.include_router(templates.router)
 app.include_router(interviews.router)
 app.include_router(integrations.router)
+app.include_router(analytics.router)
 
 @app.get("/")
 async def root():
@@ -44,6 +72,22 @@ async def health():
     """Ендпоінт для перевірки стану сервісу"""
     return {"status": "ok"}
 
+@app.get("/metrics")
+async def metrics():
+    """Метрики пулів з'єднань (насичення, час очікування) та кешів додатку"""
+    return {
+        "db_pools": {
+            "sync": describe_pool("sync", engine.pool),
+            "async": describe_pool("async", async_engine.pool),
+        },
+        "caches": {
+            "peopleforce_candidates": app.state.candidate_cache.stats(),
+            "analytics": analytics.analytics_cache.stats(),
+            "reference_data": reference_cache.stats(),
+            "template_sheets": template_sheet_cache.stats(),
+        }
+    }
+
 
 if __name__ == "__main__":
     import uvicorn
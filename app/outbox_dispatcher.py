@@ -0,0 +1,173 @@
+"""
+Диспетчер transactional outbox: окремий процес, який відправляє записи в PeopleForce.
+
+Запуск: python -m app.outbox_dispatcher
+
+Без диспетчера записи в PeopleForce (оцінки, відгуки, /sync) лише накопичуються в outbox,
+тому в продакшні він працює окремим сервісом з того самого образу:
+- Railway: другий сервіс з конфігурацією railway.worker.json (Settings -> Config-as-code);
+  міграції запускає лише веб-сервіс (preDeployCommand у railway.json)
+- Procfile: процес worker
+Кілька екземплярів диспетчера можуть працювати одночасно (FOR UPDATE SKIP LOCKED)
+"""
+import asyncio
+import logging
+import signal
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.integrations import PeopleForceClient, build_interview_notes, create_peopleforce_http_client
+from app.config import settings
+from app.db.database import AsyncSessionLocal, async_engine
+from app.db.loading import INTERVIEW_FORM_SYNC_OPTIONS
+from app.db.models import InterviewForm, OutboxMessage
+from app.db.outbox import claim_outbox_batch, mark_outbox_failed, mark_outbox_sent
+
+logger = logging.getLogger(__name__)
+
+
+def is_permanent_error(status_code: int) -> bool:
+    """Помилки клієнта (крім таймауту, конфлікту і rate limit) повтор не виправить"""
+    return 400 <= status_code < 500 and status_code not in (408, 409, 429)
+
+
+async def send_interview_notes(
+    client: PeopleForceClient,
+    semaphore: asyncio.Semaphore,
+    candidate_id: str,
+    notes: str,
+    idempotency_key: str
+) -> Tuple[Optional[str], bool]:
+    """Відправити нотатки однієї форми; повертає (помилка, чи постійна)"""
+    async with semaphore:
+        try:
+            await client.update_candidate_notes(candidate_id, notes, idempotency_key=idempotency_key)
+        except HTTPException as e:
+            return f"{e.status_code}: {e.detail}", is_permanent_error(e.status_code)
+        except httpx.HTTPError as e:
+            return str(e) or type(e).__name__, False
+    return None, False
+
+
+def get_send_timeout() -> float:
+    """
+    Час на відправку пачки. Має закінчитися до кінця оренди (OUTBOX_LEASE_SECONDS) із запасом
+    на запис результатів - інакше інший диспетчер забере ті самі повідомлення і відправить їх вдруге
+    """
+    return min(settings.OUTBOX_SEND_TIMEOUT, settings.OUTBOX_LEASE_SECONDS * 0.75)
+
+
+async def send_batch(
+    client: PeopleForceClient,
+    semaphore: asyncio.Semaphore,
+    payloads: List[Tuple[int, str, str, str]]
+) -> Dict[int, Tuple[Optional[str], bool]]:
+    """
+    Відправити нотатки (form_id, candidate_id, notes, idempotency_key) з обмеженням часу на всю пачку.
+    Незавершені за get_send_timeout() запити скасовуються і вважаються тимчасовою помилкою
+    """
+    tasks = {
+        form_id: asyncio.create_task(send_interview_notes(client, semaphore, candidate_id, notes, idempotency_key))
+        for form_id, candidate_id, notes, idempotency_key in payloads
+    }
+    if not tasks:
+        return {}
+    await asyncio.wait(tasks.values(), timeout=get_send_timeout())
+
+    outcomes = {}
+    for form_id, task in tasks.items():
+        if task.done():
+            outcomes[form_id] = task.result()
+        else:
+            task.cancel()
+            outcomes[form_id] = ("Перевищено час відправки пачки", False)
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    return outcomes
+
+
+async def dispatch_once(client: PeopleForceClient, semaphore: asyncio.Semaphore) -> int:
+    """
+    Обробити одну пачку повідомлень; повертає кількість забраних повідомлень.
+    Запити до PeopleForce виконуються без відкритої транзакції: дані читаються і сесія
+    закривається до відправки, а результати записуються в новій сесії
+    """
+    async with AsyncSessionLocal() as db:
+        messages = await claim_outbox_batch(db, settings.OUTBOX_BATCH_SIZE)
+        if not messages:
+            return 0
+
+        # Нотатки - повний знімок форми, тому кілька повідомлень однієї форми відправляються одним запитом
+        messages_by_form: Dict[int, List[OutboxMessage]] = defaultdict(list)
+        for message in messages:
+            messages_by_form[message.payload["interview_form_id"]].append(message)
+
+        result = await db.execute(
+            select(InterviewForm)
+            .options(*INTERVIEW_FORM_SYNC_OPTIONS)
+            .where(InterviewForm.id.in_(list(messages_by_form)))
+        )
+        payloads = [
+            (form.id, form.candidate_id, build_interview_notes(form), messages_by_form[form.id][-1].idempotency_key)
+            for form in result.scalars().all()
+        ]
+    # Вихід з блоку закриває сесію і повертає з'єднання в пул до запитів до PeopleForce
+    # (close не робить expire, тож атрибути повідомлень доступні далі)
+    outcomes = await send_batch(client, semaphore, payloads)
+
+    async with AsyncSessionLocal() as db:
+        sent_ids = []
+        for form_id, form_messages in messages_by_form.items():
+            if form_id not in outcomes:
+                error, permanent = "Форму інтерв'ю не знайдено", True
+            else:
+                error, permanent = outcomes[form_id]
+            if error is None:
+                sent_ids.extend(message.id for message in form_messages)
+                continue
+            for message in form_messages:
+                await mark_outbox_failed(db, message, error, permanent=permanent)
+
+        if sent_ids:
+            await mark_outbox_sent(db, sent_ids)
+        await db.commit()
+    return len(messages)
+
+
+async def run_dispatcher(stop_event: Optional[asyncio.Event] = None):
+    """Головний цикл: пачки обробляються підряд, поки черга не спорожніє, потім - опитування"""
+    stop_event = stop_event or asyncio.Event()
+    http_client = create_peopleforce_http_client()
+    client = PeopleForceClient(http_client)
+    semaphore = asyncio.Semaphore(settings.PEOPLEFORCE_SYNC_CONCURRENCY)
+    try:
+        while not stop_event.is_set():
+            try:
+                processed = await dispatch_once(client, semaphore)
+            except Exception:
+                logger.exception("Помилка обробки пачки outbox")
+                processed = 0
+            if processed < settings.OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=settings.OUTBOX_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        await http_client.aclose()
+        await async_engine.dispose()
+
+
+async def main():
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+    await run_dispatcher(stop_event)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -1,9 +1,23 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, exists
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
 from datetime import datetime
+from app.db.pagination import paginate, INTERVIEW_FORM_ORDER, INTERVIEWER_ORDER
+from app.db.loading import (
+    INTERVIEW_FORM_LIST_OPTIONS, INTERVIEW_FORM_DETAIL_OPTIONS,
+    INTERVIEW_FORM_SUMMARY_OPTION, INTERVIEW_FORM_NO_SUMMARY_OPTION
+)
+from app.db.outbox import enqueue_peopleforce_sync
+from app.db.scoring import get_score_summary, apply_pass_thresholds
+from app.db.score_summary import init_score_summaries, add_score_to_summary, rebuild_score_summary, lock_score_summary
+from app.db.membership import is_form_interviewer, add_form_interviewer, remove_form_interviewer
+from app.config import settings
 from app.db.models import (
     InterviewForm, ApplicationTemplate, Interviewer, 
-    Score, Evaluation, Feedback, PredefinedPhrase, Question
+    Score, Evaluation, Feedback, PredefinedPhrase, Question, interviewer_forms
 )
 from fastapi import HTTPException, status
 
@@ -13,50 +27,69 @@ class InterviewService:
     """
     
     @staticmethod
-    def get_interviews(
-        db: Session,
+    async def get_interviews(
+        db: AsyncSession,
         skip: int = 0,
         limit: int = 100,
         candidate_id: Optional[str] = None,
         position: Optional[str] = None,
         start_date: Optional[datetime] = None,
-        end_date: Optional[datetime] = None
+        end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        include_summary: bool = False
     ) -> List[InterviewForm]:
         """
         Отримати список форм співбесід з можливістю фільтрації
+        (cursor - курсор keyset-пагінації, див. app.db.pagination.get_next_cursor;
+        include_summary - завантажити score_summary)
         """
-        query = db.query(InterviewForm)
+        query = select(InterviewForm).options(
+            *INTERVIEW_FORM_LIST_OPTIONS,
+            INTERVIEW_FORM_SUMMARY_OPTION if include_summary else INTERVIEW_FORM_NO_SUMMARY_OPTION
+        )
         
         # Застосування фільтрів
         if candidate_id:
-            query = query.filter(InterviewForm.candidate_id == candidate_id)
+            query = query.where(InterviewForm.candidate_id == candidate_id)
         if position:
-            query = query.filter(InterviewForm.position.ilike(f"%{position}%"))
+            query = query.where(InterviewForm.position.ilike(f"%{position}%"))
         if start_date:
-            query = query.filter(InterviewForm.interview_date >= start_date)
+            query = query.where(InterviewForm.interview_date >= start_date)
         if end_date:
-            query = query.filter(InterviewForm.interview_date <= end_date)
+            query = query.where(InterviewForm.interview_date <= end_date)
         
-        return query.offset(skip).limit(limit).all()
+        result = await db.execute(paginate(query, INTERVIEW_FORM_ORDER, cursor, limit, skip))
+        return result.scalars().all()
     
     @staticmethod
-    def get_interview_by_id(db: Session, interview_id: int) -> InterviewForm:
+    async def get_interview_by_id(db: AsyncSession, interview_id: int, *options) -> InterviewForm:
         """
         Отримати форму співбесіди за ідентифікатором
+        (options - опції завантаження зв'язків, напр. selectinload)
         """
-        interview = db.query(InterviewForm).filter(InterviewForm.id == interview_id).first()
+        result = await db.execute(
+            select(InterviewForm).options(*options).where(InterviewForm.id == interview_id)
+        )
+        interview = result.scalars().first()
         if interview is None:
             raise HTTPException(status_code=404, detail="Форму співбесіди не знайдено")
         return interview
     
     @staticmethod
-    def create_interview(db: Session, interview_data: Dict[str, Any]) -> InterviewForm:
+    async def get_interview_details(db: AsyncSession, interview_id: int) -> InterviewForm:
+        """
+        Отримати форму співбесіди з інтерв'юерами, оцінками, оцінюванням та відгуком
+        """
+        return await InterviewService.get_interview_by_id(db, interview_id, *INTERVIEW_FORM_DETAIL_OPTIONS)
+    
+    @staticmethod
+    async def create_interview(db: AsyncSession, interview_data: Dict[str, Any]) -> InterviewForm:
         """
         Створити нову форму співбесіди
         """
         # Перевірка існування шаблону
         template_id = interview_data.get('template_id')
-        template = db.query(ApplicationTemplate).filter(ApplicationTemplate.id == template_id).first()
+        template = await db.get(ApplicationTemplate, template_id)
         if template is None:
             raise HTTPException(status_code=404, detail="Шаблон не знайдено")
         
@@ -67,66 +100,121 @@ class InterviewService:
         db_interview = InterviewForm(**interview_data)
         
         # Додавання інтерв'юерів
-        for interviewer_id in interviewer_ids:
-            interviewer = db.query(Interviewer).filter(Interviewer.id == interviewer_id).first()
-            if interviewer is None:
-                raise HTTPException(status_code=404, detail=f"Інтерв'юера з ID {interviewer_id} не знайдено")
+        interviewers = await InterviewService.get_interviewers_by_ids(db, interviewer_ids)
+        for interviewer in interviewers.values():
             db_interview.interviewers.append(interviewer)
         
         db.add(db_interview)
-        db.commit()
-        db.refresh(db_interview)
+        await db.flush()
+        await init_score_summaries(db, [db_interview.id])
+        await db.commit()
+        await db.refresh(db_interview, attribute_names=["interviewers"])
         return db_interview
     
     @staticmethod
-    def update_interview(db: Session, interview_id: int, interview_data: Dict[str, Any]) -> InterviewForm:
+    async def create_interviews_bulk(db: AsyncSession, interviews_data: List[Dict[str, Any]]) -> List[int]:
+        """
+        Створити багато форм співбесід в одній транзакції, повертає їх ідентифікатори
+        """
+        if not interviews_data:
+            return []
+        
+        # Перевірка існування всіх шаблонів одним запитом
+        template_ids = {data.get('template_id') for data in interviews_data}
+        result = await db.execute(select(ApplicationTemplate.id).where(ApplicationTemplate.id.in_(template_ids)))
+        missing_templates = sorted(template_ids - set(result.scalars()))
+        if missing_templates:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Шаблонів з ID {', '.join(map(str, missing_templates))} не знайдено"
+            )
+        
+        # Перевірка всіх інтерв'юерів одним запитом
+        interviewer_ids = [list(dict.fromkeys(data.get('interviewer_ids', []))) for data in interviews_data]
+        await InterviewService.get_interviewers_by_ids(db, [i for ids in interviewer_ids for i in ids])
+        
+        # Вставка форм одним запитом; ідентифікатори повертаються в порядку вхідних даних
+        forms_data = [
+            {key: value for key, value in data.items() if key != 'interviewer_ids'}
+            for data in interviews_data
+        ]
+        result = await db.execute(
+            insert(InterviewForm).returning(InterviewForm.id, sort_by_parameter_order=True),
+            forms_data
+        )
+        form_ids = result.scalars().all()
+        
+        # Зв'язки інтерв'юерів з формами - один багаторядковий INSERT
+        links = [
+            {"interviewer_id": interviewer_id, "form_id": form_id}
+            for form_id, ids in zip(form_ids, interviewer_ids)
+            for interviewer_id in ids
+        ]
+        if links:
+            await db.execute(insert(interviewer_forms).values(links))
+        
+        await init_score_summaries(db, form_ids)
+        await db.commit()
+        return form_ids
+    
+    @staticmethod
+    async def update_interview(db: AsyncSession, interview_id: int, interview_data: Dict[str, Any]) -> InterviewForm:
         """
         Оновити існуючу форму співбесіди
         """
-        db_interview = InterviewService.get_interview_by_id(db, interview_id)
+        db_interview = await InterviewService.get_interview_by_id(db, interview_id)
         
         # Оновлення тільки наданих полів
         for key, value in interview_data.items():
             setattr(db_interview, key, value)
         
-        db.commit()
-        db.refresh(db_interview)
+        await db.commit()
+        await db.refresh(db_interview)
         return db_interview
     
     @staticmethod
-    def delete_interview(db: Session, interview_id: int) -> bool:
+    async def delete_interview(db: AsyncSession, interview_id: int) -> bool:
         """
         Видалити форму співбесіди
         """
-        db_interview = InterviewService.get_interview_by_id(db, interview_id)
-        db.delete(db_interview)
-        db.commit()
+        db_interview = await InterviewService.get_interview_by_id(db, interview_id)
+        await db.delete(db_interview)
+        await db.commit()
         return True
     
     @staticmethod
-    def add_score(db: Session, interview_id: int, score_data: Dict[str, Any]) -> Score:
+    async def add_score(db: AsyncSession, interview_id: int, score_data: Dict[str, Any]) -> Score:
         """
         Додати оцінку до форми співбесіди
         """
         # Перевірка існування форми
-        interview = InterviewService.get_interview_by_id(db, interview_id)
+        interview = await InterviewService.get_interview_by_id(db, interview_id)
         
-        # Перевірка інтерв'юера
+        # Перевірка, що інтерв'юер є учасником цієї форми (зв'язок існує лише для наявного інтерв'юера)
         interviewer_id = score_data.get('interviewer_id')
-        interviewer = db.query(Interviewer).filter(Interviewer.id == interviewer_id).first()
-        if interviewer is None:
-            raise HTTPException(status_code=404, detail="Інтерв'юера не знайдено")
-        
-        # Перевірка, що інтерв'юер є учасником цієї форми
-        if interviewer not in interview.interviewers:
+        if not await is_form_interviewer(db, interview_id, interviewer_id):
+            if await db.get(Interviewer, interviewer_id) is None:
+                raise HTTPException(status_code=404, detail="Інтерв'юера не знайдено")
             raise HTTPException(status_code=400, detail="Інтерв'юер не є учасником цієї форми")
         
         # Перевірка питання
         question_id = score_data.get('question_id')
-        question = db.query(Question).filter(Question.id == question_id).first()
+        question = await db.get(Question, question_id)
         if question is None:
             raise HTTPException(status_code=404, detail="Питання не знайдено")
         
+        # Повторне оцінювання - через add_scores_batch (upsert)
+        already_scored = await db.scalar(select(exists().where(
+            Score.interview_form_id == interview_id,
+            Score.interviewer_id == interviewer_id,
+            Score.question_id == question_id
+        )))
+        if already_scored:
+            raise HTTPException(status_code=400, detail="Інтерв'юер вже оцінив це питання")
+        
+        # Підсумок оновлюється до вставки оцінки - у тій самій транзакції
+        await add_score_to_summary(db, interview, question, score_data.get('value'))
+        
         # Створення оцінки
         db_score = Score(
             question_id=question_id,
@@ -137,33 +225,104 @@ class InterviewService:
         )
         
         db.add(db_score)
-        db.commit()
-        db.refresh(db_score)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Паралельний запит встиг вставити ту саму оцінку між перевіркою і комітом
+            # (uq_scores_form_interviewer_question); підсумок відкочується разом з нею
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="Інтерв'юер вже оцінив це питання")
+        await db.refresh(db_score)
         return db_score
     
     @staticmethod
-    def get_scores(db: Session, interview_id: int, interviewer_id: Optional[int] = None) -> List[Score]:
+    async def add_scores_batch(db: AsyncSession, interview_id: int, scores_data: List[Dict[str, Any]]) -> List[Score]:
+        """
+        Додати або оновити (повторне оцінювання) багато оцінок форми одним запитом
+        """
+        interview = await InterviewService.get_interview_by_id(db, interview_id)
+        if not scores_data:
+            return []
+        
+        # Для пари інтерв'юер-питання, що повторюється, береться остання оцінка
+        scores = list({(data.get('interviewer_id'), data.get('question_id')): data for data in scores_data}.values())
+        
+        # Перевірка всіх питань одним запитом
+        question_ids = {data.get('question_id') for data in scores}
+        result = await db.execute(select(Question.id).where(Question.id.in_(question_ids)))
+        missing_questions = sorted(question_ids - set(result.scalars()))
+        if missing_questions:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Питань з ID {', '.join(map(str, missing_questions))} не знайдено"
+            )
+        
+        # Перевірка участі всіх інтерв'юерів у формі одним запитом
+        interviewer_ids = {data.get('interviewer_id') for data in scores}
+        result = await db.execute(
+            select(interviewer_forms.c.interviewer_id)
+            .where(interviewer_forms.c.form_id == interview_id, interviewer_forms.c.interviewer_id.in_(interviewer_ids))
+        )
+        not_members = sorted(interviewer_ids - set(result.scalars()))
+        if not_members:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Інтерв'юери з ID {', '.join(map(str, not_members))} не є учасниками цієї форми"
+            )
+        
+        # Оцінки форми змінюються під блокуванням її підсумку - так само, як в add_score
+        await lock_score_summary(db, interview)
+        
+        # Усі оцінки - один INSERT ... ON CONFLICT DO UPDATE
+        now = datetime.utcnow()
+        stmt = pg_insert(Score).values([
+            {
+                "interview_form_id": interview_id,
+                "interviewer_id": data.get('interviewer_id'),
+                "question_id": data.get('question_id'),
+                "value": data.get('value'),
+                "comment": data.get('comment'),
+                "created_at": now,
+                "updated_at": now,
+            }
+            for data in scores
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Score.interview_form_id, Score.interviewer_id, Score.question_id],
+            set_={"value": stmt.excluded.value, "comment": stmt.excluded.comment, "updated_at": stmt.excluded.updated_at}
+        ).returning(Score)
+        # populate_existing - щоб оцінки, вже завантажені в сесію, отримали нові значення
+        result = await db.execute(stmt.execution_options(populate_existing=True))
+        db_scores = result.scalars().all()
+        
+        await rebuild_score_summary(db, interview_id)
+        await db.commit()
+        return sorted(db_scores, key=lambda db_score: (db_score.interviewer_id, db_score.question_id))
+    
+    @staticmethod
+    async def get_scores(db: AsyncSession, interview_id: int, interviewer_id: Optional[int] = None) -> List[Score]:
         """
         Отримати оцінки форми співбесіди
         """
         # Перевірка існування форми
-        InterviewService.get_interview_by_id(db, interview_id)
+        await InterviewService.get_interview_by_id(db, interview_id)
         
-        query = db.query(Score).filter(Score.interview_form_id == interview_id)
+        query = select(Score).where(Score.interview_form_id == interview_id)
         
         # Фільтрація за інтерв'юером
         if interviewer_id:
-            query = query.filter(Score.interviewer_id == interviewer_id)
+            query = query.where(Score.interviewer_id == interviewer_id)
         
-        return query.all()
+        result = await db.execute(query)
+        return result.scalars().all()
     
     @staticmethod
-    def add_evaluation(db: Session, interview_id: int, evaluation_data: Dict[str, Any]) -> Evaluation:
+    async def add_evaluation(db: AsyncSession, interview_id: int, evaluation_data: Dict[str, Any]) -> Evaluation:
         """
         Додати загальну оцінку кандидата
         """
         # Перевірка існування форми
-        interview = InterviewService.get_interview_by_id(db, interview_id)
+        interview = await InterviewService.get_interview_by_id(db, interview_id)
         
         # Створення оцінки
         db_evaluation = Evaluation(
@@ -174,20 +333,80 @@ class InterviewService:
         )
         
         db.add(db_evaluation)
-        db.commit()
-        db.refresh(db_evaluation)
+        # Синхронізація з PeopleForce - через outbox у тій самій транзакції
+        enqueue_peopleforce_sync(db, interview_id)
+        await db.commit()
+        await db.refresh(db_evaluation)
         return db_evaluation
     
     @staticmethod
-    def add_feedback(db: Session, interview_id: int, feedback_data: Dict[str, Any]) -> Feedback:
+    async def get_score_summary(db: AsyncSession, interview_id: int) -> Dict[str, Any]:
+        """
+        Зважені підсумки оцінок по інтерв'юерах, групах питань і загалом
+        """
+        await InterviewService.get_interview_by_id(db, interview_id)
+        return await get_score_summary(db, interview_id)
+    
+    @staticmethod
+    async def compute_evaluation(
+        db: AsyncSession,
+        interview_id: int,
+        minimal_rate: Optional[float] = None,
+        group_thresholds: Optional[Dict[int, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Обчислити загальну оцінку зі зважених оцінок і зберегти її
+        """
+        await InterviewService.get_interview_by_id(db, interview_id)
+        
+        summary = await get_score_summary(db, interview_id)
+        if summary["overall"] is None:
+            raise HTTPException(
+                status_code=400,
+                detail="Для цієї форми ще немає оцінок"
+            )
+        
+        if minimal_rate is None:
+            minimal_rate = settings.EVALUATION_MINIMAL_RATE
+        passed = apply_pass_thresholds(summary, minimal_rate, group_thresholds)
+        
+        db_evaluation = Evaluation(
+            total_score=summary["overall"]["weighted_average"],
+            passed=passed,
+            minimal_rate=minimal_rate,
+            interview_form_id=interview_id
+        )
+        db.add(db_evaluation)
+        await db.flush()
+        
+        # Оцінки, з яких обчислено результат, прив'язуються до нього
+        await db.execute(
+            update(Score)
+            .where(Score.interview_form_id == interview_id)
+            .values(evaluation_id=db_evaluation.id)
+            .execution_options(synchronize_session=False)
+        )
+        # Синхронізація з PeopleForce - через outbox у тій самій транзакції
+        enqueue_peopleforce_sync(db, interview_id)
+        await db.commit()
+        
+        return {"evaluation": db_evaluation, "summary": summary}
+    
+    @staticmethod
+    async def add_feedback(db: AsyncSession, interview_id: int, feedback_data: Dict[str, Any]) -> Feedback:
         """
         Додати відгук про кандидата
         """
         # Перевірка існування форми
-        interview = InterviewService.get_interview_by_id(db, interview_id)
+        interview = await InterviewService.get_interview_by_id(db, interview_id)
         
         # Перевірка, що відгук ще не існує
-        existing = db.query(Feedback).filter(Feedback.interview_form_id == interview_id).first()
+        result = await db.execute(
+            select(Feedback)
+            .options(selectinload(Feedback.phrases))
+            .where(Feedback.interview_form_id == interview_id)
+        )
+        existing = result.scalars().first()
         if existing:
             # Якщо відгук вже існує, оновлюємо його
             existing.text = feedback_data.get('text')
@@ -196,12 +415,14 @@ class InterviewService:
             existing.phrases = []
             predefined_phrase_ids = feedback_data.get('predefined_phrase_ids', [])
             for phrase_id in predefined_phrase_ids:
-                phrase = db.query(PredefinedPhrase).filter(PredefinedPhrase.id == phrase_id).first()
+                phrase = await db.get(PredefinedPhrase, phrase_id)
                 if phrase:
                     existing.phrases.append(phrase)
             
-            db.commit()
-            db.refresh(existing)
+            # Синхронізація з PeopleForce - через outbox у тій самій транзакції
+            enqueue_peopleforce_sync(db, interview_id)
+            await db.commit()
+            await db.refresh(existing)
             return existing
         else:
             # Створення відгуку
@@ -213,96 +434,124 @@ class InterviewService:
             # Додавання заготовлених фраз
             predefined_phrase_ids = feedback_data.get('predefined_phrase_ids', [])
             for phrase_id in predefined_phrase_ids:
-                phrase = db.query(PredefinedPhrase).filter(PredefinedPhrase.id == phrase_id).first()
+                phrase = await db.get(PredefinedPhrase, phrase_id)
                 if phrase:
                     db_feedback.phrases.append(phrase)
             
             db.add(db_feedback)
-            db.commit()
-            db.refresh(db_feedback)
+            # Синхронізація з PeopleForce - через outbox у тій самій транзакції
+            enqueue_peopleforce_sync(db, interview_id)
+            await db.commit()
+            await db.refresh(db_feedback)
             return db_feedback
     
     @staticmethod
-    def create_interviewer(db: Session, interviewer_data: Dict[str, Any]) -> Interviewer:
+    async def create_interviewer(db: AsyncSession, interviewer_data: Dict[str, Any]) -> Interviewer:
         """
         Створити нового інтерв'юера
         """
         # Перевірка унікальності email
-        existing = db.query(Interviewer).filter(Interviewer.email == interviewer_data.get('email')).first()
+        result = await db.execute(select(Interviewer).where(Interviewer.email == interviewer_data.get('email')))
+        existing = result.scalars().first()
         if existing:
             raise HTTPException(status_code=400, detail="Інтерв'юер з таким email вже існує")
         
         db_interviewer = Interviewer(**interviewer_data)
         db.add(db_interviewer)
-        db.commit()
-        db.refresh(db_interviewer)
+        await db.commit()
+        await db.refresh(db_interviewer)
         return db_interviewer
     
     @staticmethod
-    def get_interviewers(db: Session, skip: int = 0, limit: int = 100) -> List[Interviewer]:
+    async def get_interviewers_by_ids(db: AsyncSession, interviewer_ids: List[int]) -> Dict[int, Interviewer]:
+        """
+        Отримати інтерв'юерів одним запитом; відсутні ідентифікатори повідомляються разом
+        """
+        unique_ids = list(dict.fromkeys(interviewer_ids))
+        if not unique_ids:
+            return {}
+        
+        result = await db.execute(select(Interviewer).where(Interviewer.id.in_(unique_ids)))
+        interviewers = {interviewer.id: interviewer for interviewer in result.scalars()}
+        
+        missing = [interviewer_id for interviewer_id in unique_ids if interviewer_id not in interviewers]
+        if missing:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Інтерв'юерів з ID {', '.join(map(str, missing))} не знайдено"
+            )
+        return interviewers
+    
+    @staticmethod
+    async def get_interviewers(
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[Interviewer]:
         """
         Отримати список інтерв'юерів
         """
-        return db.query(Interviewer).offset(skip).limit(limit).all()
+        result = await db.execute(paginate(select(Interviewer), INTERVIEWER_ORDER, cursor, limit, skip))
+        return result.scalars().all()
     
     @staticmethod
-    def add_interviewer_to_form(db: Session, interview_id: int, interviewer_id: int) -> InterviewForm:
+    async def add_interviewer_to_form(db: AsyncSession, interview_id: int, interviewer_id: int) -> InterviewForm:
         """
         Додати інтерв'юера до форми
         """
-        interview = InterviewService.get_interview_by_id(db, interview_id)
-        interviewer = db.query(Interviewer).filter(Interviewer.id == interviewer_id).first()
+        interview = await InterviewService.get_interview_by_id(db, interview_id)
+        interviewer = await db.get(Interviewer, interviewer_id)
         
         if interviewer is None:
             raise HTTPException(status_code=404, detail="Інтерв'юера не знайдено")
         
-        # Перевірка, що інтерв'юер ще не доданий до форми
-        if interviewer in interview.interviewers:
+        # Первинний ключ interviewer_forms сам перевіряє, що інтерв'юер ще не доданий до форми
+        if not await add_form_interviewer(db, interview_id, interviewer_id):
             raise HTTPException(status_code=400, detail="Інтерв'юер вже доданий до цієї форми")
         
-        interview.interviewers.append(interviewer)
-        db.commit()
-        db.refresh(interview)
+        await db.commit()
+        await db.refresh(interview, attribute_names=["interviewers"])
         return interview
     
     @staticmethod
-    def remove_interviewer_from_form(db: Session, interview_id: int, interviewer_id: int) -> bool:
+    async def remove_interviewer_from_form(db: AsyncSession, interview_id: int, interviewer_id: int) -> bool:
         """
         Видалити інтерв'юера з форми
         """
-        interview = InterviewService.get_interview_by_id(db, interview_id)
-        interviewer = db.query(Interviewer).filter(Interviewer.id == interviewer_id).first()
+        await InterviewService.get_interview_by_id(db, interview_id)
+        interviewer = await db.get(Interviewer, interviewer_id)
         
         if interviewer is None:
             raise HTTPException(status_code=404, detail="Інтерв'юера не знайдено")
         
-        if interviewer not in interview.interviewers:
+        if not await remove_form_interviewer(db, interview_id, interviewer_id):
             raise HTTPException(status_code=404, detail="Інтерв'юер не є учасником цієї форми")
         
-        interview.interviewers.remove(interviewer)
-        db.commit()
+        await db.commit()
         return True
     
     @staticmethod
-    def create_predefined_phrase(db: Session, phrase_data: Dict[str, Any]) -> PredefinedPhrase:
+    async def create_predefined_phrase(db: AsyncSession, phrase_data: Dict[str, Any]) -> PredefinedPhrase:
         """
         Створити нову заготовлену фразу
         """
         db_phrase = PredefinedPhrase(**phrase_data)
         db.add(db_phrase)
-        db.commit()
-        db.refresh(db_phrase)
+        await db.commit()
+        await db.refresh(db_phrase)
         return db_phrase
     
     @staticmethod
-    def get_predefined_phrases(db: Session, category: Optional[str] = None) -> List[PredefinedPhrase]:
+    async def get_predefined_phrases(db: AsyncSession, category: Optional[str] = None) -> List[PredefinedPhrase]:
         """
         Отримати список заготовлених фраз
         """
-        query = db.query(PredefinedPhrase)
+        query = select(PredefinedPhrase)
         
         # Фільтрація за категорією
         if category:
-            query = query.filter(PredefinedPhrase.category == category)
+            query = query.where(PredefinedPhrase.category == category)
         
-        return query.all()
+        result = await db.execute(query)
+        return result.scalars().all()
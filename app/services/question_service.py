@@ -1,6 +1,12 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
-from app.db.models import Question, Unit, DifficultyLevel, SeniorityLevel, QuestionGroup
+from app.db.models import Question, Unit, DifficultyLevel, SeniorityLevel, QuestionGroup, template_questions
+from app.db.pagination import paginate, QUESTION_ORDER
+from app.db.search import apply_question_search, SEARCH_MODE_CONTAINS
+from app.db.question_import import detect_import_format, parse_import_file, import_questions
+from app.db.reference_cache import reference_cache
+from app.db.score_summary import rebuild_question_score_summaries, refresh_question_counts
 from fastapi import HTTPException, status
 
 class QuestionService:
@@ -9,151 +15,189 @@ class QuestionService:
     """
     
     @staticmethod
-    def get_questions(
-        db: Session,
+    async def get_questions(
+        db: AsyncSession,
         skip: int = 0,
         limit: int = 100,
         unit_id: Optional[int] = None,
         difficulty_id: Optional[int] = None,
         level_id: Optional[int] = None,
         group_id: Optional[int] = None,
-        text_search: Optional[str] = None
+        text_search: Optional[str] = None,
+        search_mode: str = SEARCH_MODE_CONTAINS,
+        cursor: Optional[str] = None
     ) -> List[Question]:
         """
         Отримати список питань з можливістю фільтрації
+        (cursor - курсор keyset-пагінації, див. app.db.pagination.get_next_cursor)
         """
-        query = db.query(Question)
+        query = select(Question)
         
         # Застосування фільтрів
         if unit_id:
-            query = query.filter(Question.unit_id == unit_id)
+            query = query.where(Question.unit_id == unit_id)
         if difficulty_id:
-            query = query.filter(Question.difficulty_id == difficulty_id)
+            query = query.where(Question.difficulty_id == difficulty_id)
         if level_id:
-            query = query.filter(Question.level_id == level_id)
+            query = query.where(Question.level_id == level_id)
         if group_id:
-            query = query.filter(Question.group_id == group_id)
+            query = query.where(Question.group_id == group_id)
         if text_search:
-            query = query.filter(Question.text.ilike(f"%{text_search}%"))
-            
-        return query.offset(skip).limit(limit).all()
+            query = apply_question_search(query, text_search, search_mode)
+        
+        if text_search and search_mode != SEARCH_MODE_CONTAINS:
+            # Результати впорядковані за релевантністю - курсор тут не застосовується
+            result = await db.execute(query.offset(skip).limit(limit))
+            return result.scalars().all()
+        
+        result = await db.execute(paginate(query, QUESTION_ORDER, cursor, limit, skip))
+        return result.scalars().all()
     
     @staticmethod
-    def get_question_by_id(db: Session, question_id: int) -> Question:
+    async def get_question_by_id(db: AsyncSession, question_id: int) -> Question:
         """
         Отримати питання за ідентифікатором
         """
-        question = db.query(Question).filter(Question.id == question_id).first()
+        question = await db.get(Question, question_id)
         if question is None:
             raise HTTPException(status_code=404, detail="Питання не знайдено")
         return question
     
     @staticmethod
-    def create_question(db: Session, question_data: Dict[str, Any]) -> Question:
+    async def create_question(db: AsyncSession, question_data: Dict[str, Any]) -> Question:
         """
         Створити нове питання
         """
         db_question = Question(**question_data)
         db.add(db_question)
-        db.commit()
-        db.refresh(db_question)
+        await db.commit()
+        await db.refresh(db_question)
         return db_question
     
     @staticmethod
-    def update_question(db: Session, question_id: int, question_data: Dict[str, Any]) -> Question:
+    async def import_questions(db: AsyncSession, content: bytes, filename: Optional[str] = None, content_type: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Масовий імпорт питань з CSV/JSONL зі звітом про помилки по рядках
+        """
+        records = parse_import_file(content, detect_import_format(filename, content_type))
+        return await import_questions(db, records)
+    
+    @staticmethod
+    async def update_question(db: AsyncSession, question_id: int, question_data: Dict[str, Any]) -> Question:
         """
         Оновити існуюче питання
         """
-        db_question = QuestionService.get_question_by_id(db, question_id)
+        db_question = await QuestionService.get_question_by_id(db, question_id)
         
         # Оновлення тільки наданих полів
+        weight_changed = "weight" in question_data and question_data["weight"] != db_question.weight
         for key, value in question_data.items():
             setattr(db_question, key, value)
         
-        db.commit()
-        db.refresh(db_question)
+        if weight_changed:
+            # Зважені суми підсумків форм з оцінками на це питання перераховуються з новою вагою
+            await db.flush()
+            await rebuild_question_score_summaries(db, question_id)
+        await db.commit()
+        await db.refresh(db_question)
         return db_question
     
     @staticmethod
-    def delete_question(db: Session, question_id: int) -> bool:
+    async def delete_question(db: AsyncSession, question_id: int) -> bool:
         """
         Видалити питання
         """
-        db_question = QuestionService.get_question_by_id(db, question_id)
-        db.delete(db_question)
-        db.commit()
+        db_question = await QuestionService.get_question_by_id(db, question_id)
+        
+        # Питання зникає і з шаблонів, тож у підсумках їх форм змінюється кількість питань
+        result = await db.execute(
+            select(template_questions.c.template_id).where(template_questions.c.question_id == question_id)
+        )
+        template_ids = result.scalars().all()
+        await db.delete(db_question)
+        await db.flush()
+        await refresh_question_counts(db, template_ids)
+        await db.commit()
         return True
     
     # Методи для роботи з фільтрами (Unit, Difficulty, Level, Group)
     
     @staticmethod
-    def get_units(db: Session, skip: int = 0, limit: int = 100) -> List[Unit]:
+    async def get_units(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """
-        Отримати список підрозділів/проектів
+        Отримати список підрозділів/проектів (з кешу довідників)
         """
-        return db.query(Unit).offset(skip).limit(limit).all()
+        items, _ = await reference_cache.get_all(db, Unit)
+        return items[skip:skip + limit]
     
     @staticmethod
-    def create_unit(db: Session, unit_data: Dict[str, Any]) -> Unit:
+    async def create_unit(db: AsyncSession, unit_data: Dict[str, Any]) -> Unit:
         """
         Створити новий підрозділ/проект
         """
         db_unit = Unit(**unit_data)
         db.add(db_unit)
-        db.commit()
-        db.refresh(db_unit)
+        await db.commit()
+        reference_cache.invalidate(Unit)
+        await db.refresh(db_unit)
         return db_unit
     
     @staticmethod
-    def get_difficulties(db: Session, skip: int = 0, limit: int = 100) -> List[DifficultyLevel]:
+    async def get_difficulties(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """
-        Отримати список рівнів складності
+        Отримати список рівнів складності (з кешу довідників)
         """
-        return db.query(DifficultyLevel).offset(skip).limit(limit).all()
+        items, _ = await reference_cache.get_all(db, DifficultyLevel)
+        return items[skip:skip + limit]
     
     @staticmethod
-    def create_difficulty(db: Session, difficulty_data: Dict[str, Any]) -> DifficultyLevel:
+    async def create_difficulty(db: AsyncSession, difficulty_data: Dict[str, Any]) -> DifficultyLevel:
         """
         Створити новий рівень складності
         """
         db_difficulty = DifficultyLevel(**difficulty_data)
         db.add(db_difficulty)
-        db.commit()
-        db.refresh(db_difficulty)
+        await db.commit()
+        reference_cache.invalidate(DifficultyLevel)
+        await db.refresh(db_difficulty)
         return db_difficulty
     
     @staticmethod
-    def get_seniority_levels(db: Session, skip: int = 0, limit: int = 100) -> List[SeniorityLevel]:
+    async def get_seniority_levels(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """
-        Отримати список рівнів позиції
+        Отримати список рівнів позиції (з кешу довідників)
         """
-        return db.query(SeniorityLevel).offset(skip).limit(limit).all()
+        items, _ = await reference_cache.get_all(db, SeniorityLevel)
+        return items[skip:skip + limit]
     
     @staticmethod
-    def create_seniority_level(db: Session, level_data: Dict[str, Any]) -> SeniorityLevel:
+    async def create_seniority_level(db: AsyncSession, level_data: Dict[str, Any]) -> SeniorityLevel:
         """
         Створити новий рівень позиції
         """
         db_level = SeniorityLevel(**level_data)
         db.add(db_level)
-        db.commit()
-        db.refresh(db_level)
+        await db.commit()
+        reference_cache.invalidate(SeniorityLevel)
+        await db.refresh(db_level)
         return db_level
     
     @staticmethod
-    def get_question_groups(db: Session, skip: int = 0, limit: int = 100) -> List[QuestionGroup]:
+    async def get_question_groups(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
         """
-        Отримати список груп питань
+        Отримати список груп питань (з кешу довідників)
         """
-        return db.query(QuestionGroup).offset(skip).limit(limit).all()
+        items, _ = await reference_cache.get_all(db, QuestionGroup)
+        return items[skip:skip + limit]
     
     @staticmethod
-    def create_question_group(db: Session, group_data: Dict[str, Any]) -> QuestionGroup:
+    async def create_question_group(db: AsyncSession, group_data: Dict[str, Any]) -> QuestionGroup:
         """
         Створити нову групу питань
         """
         db_group = QuestionGroup(**group_data)
         db.add(db_group)
-        db.commit()
-        db.refresh(db_group)
+        await db.commit()
+        reference_cache.invalidate(QuestionGroup)
+        await db.refresh(db_group)
         return db_group
@@ -1,6 +1,13 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional, Dict, Any
-from app.db.models import ApplicationTemplate, Question
+import json
+from app.db.pagination import paginate, TEMPLATE_ORDER
+from app.db.models import ApplicationTemplate, Question, QuestionList, template_questions
+from app.db.template_sheet import get_template_sheet
+from app.db.score_summary import refresh_question_counts
 from fastapi import HTTPException, status
 
 class TemplateService:
@@ -9,94 +16,126 @@ class TemplateService:
     """
     
     @staticmethod
-    def get_templates(
-        db: Session,
+    async def get_templates(
+        db: AsyncSession,
         skip: int = 0,
         limit: int = 100,
-        position: Optional[str] = None
+        position: Optional[str] = None,
+        cursor: Optional[str] = None
     ) -> List[ApplicationTemplate]:
         """
         Отримати список шаблонів з можливістю фільтрації
+        (cursor - курсор keyset-пагінації, див. app.db.pagination.get_next_cursor)
         """
-        query = db.query(ApplicationTemplate)
+        query = select(ApplicationTemplate)
         
         # Застосування фільтрів
         if position:
-            query = query.filter(ApplicationTemplate.position.ilike(f"%{position}%"))
+            query = query.where(ApplicationTemplate.position.ilike(f"%{position}%"))
             
-        return query.offset(skip).limit(limit).all()
+        result = await db.execute(paginate(query, TEMPLATE_ORDER, cursor, limit, skip))
+        return result.scalars().all()
     
     @staticmethod
-    def get_template_by_id(db: Session, template_id: int) -> ApplicationTemplate:
+    async def get_template_by_id(db: AsyncSession, template_id: int, *options) -> ApplicationTemplate:
         """
         Отримати шаблон за ідентифікатором
+        (options - опції завантаження зв'язків, напр. selectinload)
         """
-        template = db.query(ApplicationTemplate).filter(ApplicationTemplate.id == template_id).first()
+        result = await db.execute(
+            select(ApplicationTemplate).options(*options).where(ApplicationTemplate.id == template_id)
+        )
+        template = result.scalars().first()
         if template is None:
             raise HTTPException(status_code=404, detail="Шаблон не знайдено")
         return template
     
     @staticmethod
-    def create_template(db: Session, template_data: Dict[str, Any]) -> ApplicationTemplate:
+    async def get_template_sheet(db: AsyncSession, template_id: int) -> Dict[str, Any]:
+        """
+        Отримати лист співбесіди: шаблон з повністю розгорнутими питаннями (з кешу)
+        """
+        sheet = await get_template_sheet(db, template_id)
+        if sheet is None:
+            raise HTTPException(status_code=404, detail="Шаблон не знайдено")
+        return json.loads(sheet[0])
+    
+    @staticmethod
+    async def create_template(db: AsyncSession, template_data: Dict[str, Any]) -> ApplicationTemplate:
         """
         Створити новий шаблон
         """
         db_template = ApplicationTemplate(**template_data)
         db.add(db_template)
-        db.commit()
-        db.refresh(db_template)
+        await db.commit()
+        await db.refresh(db_template)
         return db_template
     
     @staticmethod
-    def update_template(db: Session, template_id: int, template_data: Dict[str, Any]) -> ApplicationTemplate:
+    async def update_template(db: AsyncSession, template_id: int, template_data: Dict[str, Any]) -> ApplicationTemplate:
         """
         Оновити існуючий шаблон
         """
-        db_template = TemplateService.get_template_by_id(db, template_id)
+        db_template = await TemplateService.get_template_by_id(db, template_id)
         
         # Оновлення тільки наданих полів
         for key, value in template_data.items():
             setattr(db_template, key, value)
         
-        db.commit()
-        db.refresh(db_template)
+        await db.commit()
+        await db.refresh(db_template)
         return db_template
     
     @staticmethod
-    def delete_template(db: Session, template_id: int) -> bool:
+    async def delete_template(db: AsyncSession, template_id: int) -> bool:
         """
         Видалити шаблон
         """
-        db_template = TemplateService.get_template_by_id(db, template_id)
-        db.delete(db_template)
-        db.commit()
+        db_template = await TemplateService.get_template_by_id(db, template_id)
+        await db.delete(db_template)
+        await db.commit()
         return True
     
     @staticmethod
-    def add_questions_to_template(db: Session, template_id: int, question_ids: List[int]) -> ApplicationTemplate:
+    async def add_questions_to_template(db: AsyncSession, template_id: int, question_ids: List[int]) -> ApplicationTemplate:
         """
         Додати питання до шаблону
         """
-        db_template = TemplateService.get_template_by_id(db, template_id)
+        db_template = await TemplateService.get_template_by_id(db, template_id)
         
-        # Перевірка існування питань
-        for question_id in question_ids:
-            question = db.query(Question).filter(Question.id == question_id).first()
-            if question is None:
-                raise HTTPException(status_code=404, detail=f"Питання з ID {question_id} не знайдено")
-            db_template.questions.append(question)
+        # Перевірка існування всіх питань одним запитом
+        question_ids = list(dict.fromkeys(question_ids))
+        if question_ids:
+            result = await db.execute(select(Question.id).where(Question.id.in_(question_ids)))
+            existing_ids = set(result.scalars())
+            missing = [question_id for question_id in question_ids if question_id not in existing_ids]
+            if missing:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Питання з ID {', '.join(map(str, missing))} не знайдено"
+                )
+            
+            # Додавання зв'язків одним запитом; вже додані питання пропускаються
+            await db.execute(
+                pg_insert(template_questions)
+                .values([{"template_id": template_id, "question_id": question_id} for question_id in question_ids])
+                .on_conflict_do_nothing()
+            )
+            await refresh_question_counts(db, [template_id])
+            await db.commit()
         
-        db.commit()
-        db.refresh(db_template)
+        await db.refresh(db_template, attribute_names=["questions"])
         return db_template
     
     @staticmethod
-    def remove_question_from_template(db: Session, template_id: int, question_id: int) -> bool:
+    async def remove_question_from_template(db: AsyncSession, template_id: int, question_id: int) -> bool:
         """
         Видалити питання з шаблону
         """
-        db_template = TemplateService.get_template_by_id(db, template_id)
-        question = db.query(Question).filter(Question.id == question_id).first()
+        db_template = await TemplateService.get_template_by_id(
+            db, template_id, selectinload(ApplicationTemplate.questions)
+        )
+        question = await db.get(Question, question_id)
         
         if question is None:
             raise HTTPException(status_code=404, detail=f"Питання з ID {question_id} не знайдено")
@@ -105,25 +144,47 @@ class TemplateService:
             raise HTTPException(status_code=404, detail=f"Питання з ID {question_id} не знайдено в цьому шаблоні")
         
         db_template.questions.remove(question)
-        db.commit()
+        await db.flush()
+        await refresh_question_counts(db, [template_id])
+        await db.commit()
         return True
     
     @staticmethod
-    def clone_template(db: Session, template_id: int, new_template_data: Dict[str, Any]) -> ApplicationTemplate:
+    async def clone_template(
+        db: AsyncSession,
+        template_id: int,
+        new_template_data: Dict[str, Any],
+        include_question_lists: bool = False
+    ) -> ApplicationTemplate:
         """
         Клонувати шаблон з новим іменем та позицією
         """
-        source_template = TemplateService.get_template_by_id(db, template_id)
+        await TemplateService.get_template_by_id(db, template_id)
         
         # Створення нового шаблону
         new_template = ApplicationTemplate(**new_template_data)
         db.add(new_template)
-        db.flush()
+        await db.flush()
+        
+        # Копіювання питань зі старого шаблону на стороні бази даних (INSERT ... SELECT)
+        await db.execute(
+            insert(template_questions).from_select(
+                ["template_id", "question_id"],
+                select(literal(new_template.id), template_questions.c.question_id)
+                .where(template_questions.c.template_id == template_id)
+            )
+        )
         
-        # Копіювання питань зі старого шаблону
-        for question in source_template.questions:
-            new_template.questions.append(question)
+        # Копіювання списків питань
+        if include_question_lists:
+            await db.execute(
+                insert(QuestionList).from_select(
+                    ["template_id", "unit_id"],
+                    select(literal(new_template.id), QuestionList.unit_id)
+                    .where(QuestionList.template_id == template_id)
+                )
+            )
         
-        db.commit()
-        db.refresh(new_template)
+        await db.commit()
+        await db.refresh(new_template)
         return new_template
@@ -0,0 +1,87 @@
+"""
+Бенчмарк холодного старту: кожен прогін - окремий процес інтерпретатора, як новий воркер.
+
+Вимірюється імпорт app.main, старт lifespan, перший запит без бази (/health)
+і перший запит до бази (/api/questions/units/ - з відкриттям з'єднання).
+
+Запуск: python -m app.startup_benchmark [--runs 5] [--skip-db]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+PHASES = ("import", "lifespan_startup", "first_request", "first_db_request")
+
+
+async def _measure_app(started: float, timings: Dict[str, float], skip_db: bool):
+    import httpx
+    from app.main import app
+    timings["import"] = time.perf_counter() - started
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        phase_started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            timings["lifespan_startup"] = time.perf_counter() - phase_started
+
+            phase_started = time.perf_counter()
+            await client.get("/health")
+            timings["first_request"] = time.perf_counter() - phase_started
+
+            if not skip_db:
+                phase_started = time.perf_counter()
+                response = await client.get("/api/questions/units/")
+                response.raise_for_status()
+                timings["first_db_request"] = time.perf_counter() - phase_started
+
+
+def measure_once(skip_db: bool) -> Dict[str, float]:
+    """Один прогін у поточному процесі; час кожної фази в секундах"""
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    asyncio.run(_measure_app(started, timings, skip_db))
+    return timings
+
+
+def run_benchmark(runs: int, skip_db: bool) -> Dict[str, List[float]]:
+    """Запустити прогони в окремих процесах і зібрати час по фазах"""
+    command = [sys.executable, "-m", "app.startup_benchmark", "--child"]
+    if skip_db:
+        command.append("--skip-db")
+
+    samples: Dict[str, List[float]] = {phase: [] for phase in PHASES}
+    for _ in range(runs):
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        for phase, value in json.loads(output.strip().splitlines()[-1]).items():
+            samples[phase].append(value)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк часу старту воркера")
+    parser.add_argument("--runs", type=int, default=5, help="кількість прогонів (процесів)")
+    parser.add_argument("--skip-db", action="store_true", help="не робити запит до бази")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure_once(args.skip_db)))
+        return
+
+    samples = run_benchmark(args.runs, args.skip_db)
+    print(f"{'фаза':<20}{'мін, мс':>10}{'медіана, мс':>14}{'макс, мс':>10}")
+    for phase, values in samples.items():
+        if values:
+            print(
+                f"{phase:<20}{min(values) * 1000:>10.1f}"
+                f"{statistics.median(values) * 1000:>14.1f}{max(values) * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
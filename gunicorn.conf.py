@@ -0,0 +1,45 @@
+"""
+Конфігурація gunicorn для продакшну: gunicorn -c gunicorn.conf.py app.main:app
+
+Gunicorn керує процесами (перезапуск упалих воркерів, плавне перезавантаження по SIGHUP,
+перезапуск після max_requests), а кожен воркер - це Uvicorn з uvloop і httptools
+(встановлюються з uvicorn[standard] і вибираються автоматично).
+"""
+import os
+
+from app.config import settings
+
+
+def get_workers_count() -> int:
+    """Кількість воркерів: WEB_CONCURRENCY або кількість ядер, доступних процесу"""
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    # sched_getaffinity враховує обмеження контейнера (cpuset), на відміну від cpu_count
+    if hasattr(os, "sched_getaffinity"):
+        return max(len(os.sched_getaffinity(0)), 1)
+    return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{settings.PORT}"
+workers = get_workers_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Плавний перезапуск воркерів для обмеження росту пам'яті
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+keepalive = settings.SERVER_KEEPALIVE
+forwarded_allow_ips = settings.SERVER_FORWARDED_ALLOW_IPS
+
+# Додаток імпортується в кожному воркері (без preload_app), тож SIGHUP підхоплює новий код,
+# а движки бази даних не переживають fork
+preload_app = False
+
+# Heartbeat-файли воркерів у пам'яті: в Docker /tmp може бути на повільному overlay-диску
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,27 @@
+"""
+Спільні фікстури тестів. Тести працюють з PostgreSQL зі схемою після alembic upgrade head
+(змінні POSTGRES_*) і пропускаються, якщо база недоступна
+"""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.db.database import engine
+from app.main import app
+
+
+@pytest.fixture(scope="session")
+def require_database():
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception:
+        pytest.skip("PostgreSQL недоступна (POSTGRES_*)")
+
+
+@pytest.fixture(scope="module")
+def client(require_database):
+    with TestClient(app) as test_client:
+        # Перший запит відкриває з'єднання пулу; ініціалізація діалекту не входить у підрахунки
+        test_client.get("/api/interviews/", params={"limit": 1})
+        yield test_client
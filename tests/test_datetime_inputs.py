@@ -0,0 +1,63 @@
+"""
+Дати з часовим поясом у запитах: asyncpg не приймає їх для колонок timestamp without time zone,
+тому вони приводяться до наївного UTC (app/db/timestamps.py)
+"""
+import uuid
+
+import pytest
+
+from app.db.database import SessionLocal
+from app.db.models import ApplicationTemplate, InterviewForm
+from test_query_counts import delete_forms
+
+pytestmark = pytest.mark.usefixtures("require_database")
+
+
+@pytest.fixture
+def template_id():
+    with SessionLocal() as db:
+        template = ApplicationTemplate(name="Datetime inputs", position="Python Engineer")
+        db.add(template)
+        db.commit()
+        template_id = template.id
+    yield template_id
+    with SessionLocal() as db:
+        db.query(ApplicationTemplate).filter(ApplicationTemplate.id == template_id).delete()
+        db.commit()
+
+
+@pytest.fixture
+def candidate_id():
+    candidate_id = f"datetime-{uuid.uuid4().hex}"
+    yield candidate_id
+    with SessionLocal() as db:
+        delete_forms(db, candidate_id)
+
+
+@pytest.mark.parametrize("interview_date, stored", [
+    ("2026-10-15T10:00:00Z", "2026-10-15T10:00:00"),
+    ("2026-10-15T10:00:00+03:00", "2026-10-15T07:00:00"),
+    ("2026-10-15T10:00:00", "2026-10-15T10:00:00"),
+])
+def test_create_interview_form_with_timezone(client, template_id, candidate_id, interview_date, stored):
+    response = client.post("/api/interviews/", json={
+        "candidate_id": candidate_id,
+        "candidate_name": "Candidate",
+        "position": "Python Engineer",
+        "interview_date": interview_date,
+        "template_id": template_id,
+    })
+
+    assert response.status_code == 201, response.text
+    assert response.json()["interview_date"] == stored
+    with SessionLocal() as db:
+        form = db.get(InterviewForm, response.json()["id"])
+        assert form.interview_date.isoformat() == stored
+
+    response = client.get("/api/interviews/", params={
+        "candidate_id": candidate_id,
+        "start_date": "2026-10-15T00:00:00Z",
+        "end_date": "2026-10-16T00:00:00+00:00",
+    })
+    assert response.status_code == 200
+    assert len(response.json()) == 1
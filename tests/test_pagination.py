@@ -0,0 +1,39 @@
+"""Курсори keyset-пагінації (app/db/pagination.py): підроблений курсор - 400, а не помилка бази"""
+import base64
+import datetime
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.pagination import INTERVIEW_FORM_ORDER, decode_cursor, encode_cursor
+
+
+def make_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+
+def test_cursor_round_trip():
+    values = [datetime.datetime(2026, 10, 15, 10, 0), 42]
+    assert decode_cursor(encode_cursor(values), INTERVIEW_FORM_ORDER) == values
+
+
+@pytest.mark.parametrize("values", [
+    ["2026-10-15T10:00:00", "abc"],
+    ["2026-10-15T10:00:00", 1.5],
+    ["2026-10-15T10:00:00", True],
+    ["2026-10-15T10:00:00", None],
+    ["2026-10-15T10:00:00", [1]],
+    ["2026-10-15T10:00:00", 2 ** 40],
+    ["not-a-date", 1],
+    ["2026-10-15T10:00:00"],
+])
+def test_malformed_cursor_is_rejected(values):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(make_cursor(values), INTERVIEW_FORM_ORDER)
+    assert error.value.status_code == 400
+
+
+def test_malformed_id_cursor_returns_400(client):
+    response = client.get("/api/interviews/", params={"cursor": make_cursor(["2026-10-15T10:00:00", "abc"])})
+    assert response.status_code == 400
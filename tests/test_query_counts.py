@@ -0,0 +1,129 @@
+"""
+Регресійний тест кількості SQL-запитів для списку і деталей форм інтерв'ю (app/db/loading.py).
+
+Кількість запитів не повинна залежати від кількості форм і їх зв'язків - інакше це N+1
+"""
+import datetime
+import uuid
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import delete, event, select
+
+from app.db.database import SessionLocal, async_engine
+from app.db.models import (
+    ApplicationTemplate, Evaluation, Feedback, InterviewForm, Interviewer, Question, Score, interviewer_forms
+)
+
+# Очікувана кількість запитів (див. app/db/loading.py)
+LIST_QUERIES = 2  # форми + interviewers
+DETAIL_QUERIES = 4  # форма з feedback + interviewers + scores + evaluations
+DETAIL_VERSION_QUERIES = 1  # ETag форми перед завантаженням (app/db/versions.py)
+
+
+pytestmark = pytest.mark.usefixtures("require_database")
+
+
+@contextmanager
+def count_queries():
+    """Зібрати SQL-запити, виконані асинхронним движком додатку"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_forms(db, candidate_id: str, count: int, interviewers_per_form: int = 2) -> list:
+    """Форми з інтерв'юерами, оцінками, загальною оцінкою і відгуком"""
+    template = ApplicationTemplate(name="Query count", position="Python Engineer")
+    question = Question(text="Query count question", weight=2.0)
+    interviewers = [
+        Interviewer(name=f"Interviewer {i}", email=f"{candidate_id}-{i}@example.com")
+        for i in range(interviewers_per_form)
+    ]
+    db.add_all([template, question, *interviewers])
+    db.flush()
+
+    forms = []
+    for i in range(count):
+        form = InterviewForm(
+            candidate_id=candidate_id,
+            candidate_name=f"Candidate {i}",
+            position="Python Engineer",
+            interview_date=datetime.datetime(2026, 1, 1) + datetime.timedelta(days=i),
+            template_id=template.id,
+            interviewers=interviewers,
+        )
+        db.add(form)
+        db.flush()
+        db.add_all([
+            Score(question_id=question.id, interviewer_id=interviewer.id, interview_form_id=form.id, value=4)
+            for interviewer in interviewers
+        ])
+        db.add(Evaluation(interview_form_id=form.id, total_score=4, passed=True, minimal_rate=3))
+        db.add(Feedback(interview_form_id=form.id, text="Strong hire"))
+        forms.append(form)
+    db.commit()
+    return [form.id for form in forms]
+
+
+def delete_forms(db, candidate_id: str):
+    forms = db.execute(
+        select(InterviewForm.id, InterviewForm.template_id).where(InterviewForm.candidate_id == candidate_id)
+    ).all()
+    form_ids = [form.id for form in forms]
+    question_ids = db.scalars(select(Score.question_id).where(Score.interview_form_id.in_(form_ids))).all()
+    db.execute(delete(Score).where(Score.interview_form_id.in_(form_ids)))
+    db.execute(delete(Evaluation).where(Evaluation.interview_form_id.in_(form_ids)))
+    db.execute(delete(Feedback).where(Feedback.interview_form_id.in_(form_ids)))
+    db.execute(delete(interviewer_forms).where(interviewer_forms.c.form_id.in_(form_ids)))
+    db.execute(delete(InterviewForm).where(InterviewForm.id.in_(form_ids)))
+    db.execute(delete(Interviewer).where(Interviewer.email.like(f"{candidate_id}-%")))
+    db.execute(delete(Question).where(Question.id.in_(question_ids)))
+    db.execute(delete(ApplicationTemplate).where(ApplicationTemplate.id.in_({form.template_id for form in forms})))
+    db.commit()
+
+
+@pytest.fixture
+def candidate_id():
+    candidate_id = f"query-count-{uuid.uuid4().hex}"
+    yield candidate_id
+    with SessionLocal() as db:
+        delete_forms(db, candidate_id)
+
+
+@pytest.mark.parametrize("forms_count", [1, 5])
+def test_interview_list_query_count(client, candidate_id, forms_count):
+    with SessionLocal() as db:
+        create_forms(db, candidate_id, forms_count)
+
+    with count_queries() as statements:
+        response = client.get("/api/interviews/", params={"candidate_id": candidate_id})
+
+    assert response.status_code == 200
+    assert len(response.json()) == forms_count
+    assert all(len(form["interviewers"]) == 2 for form in response.json())
+    assert len(statements) == LIST_QUERIES, statements
+
+
+@pytest.mark.parametrize("interviewers_per_form", [1, 4])
+def test_interview_detail_query_count(client, candidate_id, interviewers_per_form):
+    with SessionLocal() as db:
+        form_id = create_forms(db, candidate_id, 1, interviewers_per_form)[0]
+
+    with count_queries() as statements:
+        response = client.get(f"/api/interviews/{form_id}")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["interviewers"]) == interviewers_per_form
+    assert len(body["scores"]) == interviewers_per_form
+    assert len(body["evaluations"]) == 1
+    assert body["feedback"]["text"] == "Strong hire"
+    assert len(statements) == DETAIL_VERSION_QUERIES + DETAIL_QUERIES, statements